@@ -5,15 +5,16 @@ VIP企业信息数据看板系统 - 最终更新版本
 支持新的13分评分系统和优化的文字内容结构化展现
 """
 
-from flask import Flask, render_template_string, request, jsonify, send_file
+from flask import (Flask, render_template_string, request, jsonify, send_file, Response, stream_with_context,
+                   g, has_request_context)
 from flask_cors import CORS
-import pandas as pd
-import re
 import json
 import io
-import base64
+import hashlib
 import warnings
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 warnings.filterwarnings('ignore')
 
 
@@ -21,56 +22,179 @@ warnings.filterwarnings('ignore')
 import sys
 sys.path.append('/home/ubuntu')
 from updated_data_processor_new import UpdatedDataProcessor
+from company_store import CompanyStore
+from chart_cache import ChartCache
+from background_jobs import JobRegistry
+from snapshot_store import SnapshotStore, content_hash, stream_hash
+from shared_dataset import SharedDataset
+from company_views import page_bounds, parse_fields, parse_non_negative_int, parse_page, project_all
+from ranking_engine import RANK_METHODS
+from statistics_engine import RANKING_BUCKET_EDGES, bucket_labels, parse_edges
+from group_aggregates import DIMENSIONS
+from json_payloads import ENCODER as JSON_ENCODER, FastJSONProvider
+from http_delivery import ResponseCompressor, StaticPage
+from lazy_imports import LazyModule, module_available
 #from honor_statistics_generator import HonorStatisticsGenerator
 
-
-# 图表生成相关导入
-try:
-    import matplotlib
-    matplotlib.use('Agg')
-    import matplotlib.pyplot as plt
-    import matplotlib.font_manager as fm
-    import seaborn as sns
-    import numpy as np
-    CHARTS_AVAILABLE = True
-    
-    # 配置中文字体
-    chinese_fonts = ['Hiragino Sans GB', 'STHeiti', 'Hei', 'Microsoft YaHei', 'Arial Unicode MS']
-    font_found = False
-    
-    for font_name in chinese_fonts:
-        try:
-            plt.rcParams['font.sans-serif'] = [font_name]
-            plt.rcParams['axes.unicode_minus'] = False
-            # 测试字体
-            fig, ax = plt.subplots(figsize=(1, 1))
-            ax.text(0.5, 0.5, '测试', fontsize=12)
-            plt.close(fig)
-            font_found = True
-            print(f"✅ 成功配置中文字体: {font_name}")
-            break
-        except:
-            continue
-    
-    if not font_found:
+# pandas 和图表相关模块在第一次使用时才导入，加快启动
+pd = LazyModule('pandas')
+charts = LazyModule('charts')
+chart_prerender = LazyModule('chart_prerender')
+pdf_reports = LazyModule('pdf_reports')
+
+CHARTS_AVAILABLE = module_available('matplotlib')
+if CHARTS_AVAILABLE:
+    # 配置中文字体（findfont 的查找结果缓存在磁盘上，启动时不导入 matplotlib）
+    from chart_fonts import resolve_chinese_font
+    CHINESE_FONT = resolve_chinese_font()
+    if CHINESE_FONT:
+        print(f"✅ 成功配置中文字体: {CHINESE_FONT}")
+        USE_CHINESE = True
+    else:
         print("⚠️ 未找到合适的中文字体，将使用英文显示")
         USE_CHINESE = False
-    else:
-        USE_CHINESE = True
-
-except ImportError:
-    CHARTS_AVAILABLE = False
+else:
     USE_CHINESE = False
     print("⚠️ 图表库未安装，图表功能将不可用")
 
 app = Flask(__name__)
+# jsonify 使用 orjson（未安装时为标准库），列表接口拼接按数据集缓存的企业记录编码结果
+app.json = FastJSONProvider(app)
 CORS(app)
 
 
-# 全局变量存储企业数据
-companies_data = []
+# 当前一代企业数据（带索引）。每一代建好后不再修改，新数据在旁边构建完成后
+# 由 swap_store 以一次引用赋值发布；请求开始时固定使用当时的一代（见 current_store），
+# 读取不需要加锁，也不会看到构建到一半的数据
+company_store = CompanyStore()
+
+# 图表缓存（内存预算可通过环境变量调整，单位MB）
+chart_cache = ChartCache(max_bytes=int(os.environ.get('CHART_CACHE_MB', 64)) * 1024 * 1024)
+CHART_CACHE_MAX_AGE = int(os.environ.get('CHART_CACHE_MAX_AGE', 3600))
+
+# 后台任务（图表预渲染等）
+job_registry = JobRegistry()
+# 上传后是否默认在后台预渲染全部图表；进程数为空时取CPU核数
+PRERENDER_CHARTS = os.environ.get('PRERENDER_CHARTS', '0') == '1'
+PRERENDER_WORKERS = int(os.environ['PRERENDER_WORKERS']) if os.environ.get('PRERENDER_WORKERS') else None
+# 最多预渲染排名前多少家企业（0 为不限，仍受图表缓存容量限制）
+PRERENDER_LIMIT = int(os.environ.get('PRERENDER_LIMIT', 0))
+prerender_job = None
+# 异步上传的解析任务（新的上传会取消尚未完成的旧任务）
+ingest_job = None
+# 批量PDF报告的渲染进程数（为空时取CPU核数）
+REPORT_WORKERS = int(os.environ['REPORT_WORKERS']) if os.environ.get('REPORT_WORKERS') else None
 data_processor = UpdatedDataProcessor()
 
+# 上传是否默认在后台异步解析（立即返回任务ID，避免大文件超过 worker 超时）
+ASYNC_UPLOAD = os.environ.get('ASYNC_UPLOAD', '0') == '1'
+
+# 列表接口单页最多返回的企业数
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 1000))
+
+# HTML/JSON 响应超过该大小（字节）时按 Accept-Encoding 压缩，GET 响应的压缩结果按数据集版本缓存
+response_compressor = ResponseCompressor(
+    min_size=int(os.environ.get('COMPRESS_MIN_BYTES', 1024)),
+    max_bytes=int(os.environ.get('COMPRESSED_CACHE_MB', 32)) * 1024 * 1024)
+
+# 快照和共享数据集默认不启用：目录中的数据会被使用同一目录的所有实例加载，
+# 因此每个部署应使用自己的目录
+
+# 数据集快照目录（不设置则不保存快照），启动时自动加载最近一次上传的数据
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', '')
+snapshot_store = SnapshotStore(SNAPSHOT_DIR) if SNAPSHOT_DIR else None
+
+# 多 worker 共享数据集目录（不设置则各 worker 只使用自己内存中的数据）
+SHARED_DATASET_DIR = os.environ.get('SHARED_DATASET_DIR', '')
+shared_dataset = SharedDataset(SHARED_DATASET_DIR) if SHARED_DATASET_DIR else None
+# 本 worker 当前使用的数据集代数
+dataset_generation = 0
+_dataset_lock = threading.Lock()
+
+def swap_store(store):
+    """发布新一代企业数据（一次引用赋值），之后开始的请求读取新数据，进行中的请求不受影响"""
+    global company_store
+    company_store = store
+
+def current_store():
+    """本次请求固定使用的一代企业数据；后台任务中为当前一代"""
+    if has_request_context() and 'company_store' in g:
+        return g.company_store
+    return company_store
+
+def load_snapshot(source_key):
+    """源文件内容未变化时直接由已解析的快照构建新一代企业数据，未命中时返回 None"""
+    if snapshot_store is None:
+        return None
+    state = snapshot_store.load(source_key)
+    if state is None:
+        return None
+    store = CompanyStore.from_snapshot(state)
+    snapshot_store.set_current(source_key)
+    return store
+
+def publish_dataset(store, source_key=None):
+    """把一代企业数据发布为新一代共享数据集，其他 worker 在下一个请求时切换过去"""
+    global dataset_generation
+    if shared_dataset is None:
+        return
+    try:
+        # 写文件在锁外进行（只在后台持久化线程中调用，发布按顺序进行），不阻塞请求线程切换数据
+        generation = shared_dataset.publish(store, source_key)
+        with _dataset_lock:
+            # 发布期间本 worker 已切换到其他数据时不记录代数，下一个请求映射最新一代
+            if company_store is store and generation > dataset_generation:
+                dataset_generation = generation
+    except Exception as e:
+        print(f"⚠️ 共享数据集发布失败: {str(e)}")
+
+def sync_shared_dataset():
+    """共享数据集代数变化时映射新数据（代数读取只是一次内存访问）"""
+    global dataset_generation
+    if shared_dataset is None or shared_dataset.generation == dataset_generation:
+        return False
+    with _dataset_lock:
+        generation = shared_dataset.generation
+        if generation == dataset_generation:
+            return False
+        dataset = shared_dataset.open(generation)
+        if dataset is not None:
+            swap_store(CompanyStore.from_dataset(dataset))
+        dataset_generation = generation
+        return dataset is not None
+
+def save_snapshot(source_key, store):
+    """保存一代企业数据的快照，失败不影响上传结果"""
+    if snapshot_store is None:
+        return
+    try:
+        snapshot_store.save(source_key, store.snapshot())
+    except Exception as e:
+        print(f"⚠️ 快照保存失败: {str(e)}")
+
+# 快照保存和共享数据集发布需要序列化整个数据集，在后台线程中按上传顺序依次进行
+_persist_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dataset-persist')
+
+def persist_dataset(store, source_key=None, save=True):
+    """在后台保存快照（save 为 False 时跳过）并发布共享数据集，两者都未启用时返回 None"""
+    if snapshot_store is None and shared_dataset is None:
+        return None
+    return _persist_executor.submit(_persist_dataset, store, source_key, save)
+
+def _persist_dataset(store, source_key, save):
+    if save and source_key is not None:
+        save_snapshot(source_key, store)
+    publish_dataset(store, source_key)
+
+# 启动时优先映射共享数据集，其次加载本地快照
+if sync_shared_dataset():
+    print(f"✅ 已映射共享数据集（第 {dataset_generation} 代）: {len(company_store)} 家企业")
+elif snapshot_store is not None:
+    _state = snapshot_store.load_current()
+    if _state is not None:
+        swap_store(CompanyStore.from_snapshot(_state))
+        print(f"✅ 已从快照恢复 {len(company_store)} 家企业数据")
+
 # HTML模板
 HTML_TEMPLATE = '''
 <!DOCTYPE html>
@@ -1372,7 +1496,7 @@ HTML_TEMPLATE = '''
 
         <div id="loadingSection" class="loading" style="display: none;">
             <div style="font-size: 2rem; margin-bottom: 1rem;">⏳</div>
-            <p>正在处理数据，请稍候...</p>
+            <p id="loadingText">正在处理数据，请稍候...</p>
         </div>
     </div>
 
@@ -1403,12 +1527,22 @@ HTML_TEMPLATE = '''
             }
         });
 
+        // 超过该大小的文件在服务端后台解析，前端轮询任务进度
+        const ASYNC_UPLOAD_BYTES = 2 * 1024 * 1024;
+
         function handleFileUpload(event) {
             const file = event.target.files[0];
             if (!file) return;
 
             const formData = new FormData();
             formData.append('file', file);
+            // 已有数据时增量上传，只重新处理变化的企业
+            if (companiesData.length > 0) {
+                formData.append('merge', '1');
+            }
+            if (file.size > ASYNC_UPLOAD_BYTES) {
+                formData.append('async', '1');
+            }
 
             showLoading();
 
@@ -1418,14 +1552,22 @@ HTML_TEMPLATE = '''
             })
             .then(response => response.json())
             .then(data => {
-                hideLoading();
-                if (data.success) {
-                    companiesData = data.companies;
-                    showDashboard();
-                    showSuccess('数据上传成功！');
-                } else {
+                if (data.success && data.job_id) {
+                    return pollUploadJob(data.job_id);
+                }
+                if (!data.success) {
+                    hideLoading();
                     showError(data.error || '文件上传失败');
+                    return;
                 }
+                return loadRemainingCompanies(data.companies, data.next_cursor)
+                .then(companies => {
+                    hideLoading();
+                    companiesData = companies;
+                    companyDetailsCache = {};
+                    showDashboard();
+                    showSuccess(data.changes ? data.message : '数据上传成功！');
+                });
             })
             .catch(error => {
                 hideLoading();
@@ -1433,6 +1575,55 @@ HTML_TEMPLATE = '''
             });
         }
 
+        // 列表接口分页返回（每页最多 MAX_PAGE_SIZE 家），按 next_cursor 继续读取其余企业
+        function loadRemainingCompanies(companies, cursor) {
+            if (cursor === null || cursor === undefined) {
+                return Promise.resolve(companies);
+            }
+            return fetch(`/api/companies?cursor=${cursor}`)
+            .then(response => response.json())
+            .then(page => {
+                if (!page.success) {
+                    throw new Error(page.error);
+                }
+                return loadRemainingCompanies(companies.concat(page.companies), page.next_cursor);
+            });
+        }
+
+        function pollUploadJob(jobId) {
+            return fetch(`/api/jobs/${jobId}`)
+            .then(response => response.json())
+            .then(data => {
+                if (!data.success) {
+                    throw new Error(data.message);
+                }
+                const job = data.data;
+                if (job.status === 'done') {
+                    return fetch('/api/companies')
+                    .then(response => response.json())
+                    .then(list => {
+                        if (!list.success) {
+                            throw new Error(list.error);
+                        }
+                        return loadRemainingCompanies(list.companies, list.next_cursor);
+                    })
+                    .then(companies => {
+                        hideLoading();
+                        companiesData = companies;
+                        companyDetailsCache = {};
+                        showDashboard();
+                        showSuccess(job.message);
+                    });
+                }
+                if (job.status === 'failed' || job.status === 'cancelled') {
+                    throw new Error(job.message || '文件处理失败');
+                }
+                document.getElementById('loadingText').textContent =
+                    `正在处理数据：${job.processed} / ${job.total} 行（${job.progress}%）`;
+                return new Promise(resolve => setTimeout(resolve, 500)).then(() => pollUploadJob(jobId));
+            });
+        }
+
         function loadDemoData() {
             showLoading();
             
@@ -1442,6 +1633,7 @@ HTML_TEMPLATE = '''
                 hideLoading();
                 if (data.success) {
                     companiesData = data.companies;
+                    companyDetailsCache = {};
                     showDashboard();
                     showSuccess('演示数据加载成功！');
                 } else {
@@ -1540,9 +1732,26 @@ HTML_TEMPLATE = '''
             `).join('');
         }
 
+        // 列表接口只返回摘要字段，完整企业记录按需获取并缓存
+        let companyDetailsCache = {};
+
+        function fetchCompanyDetails(companyName) {
+            if (companyDetailsCache[companyName]) {
+                return Promise.resolve(companyDetailsCache[companyName]);
+            }
+            return fetch(`/api/company/${encodeURIComponent(companyName)}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        throw new Error(data.message || '获取企业信息失败');
+                    }
+                    companyDetailsCache[companyName] = data.data;
+                    return data.data;
+                });
+        }
+
         function selectCompany(companyName) {
-            selectedCompany = companiesData.find(company => company.name === companyName);
-            if (!selectedCompany) return;
+            if (!companiesData.some(company => company.name === companyName)) return;
 
             // 更新选中状态
             document.querySelectorAll('.company-card').forEach(card => {
@@ -1550,13 +1759,21 @@ HTML_TEMPLATE = '''
             });
             event.currentTarget.classList.add('selected');
 
-            // 显示详情
-            showCompanyDetails();
-            
-            // 滚动到详情区域
-            document.getElementById('companyDetails').scrollIntoView({ 
-                behavior: 'smooth',
-                block: 'start'
+            fetchCompanyDetails(companyName)
+            .then(company => {
+                selectedCompany = company;
+
+                // 显示详情
+                showCompanyDetails();
+                
+                // 滚动到详情区域
+                document.getElementById('companyDetails').scrollIntoView({ 
+                    behavior: 'smooth',
+                    block: 'start'
+                });
+            })
+            .catch(error => {
+                showError(error.message);
             });
         }
 
@@ -1853,53 +2070,24 @@ HTML_TEMPLATE = '''
         function loadCharts() {
             if (!selectedCompany) return;
 
-            // 加载雷达图
-            fetch('/api/generate-radar-chart', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(selectedCompany)
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    document.getElementById('radarChart').innerHTML = `<img src="data:image/png;base64,${data.chart}" style="max-width: 100%; height: auto;">`;
-                }
-            })
-            .catch(error => console.error('雷达图加载失败:', error));
-
-            // 加载评分分解图
-            fetch('/api/generate-score-chart', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(selectedCompany)
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    document.getElementById('scoreChart').innerHTML = `<img src="data:image/png;base64,${data.chart}" style="max-width: 100%; height: auto;">`;
-                }
-            })
-            .catch(error => console.error('评分图加载失败:', error));
-
-            // 加载环形图
-            fetch('/api/generate-donut-chart', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(selectedCompany)
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    document.getElementById('donutChart').innerHTML = `<img src="data:image/png;base64,${data.chart}" style="max-width: 100%; height: auto;">`;
-                }
-            })
-            .catch(error => console.error('环形图加载失败:', error));
+            // 图表按企业名称从服务端获取，浏览器按ETag缓存，数据未变化时服务端直接返回304
+            const chartBase = `/api/company/${encodeURIComponent(selectedCompany.name)}/chart/`;
+            [
+                ['radarChart', 'radar', '雷达图'],
+                ['scoreChart', 'score', '评分图'],
+                ['donutChart', 'donut', '环形图']
+            ].forEach(([elementId, chartType, label]) => {
+                const img = new Image();
+                img.style.maxWidth = '100%';
+                img.style.height = 'auto';
+                img.onload = () => {
+                    const container = document.getElementById(elementId);
+                    container.innerHTML = '';
+                    container.appendChild(img);
+                };
+                img.onerror = () => console.error(`${label}加载失败`);
+                img.src = chartBase + chartType;
+            });
         }
         
         function renderRankingTab() {
@@ -2127,9 +2315,10 @@ HTML_TEMPLATE = '''
             selectCompany(companyName);
         }
 
-        // 搜索功能
+        // 搜索功能（输入停止300ms后再检索，新的检索会中止尚未返回的旧请求）
         let searchTimeout;
         let currentSearchQuery = '';
+        let searchController = null;
 
         function searchInRanking() {
             const searchInput = document.getElementById('rankingSearch');
@@ -2174,13 +2363,28 @@ HTML_TEMPLATE = '''
                     break;
             }
             
-            // 应用搜索
+            // 应用搜索（列表中没有简介等文字字段，由服务端全文检索匹配企业名称）
+            if (searchController) {
+                searchController.abort();
+                searchController = null;
+            }
             if (currentSearchQuery) {
-                filteredData = filteredData.filter(company => 
-                    company.name.toLowerCase().includes(currentSearchQuery) ||
-                    (company.city && company.city.toLowerCase().includes(currentSearchQuery)) ||
-                    (company.introduction && company.introduction.toLowerCase().includes(currentSearchQuery))
-                );
+                const query = currentSearchQuery;
+                const controller = searchController = new AbortController();
+                fetch(`/api/search-companies?q=${encodeURIComponent(query)}&limit=${rankingData.length}&fields=name`,
+                      { signal: controller.signal })
+                .then(response => response.json())
+                .then(data => {
+                    if (query !== currentSearchQuery) return;
+                    const matched = new Set(data.success ? data.data.companies.map(company => company.name) : []);
+                    renderRankingList(filteredData.filter(company => matched.has(company.name)));
+                })
+                .catch(error => {
+                    if (error.name !== 'AbortError') {
+                        renderRankingList([]);
+                    }
+                });
+                return;
             }
             
             renderRankingList(filteredData);
@@ -2207,13 +2411,7 @@ HTML_TEMPLATE = '''
 
             showLoading();
 
-            fetch('/api/generate-pdf', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(selectedCompany)
-            })
+            fetch(`/api/company/${encodeURIComponent(selectedCompany.name)}/pdf`)
             .then(response => {
                 if (response.ok) {
                     return response.blob();
@@ -2238,7 +2436,8 @@ HTML_TEMPLATE = '''
             });
         }
 
-        function showLoading() {
+        function showLoading(text = '正在处理数据，请稍候...') {
+            document.getElementById('loadingText').textContent = text;
             document.getElementById('loadingSection').style.display = 'block';
         }
 
@@ -2270,10 +2469,24 @@ HTML_TEMPLATE = '''
 </html>
 '''
 
+# 看板页面只在启动时渲染一次，ETag 和压缩版本随之生成
+with app.app_context():
+    index_page = StaticPage(render_template_string(HTML_TEMPLATE).encode('utf-8'))
+
 # API路由
+@app.before_request
+def check_shared_dataset():
+    sync_shared_dataset()
+    # 整个请求固定使用当前这一代企业数据
+    g.company_store = company_store
+
+@app.after_request
+def compress_response(response):
+    return response_compressor.process(request, response, current_store().version)
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    return index_page.response(request, app.response_class)
 
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
@@ -2284,33 +2497,269 @@ def upload_file():
         file = request.files['file']
         if file.filename == '':
             return jsonify({'success': False, 'error': '没有选择文件'})
-        
+        try:
+            offset, limit = page_args()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        mode = request.form.get('mode', 'columnar')
+        merge = merge_requested()
+        if async_requested():
+            return start_upload_ingest(file, 'columnar' if mode == 'streaming' else mode, merge)
+        supersede_ingest()
+        if mode == 'streaming' and not merge and file.filename.endswith(('.xlsx', '.xlsm')):
+            chunk_size = int(request.form.get('chunk_size', 500))
+            return stream_upload_response(file, chunk_size, prerender_requested(), fields_arg())
+        if mode == 'streaming':
+            mode = 'columnar'
+
         # 读取文件内容
         file_content = file.read()
-        
-        # 根据文件扩展名处理
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.StringIO(file_content.decode('utf-8')))
-        else:
-            df = pd.read_excel(io.BytesIO(file_content))
-        
-        # 处理数据
-        global companies_data
-        companies_data = []
-        
-        for _, row in df.iterrows():
-            company = data_processor._process_company_row(row)
-            companies_data.append(company)
-        
+        source_key = content_hash(file_content)
+        
+        # 同一份文件已解析过时直接使用快照（增量上传需要与当前数据比较，不使用快照）
+        store = None if merge else load_snapshot(source_key)
+        from_snapshot = store is not None
+        changes = None
+        if not from_snapshot:
+            df = read_upload_dataframe(file_content, file.filename)
+            
+            # 处理数据（默认按列批量处理，可通过表单字段 mode=row 切换回逐行处理）
+            if merge:
+                # 增量上传：只处理新增或内容变化的行，其余企业沿用当前数据
+                base = current_store()
+                companies, row_hashes, changes = merge_upload(df, base, mode)
+                store = CompanyStore(companies, row_hashes)
+                if not swap_if_current(store, base):
+                    return jsonify({'success': False, 'error': MERGE_CONFLICT}), 409
+            else:
+                store = CompanyStore(data_processor.process_dataframe(df, mode=mode), data_processor.row_hashes(df))
+        if not merge:
+            swap_store(store)
+        persist_dataset(store, source_key, save=not from_snapshot)
+        job = start_chart_prerender(store) if prerender_requested() else None
+        
+        message = upload_message(len(store), changes)
+        # 只返回当前页的摘要字段，完整记录通过 /api/company/<name> 获取
+        start, stop, next_cursor = page_bounds(len(store), offset, limit)
         return jsonify({
             'success': True,
-            'companies': companies_data,
-            'message': f'成功处理 {len(companies_data)} 家企业数据'
+            'companies': store.payloads().encode(range(start, stop), fields_arg()),
+            'total': len(store),
+            'next_cursor': next_cursor,
+            'message': message,
+            'from_snapshot': from_snapshot,
+            'changes': changes,
+            'prerender_job': job.id if job else None
         })
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'文件处理失败: {str(e)}'})
 
+def read_upload_dataframe(file_content, filename):
+    """根据文件扩展名读取上传的表格"""
+    if filename.endswith('.csv'):
+        return pd.read_csv(io.StringIO(file_content.decode('utf-8')))
+    return pd.read_excel(io.BytesIO(file_content))
+
+def merge_upload(df, base, mode, progress=None):
+    """增量处理上传的表格：与 base 这一代数据按行哈希比较，base 没有行哈希时按企业名称比较"""
+    previous = base.by_row_hash()
+    return data_processor.merge_dataframe(df, previous, mode=mode, progress=progress,
+                                          previous_companies=None if previous else base.companies)
+
+def upload_message(count, changes=None):
+    message = f'成功处理 {count} 家企业数据'
+    if changes is not None:
+        message += f"（新增 {changes['added']}，更新 {changes['updated']}，删除 {changes['removed']}）"
+    return message
+
+MERGE_CONFLICT = '增量上传期间数据已被其他上传更新，请重新上传'
+
+def supersede_ingest():
+    """任何上传开始时取消尚未完成的异步解析任务，避免较早的上传在之后覆盖新数据"""
+    global ingest_job
+    with _dataset_lock:
+        if ingest_job is not None and not ingest_job.finished:
+            ingest_job.cancel()
+        ingest_job = None
+
+def swap_if_current(store, base):
+    """增量上传的结果以 base 为比较基准：base 仍是当前一代时才发布，返回是否已发布"""
+    with _dataset_lock:
+        if company_store is not base:
+            return False
+        swap_store(store)
+        return True
+
+def start_upload_ingest(file, mode, merge):
+    """异步上传：读取文件内容后立即返回任务ID，解析在后台线程中进行，通过 /api/jobs/<job_id> 查询进度"""
+    global ingest_job
+    supersede_ingest()
+    
+    job = job_registry.create('upload_ingest')
+    with _dataset_lock:
+        ingest_job = job
+    job_registry.run_in_background(job, ingest_upload, file.read(), file.filename, mode, merge,
+                                   prerender_requested())
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status_url': f'/api/jobs/{job.id}',
+        'message': '文件已接收，正在后台处理'
+    }), 202
+
+def ingest_upload(job, file_content, filename, mode, merge, prerender):
+    """后台解析上传的文件，建好新一代企业数据后整体替换当前一代
+
+    处理过程中的请求继续使用原有数据；解析失败、任务被新的上传取消，
+    或增量上传期间当前数据已被替换时，原有数据保持不变。
+    """
+    job.start()
+    source_key = content_hash(file_content)
+    changes = None
+    base = company_store
+    
+    try:
+        store = None if merge else load_snapshot(source_key)
+        from_snapshot = store is not None
+        if from_snapshot:
+            job.start(len(store))
+            job.advance(len(store))
+        else:
+            df = read_upload_dataframe(file_content, filename)
+            job.start(len(df))
+            if merge:
+                companies, row_hashes, changes = merge_upload(df, base, mode, job.advance)
+            else:
+                companies = data_processor.process_dataframe(df, mode=mode, progress=job.advance)
+                row_hashes = data_processor.row_hashes(df)
+            store = CompanyStore(companies, row_hashes)
+    except Exception as e:
+        job.fail(f'文件处理失败: {str(e)}')
+        return
+    
+    with _dataset_lock:
+        if job.cancelled:
+            job.finish(message='已被新的上传取代，数据未替换')
+            return
+        if merge and company_store is not base:
+            job.fail(MERGE_CONFLICT)
+            return
+        swap_store(store)
+    persist_dataset(store, source_key, save=not from_snapshot)
+    prerender = start_chart_prerender(store) if prerender else None
+    
+    job.finish(result={
+        'total': len(store),
+        'from_snapshot': from_snapshot,
+        'changes': changes,
+        'prerender_job': prerender.id if prerender else None
+    }, message=upload_message(len(store), changes))
+
+def stream_upload_response(file, chunk_size, prerender=False, fields=None):
+    """流式上传：边解析边以NDJSON逐块返回企业数据（按 fields 投影），全部解析完成后再发布新一代企业数据"""
+    def generate():
+        companies = []
+        row_hashes = []
+        try:
+            source_key = stream_hash(file.stream)
+            store = load_snapshot(source_key)
+            from_snapshot = store is not None
+            if from_snapshot:
+                records = store.companies
+                chunks = (records[i:i + chunk_size] for i in range(0, len(records), chunk_size))
+            else:
+                chunks = data_processor.iter_excel_chunks(file.stream, chunk_size=chunk_size, row_hashes=row_hashes)
+            
+            for chunk in chunks:
+                companies.extend(chunk)
+                yield json.dumps({
+                    'success': True,
+                    'companies': project_all(chunk, fields),
+                    'processed': len(companies)
+                }, ensure_ascii=False) + '\n'
+
+            if not from_snapshot:
+                store = CompanyStore(companies, row_hashes)
+            swap_store(store)
+            persist_dataset(store, source_key, save=not from_snapshot)
+            job = start_chart_prerender(store) if prerender else None
+            yield json.dumps({
+                'success': True,
+                'done': True,
+                'message': f'成功处理 {len(companies)} 家企业数据',
+                'from_snapshot': from_snapshot,
+                'prerender_job': job.id if job else None
+            }, ensure_ascii=False) + '\n'
+        except Exception as e:
+            yield json.dumps({'success': False, 'error': f'文件处理失败: {str(e)}'}, ensure_ascii=False) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def fields_arg():
+    """fields 参数（查询字符串或表单），默认为摘要字段"""
+    return parse_fields(request.values.get('fields'))
+
+def page_args():
+    """分页参数 (offset, limit)，cursor 与 offset 等价；不传 limit 时每页 MAX_PAGE_SIZE 家，
+    参数不是非负整数时抛出 ValueError"""
+    offset = request.values.get('cursor') or request.values.get('offset')
+    return parse_page(offset, request.values.get('limit'), MAX_PAGE_SIZE)
+
+def async_requested():
+    """上传请求是否在后台异步解析（表单字段 async 优先于环境变量）"""
+    value = request.form.get('async')
+    if value is None:
+        return ASYNC_UPLOAD
+    return value.lower() in ('1', 'true', 'yes')
+
+def merge_requested():
+    """上传请求是否为增量上传（表单字段 merge）"""
+    return request.form.get('merge', '').lower() in ('1', 'true', 'yes')
+
+def prerender_requested():
+    """上传请求是否需要预渲染图表（表单字段 prerender 优先于环境变量）"""
+    value = request.form.get('prerender')
+    if value is None:
+        return PRERENDER_CHARTS
+    return value.lower() in ('1', 'true', 'yes')
+
+def start_chart_prerender(store):
+    """在后台进程池中按排名顺序预渲染企业图表（受 PRERENDER_LIMIT 和图表缓存容量限制），
+    新任务会取消尚未完成的旧任务"""
+    global prerender_job
+    if not CHARTS_AVAILABLE:
+        return None
+    if prerender_job is not None and not prerender_job.finished:
+        prerender_job.cancel()
+    
+    records = store.companies
+    positions, _ = store.ranking().page_positions('all')
+    job = job_registry.create('chart_prerender', total=len(records))
+    job_registry.run_in_background(job, chart_prerender.prerender_charts, [records[p] for p in positions],
+                                   USE_CHINESE, chart_cache, max_workers=PRERENDER_WORKERS,
+                                   limit=PRERENDER_LIMIT or None)
+    prerender_job = job
+    return job
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """查询后台任务进度"""
+    job = job_registry.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'message': f'未找到任务: {job_id}',
+            'data': None
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'message': '获取任务状态成功',
+        'data': job.to_dict()
+    })
+
 @app.route('/api/demo-data')
 def get_demo_data():
     try:
@@ -2350,166 +2799,105 @@ def get_demo_data():
             '总分': 13
         }
         
-        # 处理演示数据
-        import pandas as pd
-        demo_row = pd.Series(demo_data)
-        company = data_processor._process_company_row(demo_row)
-        
-        global companies_data
-        companies_data = [company]
+        # 处理演示数据（同时计算行哈希，之后可以在演示数据上增量上传）
+        supersede_ingest()
+        demo_df = pd.DataFrame([demo_data])
+        store = CompanyStore(data_processor.process_dataframe(demo_df), data_processor.row_hashes(demo_df))
+        swap_store(store)
+        persist_dataset(store)
         
         return jsonify({
             'success': True,
-            'companies': companies_data,
+            'companies': store.payloads().encode(range(len(store)), fields_arg()),
+            'total': len(store),
+            'next_cursor': None,
             'message': '演示数据加载成功'
         })
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'演示数据加载失败: {str(e)}'})
 
-@app.route('/api/generate-radar-chart', methods=['POST'])
-def generate_radar_chart():
+def chart_response(chart_type, company, error_label):
+    """返回图表：默认为兼容前端的 base64 JSON，?format=png 时直接返回PNG（带ETag/Cache-Control）"""
     if not CHARTS_AVAILABLE:
         return jsonify({'success': False, 'error': '图表功能不可用'})
     
     try:
-        company = request.json
+        key = charts.chart_cache_key(chart_type, company, USE_CHINESE)
+        entry = chart_cache.get_or_render(key, lambda: charts.CHART_RENDERERS[chart_type](company, USE_CHINESE))
+        
+        if request.args.get('format') == 'png':
+            response = Response(entry.png, mimetype='image/png')
+            response.set_etag(entry.etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = CHART_CACHE_MAX_AGE
+            return response.make_conditional(request)
         
-        # 创建雷达图
-        categories = ['市场价值', '研发创新', '智能制造', '绿色制造', '信用水平'] if USE_CHINESE else ['Market Value', 'R&D Innovation', 'Smart Mfg', 'Green Mfg', 'Credit Level']
-        values = [
-            company['scores']['market_value'] / 6 * 100,
-            company['scores']['rd_innovation'] / 12 * 100,
-            company['scores']['smart_manufacturing'] / 6 * 100,
-            company['scores']['green_manufacturing'] / 8 * 100,
-            company['scores']['credit_level'] / 4  * 100
-        ]
-        
-        # 闭合雷达图
-        values += values[:1]
-        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-        angles += angles[:1]
-        
-        fig, ax = plt.subplots(figsize=(4, 4), subplot_kw=dict(projection='polar'))
-        ax.plot(angles, values, 'o-', linewidth=2, color='#3b82f6')
-        ax.fill(angles, values, alpha=0.25, color='#3b82f6')
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(categories)
-        ax.set_ylim(0, 100)
-        ax.set_yticks([20, 40, 60, 80, 100])
-        ax.set_yticklabels(['20%', '40%', '60%', '80%', '100%'])
-        ax.grid(True)
-        
-        title = f"{company['name']} - 五维度评分雷达图" if USE_CHINESE else f"{company['name']} - Five-Dimension Radar Chart"
-        plt.title(title, size=12, weight='bold', pad=20)
-        
-        # 转换为base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        chart_data = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
-        
-        return jsonify({'success': True, 'chart': chart_data})
+        return jsonify({'success': True, 'chart': entry.base64})
         
     except Exception as e:
-        return jsonify({'success': False, 'error': f'雷达图生成失败: {str(e)}'})
+        return jsonify({'success': False, 'error': f'{error_label}生成失败: {str(e)}'})
+
+@app.route('/api/generate-radar-chart', methods=['POST'])
+def generate_radar_chart():
+    return chart_response('radar', request.json, '雷达图')
 
 @app.route('/api/generate-score-chart', methods=['POST'])
 def generate_score_chart():
-    if not CHARTS_AVAILABLE:
-        return jsonify({'success': False, 'error': '图表功能不可用'})
-    
-    try:
-        company = request.json
-        
-        categories = ['市场价值', '研发创新', '智能制造', '绿色制造', '信用水平'] if USE_CHINESE else ['Market Value', 'R&D Innovation', 'Smart Mfg', 'Green Mfg', 'Credit Level']
-        current_scores = [
-            company['scores']['market_value'],
-            company['scores']['rd_innovation'],
-            company['scores']['smart_manufacturing'],
-            company['scores']['green_manufacturing'],
-            company['scores']['credit_level']
-        ]
-        max_scores = [6, 12, 6, 8, 4]
-        
-        x = np.arange(len(categories))
-        width = 0.45
-        
-        fig, ax = plt.subplots(figsize=(5, 3))
-        bars1 = ax.bar(x - width/2, current_scores, width, label='当前得分' if USE_CHINESE else 'Current Score', color='#3b82f6')
-        bars2 = ax.bar(x + width/2, max_scores, width, label='满分' if USE_CHINESE else 'Max Score', color='#e5e7eb')
-        
-        ax.set_xlabel('评分类别' if USE_CHINESE else 'Score Categories')
-        ax.set_ylabel('分数' if USE_CHINESE else 'Score')
-        ax.set_title(f"{company['name']} - 总分完成度" if USE_CHINESE else f"{company['name']} - Score Breakdown Chart")
-        ax.set_xticks(x)
-        ax.set_xticklabels(categories, rotation=45, ha='right')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        # 添加数值标签
-        for bar in bars1:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                f'{height}', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        
-        # 转换为base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        chart_data = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
-        
-        return jsonify({'success': True, 'chart': chart_data})
-        
-    except Exception as e:
-        return jsonify({'success': False, 'error': f'评分图生成失败: {str(e)}'})
+    return chart_response('score', request.json, '评分图')
 
 @app.route('/api/generate-donut-chart', methods=['POST'])
 def generate_donut_chart():
+    return chart_response('donut', request.json, '环形图')
+
+CHART_LABELS = {'radar': '雷达图', 'score': '评分图', 'donut': '环形图'}
+
+def company_etag(store, company_name, kind):
+    """按企业查询的图表/PDF的ETag：数据集版本 + 企业名称 + 内容类型，比较时无需查找企业或渲染"""
+    key = f'{store.version}\0{company_name}\0{kind}\0{int(USE_CHINESE)}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def revalidated(response, etag):
+    """设置ETag，浏览器每次使用缓存前向服务端验证（数据集更新后同一URL的内容会变化）"""
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified(etag):
+    """If-None-Match 命中时返回304，返回 None 表示需要生成内容"""
+    if etag in request.if_none_match:
+        return revalidated(Response(status=304), etag)
+    return None
+
+def company_not_found(company_name):
+    return jsonify({'success': False, 'error': f'未找到企业: {company_name}'}), 404
+
+@app.route('/api/company/<path:company_name>/chart/<chart_type>', methods=['GET'])
+def get_company_chart(company_name, chart_type):
+    """按企业名称在服务端查找企业并返回图表PNG，数据集未变化时重复请求返回304"""
     if not CHARTS_AVAILABLE:
-        return jsonify({'success': False, 'error': '图表功能不可用'})
+        return jsonify({'success': False, 'error': '图表功能不可用'}), 503
+    if chart_type not in CHART_LABELS:
+        return jsonify({'success': False, 'error': f"不支持的图表类型: {chart_type}（可选 {', '.join(CHART_LABELS)}）"}), 404
+    
+    store = current_store()
+    etag = company_etag(store, company_name, chart_type)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    
+    company = store.get(company_name)
+    if company is None:
+        return company_not_found(company_name)
     
     try:
-        company = request.json
-        
-        total_score = company['scores']['total']
-        max_total = 36  # 6+12+6+8+6
-        percentage = total_score / max_total * 100
-        
-        sizes = [percentage, 100 - percentage]
-        labels = ['已完成', '未完成'] if USE_CHINESE else ['Completed', 'Remaining']
-        colors = ['#3b82f6', '#e5e7eb']
-        
-        fig, ax = plt.subplots(figsize=(4, 4))
-        wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%',
-                                        startangle=90, pctdistance=0.85)
-        
-        # 创建环形图
-        centre_circle = plt.Circle((0,0), 0.70, fc='white')
-        fig.gca().add_artist(centre_circle)
-        
-        # 在中心添加总分
-        ax.text(0, 0, f'{total_score}/{max_total}', ha='center', va='center', 
-                fontsize=20, weight='bold', color='#1f2937')
-        
-        title = f"{company['name']} - 总分完成度" if USE_CHINESE else f"{company['name']} - Total Score Completion"
-        plt.title(title, size=12, weight='bold', pad=20)
-        
-        # 转换为base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-        buffer.seek(0)
-        chart_data = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
-        
-        return jsonify({'success': True, 'chart': chart_data})
+        key = charts.chart_cache_key(chart_type, company, USE_CHINESE)
+        entry = chart_cache.get_or_render(key, lambda: charts.CHART_RENDERERS[chart_type](company, USE_CHINESE))
+        return revalidated(Response(entry.png, mimetype='image/png'), etag)
         
     except Exception as e:
-        return jsonify({'success': False, 'error': f'环形图生成失败: {str(e)}'})
+        return jsonify({'success': False, 'error': f'{CHART_LABELS[chart_type]}生成失败: {str(e)}'}), 500
 
 
 
@@ -2556,147 +2944,168 @@ def generate_pdf():
     try:
         company = request.json
         
-        # 简化的PDF生成（使用reportlab）
-        from reportlab.lib.pagesizes import letter, A4
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.units import inch
-        from datetime import datetime
-        
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-        
-        # 封面页
-        p.setFont("Helvetica-Bold", 24)
-        p.drawCentredString(width/2, height-100, f"{company['name']}")
-        
-        p.setFont("Helvetica", 16)
-        p.drawCentredString(width/2, height-150, "VIP Enterprise Information Report")
-        
-        p.setFont("Helvetica", 12)
-        p.drawCentredString(width/2, height-200, f"VIP Level: {company['vip_level']}")
-        p.drawCentredString(width/2, height-220, f"Total Score: {company['scores']['total']}/25")
-        p.drawCentredString(width/2, height-240, f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        # 基本信息
-        y_position = height - 300
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(50, y_position, "Basic Information")
-        
-        y_position -= 30
-        p.setFont("Helvetica", 10)
-        info_lines = [
-            f"Company Name: {company['name']}",
-            f"City: {company.get('city')}",
-            f"Exhibition Count: {company.get(['exhibition_count'])}",
-            f"Brand Status: {'Yes' if company.get('is_brand') else 'No'}",
-            f"VIP Level: {company['vip_level']}"
-        ]
-        
-        for line in info_lines:
-            p.drawString(50, y_position, line)
-            y_position -= 20
-        
-        # 评分详情
-        y_position -= 30
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(50, y_position, "Score Details")
-        
-        y_position -= 30
-        p.setFont("Helvetica", 10)
-        score_lines = [
-            f"Market Value: {company['scores']['market_value']}/5",
-            f"R&D Innovation: {company['scores']['rd_innovation']}/12",
-            f"Smart Manufacturing: {company['scores']['smart_manufacturing']}/5",
-            f"Green Manufacturing: {company['scores']['green_manufacturing']}/8",
-            f"Credit Level: {company['scores']['credit_level']}/1",
-            f"Total Score: {company['scores']['total']}/36 ({company['scores']['percentage']}%)"
-        ]
-        
-        for line in score_lines:
-            p.drawString(50, y_position, line)
-            y_position -= 20
-        
-        # 企业亮点
-        if company.get('highlights'):
-            y_position -= 30
-            p.setFont("Helvetica-Bold", 14)
-            p.drawString(50, y_position, "Company Highlights")
-            
-            y_position -= 20
-            p.setFont("Helvetica", 10)
-            for i, highlight in enumerate(company['highlights'][:5], 1):
-                if y_position < 100:
-                    p.showPage()
-                    y_position = height - 50
-                p.drawString(50, y_position, f"{i}. {highlight[:80]}...")
-                y_position -= 20
-        
-        p.save()
-        buffer.seek(0)
+        # PDF报告（reportlab platypus 排版），图表取自图表缓存
+        buffer = io.BytesIO(pdf_reports.render_company_pdf(company, report_charts(company)))
         
         return send_file(
             buffer,
             as_attachment=True,
-            download_name=f"{company['name']}_VIP_Report_{datetime.now().strftime('%Y%m%d')}.pdf",
+            download_name=pdf_reports.report_filename(company['name']),
             mimetype='application/pdf'
         )
         
     except Exception as e:
         return jsonify({'success': False, 'error': f'PDF生成失败: {str(e)}'})
 
+@app.route('/api/company/<path:company_name>/pdf', methods=['GET'])
+def get_company_pdf(company_name):
+    """按企业名称在服务端查找企业并返回PDF报告，数据集未变化时重复请求返回304"""
+    store = current_store()
+    etag = company_etag(store, company_name, 'pdf')
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+    
+    company = store.get(company_name)
+    if company is None:
+        return company_not_found(company_name)
+    
+    try:
+        buffer = io.BytesIO(pdf_reports.render_company_pdf(company, report_charts(company)))
+        response = send_file(
+            buffer,
+            as_attachment=True,
+            download_name=pdf_reports.report_filename(company['name']),
+            mimetype='application/pdf',
+            etag=False
+        )
+        return revalidated(response, etag)
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'PDF生成失败: {str(e)}'}), 500
+
+def report_charts(company):
+    """报告中嵌入的图表PNG：优先读取图表缓存，未缓存的渲染一次并写入缓存（单张图失败时跳过）"""
+    if not CHARTS_AVAILABLE:
+        return None
+    images = {}
+    for chart_type, _ in pdf_reports.REPORT_CHARTS:
+        try:
+            key = charts.chart_cache_key(chart_type, company, USE_CHINESE)
+            images[chart_type] = chart_cache.get_or_render(
+                key, lambda: charts.CHART_RENDERERS[chart_type](company, USE_CHINESE)).png
+        except Exception as e:
+            print(f"⚠️ 报告图表生成失败({chart_type}): {str(e)}")
+    return images
+
+@app.route('/api/reports/batch', methods=['POST'])
+def generate_report_batch():
+    """批量生成PDF报告并以ZIP流式返回
+
+    请求体为 {"filter": "gold"}（排行榜的筛选条件）或 {"names": ["企业A", ...]}，
+    报告在进程池中并行渲染，每完成一份就写入ZIP返回；响应头 X-Job-Id 为任务ID，
+    可通过 /api/jobs/<job_id> 查询进度。
+    """
+    try:
+        store = current_store()
+        params = request.get_json(silent=True) or {}
+        names = params.get('names')
+        filter_type = params.get('filter', 'all')
+        
+        if not len(store):
+            return jsonify({'success': False, 'error': '暂无企业数据'})
+        
+        if names is not None:
+            if not isinstance(names, list):
+                return jsonify({'success': False, 'error': 'names 应为企业名称列表'}), 400
+            missing = [name for name in names if store.get(name) is None]
+            if missing:
+                return jsonify({'success': False, 'error': f"未找到企业: {'、'.join(missing[:10])}"}), 404
+            total = len(names)
+            companies = (store.get(name) for name in names)
+        else:
+            ranking = store.ranking()
+            total = ranking.count(filter_type)
+            companies = iter_ranking(ranking, filter_type, total)
+        
+        job = job_registry.create('pdf_batch', total=total)
+        chunks = pdf_reports.stream_reports_zip(job, companies, total,
+                                                chart_cache=chart_cache if CHARTS_AVAILABLE else None,
+                                                use_chinese=USE_CHINESE, max_workers=REPORT_WORKERS)
+        
+        response = Response(stream_with_context(chunks), mimetype='application/zip')
+        response.headers['Content-Disposition'] = (
+            f"attachment; filename=VIP_Reports_{filter_type if names is None else 'selected'}.zip")
+        response.headers['X-Job-Id'] = job.id
+        return response
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'批量报告生成失败: {str(e)}'})
+
+def iter_ranking(ranking, filter_type, total, page_size=100):
+    """按页惰性读取排行榜视图中的企业，避免一次取出全部记录"""
+    for start in range(0, total, page_size):
+        yield from ranking.page(filter_type, start, start + page_size)
+
 @app.route('/api/health')
 def health_check():
     return jsonify({
         'status': 'healthy',
         'charts_available': CHARTS_AVAILABLE,
         'chinese_font': USE_CHINESE,
-        'companies_loaded': len(companies_data)
+        'chart_cache': chart_cache.stats(),
+        'json_encoder': JSON_ENCODER,
+        'payload_cache': current_store().payloads().stats(),
+        'compression': response_compressor.stats(),
+        'companies_loaded': len(current_store())
     })
 
 # 排行榜相关API路由
 @app.route('/api/ranking', methods=['GET'])
 def get_ranking():
-    """获取企业排行榜"""
+    """获取企业排行榜（rank 参数可选 ordinal / competition / dense）"""
     try:
+        store = current_store()
         filter_type = request.args.get('filter', 'all')
-        sort_by = request.args.get('sort', 'total_score')
+        rank_method = request.args.get('rank', 'ordinal')
+        if rank_method not in RANK_METHODS:
+            return jsonify({
+                'success': False,
+                'message': f"不支持的排名方式: {rank_method}（可选 {', '.join(RANK_METHODS)}）",
+                'data': None
+            }), 400
+        try:
+            offset, limit = page_args()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }), 400
         
-        if not companies_data:
+        if not len(store):
             return jsonify({
                 'success': False,
                 'message': '暂无企业数据',
                 'data': []
             })
         
-        # 按总分排序
-        sorted_companies = sorted(companies_data, key=lambda x: x['scores']['total'], reverse=True)
-        
-        # 添加排名
-        for i, company in enumerate(sorted_companies):
-            company['rank'] = i + 1
-        
-        # 应用筛选
-        if filter_type == 'gold':
-            filtered_companies = [c for c in sorted_companies if c.get('vip_level') == '金标']
-        elif filter_type == 'silver':
-            filtered_companies = [c for c in sorted_companies if c.get('vip_level') == '银标']
-        elif filter_type == 'brand':
-            filtered_companies = [c for c in sorted_companies if c.get('is_brand')]
-        elif filter_type == 'top10':
-            filtered_companies = sorted_companies[:10]
-        elif filter_type == 'high_score':
-            filtered_companies = [c for c in sorted_companies if c['scores']['total'] >= 80]
-        else:
-            filtered_companies = sorted_companies
+        # 排名和筛选视图每个数据集只构建一次，这里只取当前页
+        ranking = store.ranking()
+        total = ranking.count(filter_type)
+        start, stop, next_cursor = page_bounds(total, offset, limit)
+        positions, ranks = ranking.page_positions(filter_type, start, stop, rank_method)
         
         return jsonify({
             'success': True,
             'message': '获取排行榜成功',
             'data': {
-                'companies': filtered_companies,
-                'total': len(filtered_companies),
-                'filter': filter_type
+                'companies': store.payloads().encode(positions, fields_arg(), ranks),
+                'total': total,
+                'offset': start,
+                'next_cursor': next_cursor,
+                'filter': filter_type,
+                'rank_method': rank_method
             }
         })
         
@@ -2711,8 +3120,16 @@ def get_ranking():
 def search_companies():
     """搜索企业"""
     try:
+        store = current_store()
         query = request.args.get('q', '').strip()
-        limit = int(request.args.get('limit', 10))
+        try:
+            limit = parse_non_negative_int('limit', request.args.get('limit'), 10)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'message': str(e),
+                'data': None
+            }), 400
         
         if not query:
             return jsonify({
@@ -2721,33 +3138,22 @@ def search_companies():
                 'data': []
             }), 400
         
-        if not companies_data:
+        if not len(store):
             return jsonify({
                 'success': False,
                 'message': '暂无企业数据',
                 'data': []
             })
         
-        # 简单搜索实现
-        results = []
-        query_lower = query.lower()
-        
-        for company in companies_data:
-            if (query_lower in company['name'].lower() or 
-                query_lower in company.get('city', '').lower() or
-                query_lower in company.get('introduction', '').lower()):
-                results.append(company)
-        
-        # 按总分排序
-        results.sort(key=lambda x: x['scores']['total'], reverse=True)
-        results = results[:limit]
+        # 倒排索引检索，按总分取前 limit 个
+        positions = store.search_positions(query, limit)
         
         return jsonify({
             'success': True,
             'message': '搜索成功',
             'data': {
-                'companies': results,
-                'total': len(results),
+                'companies': store.payloads().encode(positions, fields_arg()),
+                'total': len(positions),
                 'query': query
             }
         })
@@ -2763,73 +3169,143 @@ def search_companies():
 def get_ranking_statistics():
     """获取排行榜统计信息"""
     try:
-        if not companies_data:
+        # 自定义分段：?edges=20,40,60
+        edges = parse_edges(request.args.get('edges'), None)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': None
+        }), 400
+    
+    try:
+        store = current_store()
+        if not len(store):
             return jsonify({
                 'success': False,
                 'message': '暂无企业数据',
                 'data': {}
             })
         
-        # 计算统计信息
-        total_companies = len(companies_data)
-        gold_vip_count = len([c for c in companies_data if c.get('vip_level') == '金标'])
-        silver_vip_count = len([c for c in companies_data if c.get('vip_level') == '银标'])
-        brand_companies = len([c for c in companies_data if c.get('is_brand')])
+        # 计数直接读取二级索引，分数统计读取按数据集缓存的统计引擎
+        statistics = store.statistics()
+        summary = statistics.summary()
+        low_score_count, medium_score_count, high_score_count = statistics.histogram(RANKING_BUCKET_EDGES)
+        
+        data = {
+            'total_companies': len(store),
+            'gold_vip_count': store.count_by('vip_level', '金标'),
+            'silver_vip_count': store.count_by('vip_level', '银标'),
+            'brand_companies': store.count_by('is_brand', True),
+            'avg_score': round(summary['mean'], 1),
+            'max_score': summary['max'],
+            'min_score': summary['min'],
+            'high_score_count': high_score_count,
+            'medium_score_count': medium_score_count,
+            'low_score_count': low_score_count,
+            'std_score': round(summary['std'], 2),
+            'percentiles': summary['percentiles'],
+            'category_means': summary['category_means'],
+        }
+        
+        if edges is not None:
+            data['histogram'] = dict(zip(bucket_labels(edges), statistics.histogram(edges)))
         
-        # 分数统计
-        scores = [c['scores']['total'] for c in companies_data]
-        avg_score = sum(scores) / len(scores) if scores else 0
-        max_score = max(scores) if scores else 0
-        min_score = min(scores) if scores else 0
+        return jsonify({
+            'success': True,
+            'message': '获取统计信息成功',
+            'data': data
+        })
         
-        # 分数段统计
-        high_score_count = len([s for s in scores if s >= 80])
-        medium_score_count = len([s for s in scores if 60 <= s < 80])
-        low_score_count = len([s for s in scores if s < 60])
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取统计信息失败: {str(e)}',
+            'data': None
+        }), 500
+
+@app.route('/api/aggregate', methods=['GET'])
+def get_aggregate():
+    """分组统计：by=city 按一个维度分组，by=city,trading_group 两级交叉分组"""
+    try:
+        store = current_store()
+        dimensions = [field.strip() for field in request.args.get('by', 'city').split(',') if field.strip()]
+        if not 1 <= len(dimensions) <= 2:
+            return jsonify({
+                'success': False,
+                'message': f'分组字段应为1到2个，可选: {", ".join(DIMENSIONS)}',
+                'data': None
+            }), 400
+        
+        if not len(store):
+            return jsonify({
+                'success': False,
+                'message': '暂无企业数据',
+                'data': []
+            })
+        
+        # 分组结果按数据集缓存，这里只读取
+        groups = store.aggregates().group_by(*dimensions)
         
         return jsonify({
             'success': True,
-            'message': '获取统计信息成功',
+            'message': '获取分组统计成功',
             'data': {
-                'total_companies': total_companies,
-                'gold_vip_count': gold_vip_count,
-                'silver_vip_count': silver_vip_count,
-                'brand_companies': brand_companies,
-                'avg_score': round(avg_score, 1),
-                'max_score': max_score,
-                'min_score': min_score,
-                'high_score_count': high_score_count,
-                'medium_score_count': medium_score_count,
-                'low_score_count': low_score_count
+                'dimensions': dimensions,
+                'groups': groups,
+                'total': len(groups)
             }
         })
         
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': None
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'获取统计信息失败: {str(e)}',
+            'message': f'获取分组统计失败: {str(e)}',
             'data': None
         }), 500
 
+@app.route('/api/companies', methods=['GET'])
+def list_companies():
+    """按表格顺序分页获取企业列表（默认摘要字段），异步上传完成后前端由此读取新数据"""
+    try:
+        store = current_store()
+        try:
+            offset, limit = page_args()
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        start, stop, next_cursor = page_bounds(len(store), offset, limit)
+        return jsonify({
+            'success': True,
+            'companies': store.payloads().encode(range(start, stop), fields_arg()),
+            'total': len(store),
+            'next_cursor': next_cursor
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': f'获取企业列表失败: {str(e)}'}), 500
+
 @app.route('/api/company/<company_name>', methods=['GET'])
 def get_company_details(company_name):
     """获取企业详细信息"""
     try:
-        if not companies_data:
+        store = current_store()
+        if not len(store):
             return jsonify({
                 'success': False,
                 'message': '暂无企业数据',
                 'data': None
             }), 404
         
-        # 查找企业
-        company = None
-        for c in companies_data:
-            if c['name'] == company_name:
-                company = c
-                break
+        # 查找企业（名称哈希索引），返回缓存的编码结果
+        position = store.position_of(company_name)
         
-        if not company:
+        if position is None:
             return jsonify({
                 'success': False,
                 'message': f'未找到企业: {company_name}',
@@ -2839,7 +3315,7 @@ def get_company_details(company_name):
         return jsonify({
             'success': True,
             'message': '获取企业信息成功',
-            'data': company
+            'data': store.payloads().record(position)
         })
         
     except Exception as e:
@@ -2861,7 +3337,7 @@ if __name__ == '__main__':
         else:
             print("⚠️ 使用英文字体显示")
     else:
-        print("⚠️ 图表功能不可用，请安装matplotlib和seaborn")
+        print("⚠️ 图表功能不可用，请安装matplotlib")
     
     # 获取端口（Heroku会提供PORT环境变量）
     port = int(os.environ.get('PORT', 5001))
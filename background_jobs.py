@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务 - 在后台线程中执行耗时操作并记录进度
+
+接口层创建任务后立即返回任务ID，前端通过 /api/jobs/<job_id> 轮询进度。
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Job:
+    # 只保留最近的错误信息，避免错误过多时占用大量内存
+    MAX_ERRORS = 100
+
+    def __init__(self, kind: str, total: int = 0):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'pending'  # pending / running / done / failed / cancelled
+        self.total = total
+        self.processed = 0
+        self.errors: List[str] = []
+        self.message = ''
+        self.result: Any = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+
+    def start(self, total: Optional[int] = None) -> None:
+        """标记为运行中；再次调用可在得知总数后更新 total，不重置开始时间"""
+        with self._lock:
+            self.status = 'running'
+            if self.started_at is None:
+                self.started_at = time.time()
+            if total is not None:
+                self.total = total
+
+    def advance(self, count: int = 1) -> None:
+        with self._lock:
+            self.processed += count
+
+    def add_error(self, error: str) -> None:
+        with self._lock:
+            if len(self.errors) < self.MAX_ERRORS:
+                self.errors.append(error)
+
+    def finish(self, result: Any = None, message: str = '') -> None:
+        with self._lock:
+            self.status = 'cancelled' if self._cancel_event.is_set() else 'done'
+            self.result = result
+            self.message = message
+            self.finished_at = time.time()
+
+    def fail(self, error: str) -> None:
+        with self._lock:
+            self.status = 'failed'
+            self.message = error
+            if len(self.errors) < self.MAX_ERRORS:
+                self.errors.append(error)
+            self.finished_at = time.time()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed', 'cancelled')
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            elapsed_end = self.finished_at or time.time()
+            return {
+                'job_id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'total': self.total,
+                'processed': self.processed,
+                'progress': round(self.processed / self.total * 100, 1) if self.total else 0,
+                'errors': list(self.errors),
+                'message': self.message,
+                'result': self.result,
+                'elapsed': round(elapsed_end - self.started_at, 2) if self.started_at else 0,
+            }
+
+
+class JobRegistry:
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, kind: str, total: int = 0) -> Job:
+        job = Job(kind, total)
+        with self._lock:
+            self._jobs[job.id] = job
+            # 超出上限时丢弃最早的已结束任务
+            for job_id in list(self._jobs):
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                if self._jobs[job_id].finished:
+                    del self._jobs[job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def run_in_background(self, job: Job, target: Callable, *args, **kwargs) -> threading.Thread:
+        """在守护线程中执行 target(job, *args, **kwargs)，未捕获的异常记为任务失败"""
+        def run():
+            try:
+                target(job, *args, **kwargs)
+            except Exception as e:
+                traceback.print_exc()
+                job.fail(str(e))
+
+        thread = threading.Thread(target=run, name=f'{job.kind}-{job.id[:8]}', daemon=True)
+        thread.start()
+        return thread
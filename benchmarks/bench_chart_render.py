@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图表渲染耗时对比：每次新建 pyplot 图形 vs 复用图形模板
+
+默认在当前线程中直接调用渲染函数；--server 时启动与 app.run 相同的多线程开发服务器
+（每个请求一个新线程），通过 HTTP 请求图表接口，对比每次新建图形、
+每个线程各自构建模板（相当于原来的线程局部渲染器）和进程内共享的模板池。
+
+用法：python benchmarks/bench_chart_render.py [Excel文件] [--rounds N] [--server] [--concurrency N]
+"""
+
+import argparse
+import io
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from urllib.parse import quote
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 关闭图表缓存，每个请求都重新渲染；只测内存中的数据，不写快照和共享数据集
+os.environ['CHART_CACHE_MB'] = '0'
+os.environ['SNAPSHOT_DIR'] = ''
+os.environ['SHARED_DATASET_DIR'] = ''
+
+import app_updated_final2  # noqa: E402  使用与应用相同的字体配置
+import charts  # noqa: E402
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+from charts import CATEGORIES_EN, CATEGORIES_ZH, CHART_RENDERERS, ChartRenderer  # noqa: E402
+from updated_data_processor_new import UpdatedDataProcessor  # noqa: E402
+
+
+# 对比基准：每次新建 pyplot 图形的原实现（应用中已改用 charts.ChartRenderer 的模板）
+
+def _figure_to_png(fig) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_radar_chart(company: Dict, use_chinese: bool) -> bytes:
+    """五维度评分雷达图"""
+    categories = CATEGORIES_ZH if use_chinese else CATEGORIES_EN
+    values = [
+        company['scores']['market_value'] / 6 * 100,
+        company['scores']['rd_innovation'] / 12 * 100,
+        company['scores']['smart_manufacturing'] / 6 * 100,
+        company['scores']['green_manufacturing'] / 8 * 100,
+        company['scores']['credit_level'] / 4  * 100
+    ]
+
+    # 闭合雷达图
+    values += values[:1]
+    angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
+    angles += angles[:1]
+
+    fig, ax = plt.subplots(figsize=(4, 4), subplot_kw=dict(projection='polar'))
+    ax.plot(angles, values, 'o-', linewidth=2, color='#3b82f6')
+    ax.fill(angles, values, alpha=0.25, color='#3b82f6')
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories)
+    ax.set_ylim(0, 100)
+    ax.set_yticks([20, 40, 60, 80, 100])
+    ax.set_yticklabels(['20%', '40%', '60%', '80%', '100%'])
+    ax.grid(True)
+
+    title = f"{company['name']} - 五维度评分雷达图" if use_chinese else f"{company['name']} - Five-Dimension Radar Chart"
+    ax.set_title(title, size=12, weight='bold', pad=20)
+
+    return _figure_to_png(fig)
+
+
+def render_score_chart(company: Dict, use_chinese: bool) -> bytes:
+    """各类别得分与满分对比柱状图"""
+    categories = CATEGORIES_ZH if use_chinese else CATEGORIES_EN
+    current_scores = [
+        company['scores']['market_value'],
+        company['scores']['rd_innovation'],
+        company['scores']['smart_manufacturing'],
+        company['scores']['green_manufacturing'],
+        company['scores']['credit_level']
+    ]
+    max_scores = [6, 12, 6, 8, 4]
+
+    x = np.arange(len(categories))
+    width = 0.45
+
+    fig, ax = plt.subplots(figsize=(5, 3))
+    bars1 = ax.bar(x - width/2, current_scores, width, label='当前得分' if use_chinese else 'Current Score', color='#3b82f6')
+    ax.bar(x + width/2, max_scores, width, label='满分' if use_chinese else 'Max Score', color='#e5e7eb')
+
+    ax.set_xlabel('评分类别' if use_chinese else 'Score Categories')
+    ax.set_ylabel('分数' if use_chinese else 'Score')
+    ax.set_title(f"{company['name']} - 总分完成度" if use_chinese else f"{company['name']} - Score Breakdown Chart")
+    ax.set_xticks(x)
+    ax.set_xticklabels(categories, rotation=45, ha='right')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+
+    # 添加数值标签
+    for bar in bars1:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+            f'{height}', ha='center', va='bottom')
+
+    fig.tight_layout()
+
+    return _figure_to_png(fig)
+
+
+def render_donut_chart(company: Dict, use_chinese: bool) -> bytes:
+    """总分完成度环形图"""
+    total_score = company['scores']['total']
+    max_total = 36  # 6+12+6+8+6
+    percentage = total_score / max_total * 100
+
+    sizes = [percentage, 100 - percentage]
+    labels = ['已完成', '未完成'] if use_chinese else ['Completed', 'Remaining']
+    colors = ['#3b82f6', '#e5e7eb']
+
+    fig, ax = plt.subplots(figsize=(4, 4))
+    wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%',
+                                    startangle=90, pctdistance=0.85)
+
+    # 创建环形图
+    centre_circle = plt.Circle((0,0), 0.70, fc='white')
+    ax.add_artist(centre_circle)
+
+    # 在中心添加总分
+    ax.text(0, 0, f'{total_score}/{max_total}', ha='center', va='center',
+            fontsize=20, weight='bold', color='#1f2937')
+
+    title = f"{company['name']} - 总分完成度" if use_chinese else f"{company['name']} - Total Score Completion"
+    ax.set_title(title, size=12, weight='bold', pad=20)
+
+    return _figure_to_png(fig)
+
+
+# 图表类型 -> 每次新建图形的参考实现
+LEGACY_CHART_RENDERERS = {
+    'radar': render_radar_chart,
+    'score': render_score_chart,
+    'donut': render_donut_chart,
+}
+
+
+def measure(render, companies, use_chinese, rounds):
+    """返回每张图的耗时（毫秒），渲染失败的企业不计入"""
+    timings = []
+    for _ in range(rounds):
+        for company in companies:
+            start = time.perf_counter()
+            try:
+                render(company, use_chinese)
+            except ValueError:
+                continue
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summary(timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.mean(timings), statistics.median(timings), p95
+
+
+def per_thread_renderer(chart_type):
+    """每个线程各自构建模板；开发服务器每个请求一个新线程，因此每次请求都重建模板"""
+    def render(company, use_chinese):
+        return ChartRenderer().render(chart_type, company, use_chinese)
+    return render
+
+
+def measure_server(file, rounds, concurrency):
+    """通过多线程开发服务器请求图表接口，打印各实现的耗时"""
+    import logging
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = app_updated_final2.app
+    with open(file, 'rb') as f:
+        app.test_client().post('/api/upload', data={'file': (io.BytesIO(f.read()), os.path.basename(file))},
+                               content_type='multipart/form-data')
+    names = [company['name'] for company in app_updated_final2.current_store().companies]
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}/api/company/'
+
+    def fetch(url):
+        start = time.perf_counter()
+        try:
+            with urlopen(url) as response:
+                response.read()
+        except OSError:
+            # 渲染失败（HTTP 错误）的企业不计入
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    print(f'企业数: {len(names)}，轮数: {rounds}，并发请求: {concurrency}')
+    print(f"{'图表':<8}{'实现':<12}{'平均(ms)':>10}{'P50(ms)':>10}{'P95(ms)':>10}{'请求/秒':>10}")
+    original = dict(CHART_RENDERERS)
+    implementations = (('新建图形', lambda chart_type: LEGACY_CHART_RENDERERS[chart_type]),
+                       ('线程内模板', per_thread_renderer),
+                       ('共享模板池', lambda chart_type: original[chart_type]))
+    try:
+        for chart_type in original:
+            urls = [f'{base}{quote(name)}/chart/{chart_type}' for name in names] * rounds
+            for label, make_renderer in implementations:
+                CHART_RENDERERS[chart_type] = make_renderer(chart_type)
+                fetch(urls[0])  # 预热
+                start = time.perf_counter()
+                with ThreadPoolExecutor(concurrency) as pool:
+                    timings = [ms for ms in pool.map(fetch, urls) if ms is not None]
+                elapsed = time.perf_counter() - start
+                mean, p50, p95 = summary(timings)
+                print(f'{chart_type:<8}{label:<12}{mean:>10.1f}{p50:>10.1f}{p95:>10.1f}{len(urls) / elapsed:>10.1f}')
+    finally:
+        CHART_RENDERERS.update(original)
+        server.shutdown()
+    print(f'共享模板池中的模板数: {charts.get_renderer().template_count()}')
+
+
+def main():
+    default_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Book1.xlsx')
+    parser = argparse.ArgumentParser(description='图表渲染耗时对比')
+    parser.add_argument('file', nargs='?', default=default_file)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--english', action='store_true', help='使用英文标签')
+    parser.add_argument('--server', action='store_true', help='通过多线程开发服务器请求图表接口')
+    parser.add_argument('--concurrency', type=int, default=4, help='--server 时同时发出的请求数')
+    args = parser.parse_args()
+
+    if args.server:
+        measure_server(args.file, args.rounds, args.concurrency)
+        return
+
+    companies = UpdatedDataProcessor().parse_excel_data(args.file)
+    use_chinese = not args.english
+    print(f'企业数: {len(companies)}，轮数: {args.rounds}')
+    print(f"{'图表':<8}{'实现':<10}{'平均(ms)':>10}{'P50(ms)':>10}{'P95(ms)':>10}")
+
+    for chart_type in CHART_RENDERERS:
+        results = {}
+        for label, renderers in (('新建图形', LEGACY_CHART_RENDERERS), ('模板复用', CHART_RENDERERS)):
+            render = renderers[chart_type]
+            render(companies[0], use_chinese)  # 预热：字体加载、模板构建
+            results[label] = summary(measure(render, companies, use_chinese, args.rounds))
+            mean, p50, p95 = results[label]
+            print(f'{chart_type:<8}{label:<10}{mean:>10.1f}{p50:>10.1f}{p95:>10.1f}')
+        speedup = results['新建图形'][0] / results['模板复用'][0]
+        print(f'{chart_type:<8}{"加速比":<10}{speedup:>9.2f}x')
+
+
+if __name__ == '__main__':
+    main()
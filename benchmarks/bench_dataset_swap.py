@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据集切换压力测试：多个读取线程持续请求排行榜、统计、搜索和企业列表，
+同时上传线程在两份数据（A / B）之间反复上传，统计吞吐量并检查每个响应是否只来自同一代数据
+
+用法：python benchmarks/bench_dataset_swap.py [Excel文件] [--seconds N] [--readers N] [--uploaders N] [--copies N]
+"""
+
+import argparse
+import io
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 只测内存中的切换，不写快照和共享数据集
+os.environ['SNAPSHOT_DIR'] = ''
+os.environ['SHARED_DATASET_DIR'] = ''
+
+import pandas as pd  # noqa: E402
+
+import app_updated_final2 as app_module  # noqa: E402
+
+
+def make_dataset(df, tag, copies):
+    """复制表格 copies 份，企业名称加上数据集标记，返回CSV字节串"""
+    data = pd.concat([df] * copies, ignore_index=True)
+    data['企业名称'] = [f'{tag}-{i}-{name}' for i, name in enumerate(data['企业名称'])]
+    return data.to_csv(index=False).encode('utf-8')
+
+
+def upload(client, content, filename):
+    response = client.post('/api/upload', data={'file': (io.BytesIO(content), filename), 'limit': '0'},
+                           content_type='multipart/form-data')
+    return response.get_json()
+
+
+def same_tag(names):
+    """一组企业名称是否全部来自同一份数据，返回该数据集标记（不一致时返回 None）"""
+    tags = {name.split('-', 1)[0] for name in names}
+    return tags.pop() if len(tags) == 1 else None
+
+
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.uploads = 0
+        self.inconsistent = 0
+        self.errors = 0
+        self.samples = []
+
+    def add(self, field, sample=None):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + 1)
+            if sample is not None and len(self.samples) < 5:
+                self.samples.append(sample)
+
+
+def check_ranking(client, sizes):
+    data = client.get('/api/ranking?limit=50&fields=name,rank').get_json()['data']
+    names = [company['name'] for company in data['companies']]
+    tag = same_tag(names)
+    ranks = [company['rank'] for company in data['companies']]
+    return tag is not None and sizes.get(tag) == data['total'] and ranks == list(range(1, len(ranks) + 1))
+
+
+def check_statistics(client, expected):
+    data = client.get('/api/ranking-statistics').get_json()['data']
+    return data in expected.values()
+
+
+def check_search(client, sizes):
+    companies = client.get('/api/search-companies?q=TCL&limit=20&fields=name').get_json()['data']['companies']
+    return bool(companies) and same_tag(company['name'] for company in companies) is not None
+
+
+def check_list(client, sizes):
+    data = client.get('/api/companies?offset=5&limit=30&fields=name').get_json()
+    tag = same_tag(company['name'] for company in data['companies'])
+    return tag is not None and sizes.get(tag) == data['total']
+
+
+def main():
+    default_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Book1.xlsx')
+    parser = argparse.ArgumentParser(description='并发读取 + 反复上传时的吞吐量和一致性')
+    parser.add_argument('file', nargs='?', default=default_file)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--uploaders', type=int, default=2)
+    parser.add_argument('--copies', type=int, default=20, help='数据集 A 复制原表的份数（B 为 1.5 倍）')
+    args = parser.parse_args()
+
+    df = pd.read_excel(args.file)
+    datasets = {'A': make_dataset(df, 'A', args.copies), 'B': make_dataset(df, 'B', args.copies * 3 // 2)}
+
+    # 预先上传一次，记录每份数据的规模和完整统计结果作为比对基准
+    client = app_module.app.test_client()
+    sizes, expected = {}, {}
+    for tag, content in datasets.items():
+        sizes[tag] = upload(client, content, f'{tag}.csv')['total']
+        expected[tag] = client.get('/api/ranking-statistics').get_json()['data']
+
+    checks = [
+        lambda c: check_ranking(c, sizes),
+        lambda c: check_statistics(c, expected),
+        lambda c: check_search(c, sizes),
+        lambda c: check_list(c, sizes),
+    ]
+    counters = Counters()
+    deadline = time.perf_counter() + args.seconds
+
+    def reader(index):
+        reader_client = app_module.app.test_client()
+        i = index
+        while time.perf_counter() < deadline:
+            check = checks[i % len(checks)]
+            i += 1
+            try:
+                if check(reader_client):
+                    counters.add('reads')
+                else:
+                    counters.add('inconsistent', f'check #{i % len(checks)}')
+            except Exception as e:
+                counters.add('errors', repr(e))
+
+    def uploader(index):
+        uploader_client = app_module.app.test_client()
+        tags = list(datasets)
+        i = index
+        while time.perf_counter() < deadline:
+            tag = tags[i % len(tags)]
+            i += 1
+            result = upload(uploader_client, datasets[tag], f'{tag}.csv')
+            counters.add('uploads' if result.get('success') else 'errors', None if result.get('success') else result)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=uploader, args=(i,)) for i in range(args.uploaders)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"数据集规模: A={sizes['A']} B={sizes['B']}，读取线程: {args.readers}，上传线程: {args.uploaders}，"
+          f'时长: {elapsed:.1f}s')
+    print(f'读取请求  {counters.reads:>8}  ({counters.reads / elapsed:8.1f}/s)')
+    print(f'上传切换  {counters.uploads:>8}  ({counters.uploads / elapsed:8.1f}/s)')
+    print(f'不一致    {counters.inconsistent:>8}')
+    print(f'错误      {counters.errors:>8}')
+    for sample in counters.samples:
+        print(f'  {sample}')
+    sys.exit(1 if counters.inconsistent or counters.errors else 0)
+
+
+if __name__ == '__main__':
+    main()
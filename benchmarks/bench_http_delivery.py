@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应传输量和耗时：看板首页（每次渲染模板 vs 启动时渲染并预先压缩）、
+排行榜JSON（不压缩 / gzip / br，压缩结果是否来自缓存）以及 If-None-Match 命中时的304
+
+用法：python benchmarks/bench_http_delivery.py [Excel文件] [--copies N] [--requests N]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 只测内存中的数据，不写快照和共享数据集
+os.environ['SNAPSHOT_DIR'] = ''
+os.environ['SHARED_DATASET_DIR'] = ''
+
+import pandas as pd  # noqa: E402
+from flask import render_template_string  # noqa: E402
+
+import app_updated_final2 as app_module  # noqa: E402
+from http_delivery import ENCODINGS  # noqa: E402
+
+
+def timed(make_request, requests):
+    """返回 (最后一次响应, 平均耗时ms)"""
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = make_request()
+    return response, (time.perf_counter() - start) / requests * 1000
+
+
+def report(label, response, ms):
+    encoding = response.headers.get('Content-Encoding', '-')
+    print(f'{label:<24}{response.status_code:>6}{encoding:>8}{len(response.data) / 1024:>12.1f}{ms:>10.2f}')
+
+
+def main():
+    default_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Book1.xlsx')
+    parser = argparse.ArgumentParser(description='响应压缩和HTTP缓存效果')
+    parser.add_argument('file', nargs='?', default=default_file)
+    parser.add_argument('--copies', type=int, default=50, help='把原表复制多少份')
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    app = app_module.app
+    client = app.test_client()
+    df = pd.read_excel(args.file)
+    df = pd.concat([df] * args.copies, ignore_index=True)
+    df['企业名称'] = [f'{name}-{i}' for i, name in enumerate(df['企业名称'])]
+    client.post('/api/upload', data={'file': (io.BytesIO(df.to_csv(index=False).encode('utf-8')), 'data.csv'),
+                                     'limit': '0'}, content_type='multipart/form-data')
+
+    print(f'企业数: {len(df)}，每项请求 {args.requests} 次，可用编码: {", ".join(ENCODINGS)}')
+    print(f"{'请求':<24}{'状态':>6}{'编码':>8}{'响应(KB)':>12}{'ms/次':>10}")
+
+    # 首页：原来每次请求都渲染模板
+    def render_each_time():
+        with app.test_request_context('/'):
+            return app.response_class(render_template_string(app_module.HTML_TEMPLATE), mimetype='text/html')
+    report('首页 每次渲染', *timed(render_each_time, args.requests))
+    report('首页 预渲染', *timed(lambda: client.get('/'), args.requests))
+    for encoding in ENCODINGS:
+        report(f'首页 预压缩 {encoding}', *timed(lambda: client.get('/', headers={'Accept-Encoding': encoding}),
+                                               args.requests))
+    etag = client.get('/').headers['ETag']
+    report('首页 304', *timed(lambda: client.get('/', headers={'If-None-Match': etag}), args.requests))
+
+    url = '/api/ranking?filter=all&fields=all'
+    client.get(url)
+    report('排行榜 不压缩', *timed(lambda: client.get(url), args.requests))
+    for encoding in ENCODINGS:
+        # 第一次请求压缩并写入缓存，之后直接取缓存
+        report(f'排行榜 {encoding} 首次', *timed(lambda: client.get(url, headers={'Accept-Encoding': encoding}), 1))
+        report(f'排行榜 {encoding} 缓存', *timed(lambda: client.get(url, headers={'Accept-Encoding': encoding}),
+                                              args.requests))
+    etag = client.get(url).headers['ETag']
+    report('排行榜 304', *timed(lambda: client.get(url, headers={'If-None-Match': etag}), args.requests))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+/api/ranking?filter=all 的序列化吞吐量（字节/秒）和延迟（p50 / p99）：
+标准库 json vs orjson，每次重新编码 vs 拼接按数据集缓存的企业记录编码结果
+
+编码器和缓存在导入时由环境变量决定，每种方式在单独的子进程中测量。
+
+用法：python benchmarks/bench_json_payloads.py [Excel文件] [--copies N] [--requests N] [--fields all]
+"""
+
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MB = 1024 * 1024
+
+# (名称, 环境变量)
+CONFIGS = (
+    ('标准库 json，不缓存', {'JSON_ENCODER': 'json', 'PAYLOAD_CACHE_MB': '0'}),
+    ('orjson，不缓存', {'JSON_ENCODER': 'auto', 'PAYLOAD_CACHE_MB': '0'}),
+    ('orjson，片段缓存', {'JSON_ENCODER': 'auto', 'PAYLOAD_CACHE_MB': '256'}),
+)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+
+def measure(args):
+    """子进程：上传数据后反复请求排行榜，输出一行 JSON 结果"""
+    os.environ['SNAPSHOT_DIR'] = ''
+    os.environ['SHARED_DATASET_DIR'] = ''
+    import pandas as pd
+    import app_updated_final2 as app_module
+
+    df = pd.read_excel(args.file)
+    df = pd.concat([df] * args.copies, ignore_index=True)
+    df['企业名称'] = [f'{name}-{i}' for i, name in enumerate(df['企业名称'])]
+    client = app_module.app.test_client()
+    client.post('/api/upload', data={'file': (io.BytesIO(df.to_csv(index=False).encode('utf-8')), 'data.csv'),
+                                     'limit': '0'}, content_type='multipart/form-data')
+
+    url = f'/api/ranking?filter=all&fields={args.fields}'
+    # 预热：第一次请求构建排行榜视图（缓存开启时同时填满片段缓存）
+    client.get(url)
+    latencies, size = [], 0
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        response = client.get(url)
+        latencies.append(time.perf_counter() - start)
+        size = len(response.data)
+
+    print(json.dumps({
+        'encoder': app_module.JSON_ENCODER,
+        'companies': len(df),
+        'bytes': size,
+        'total_time': sum(latencies),
+        'p50': percentile(latencies, 0.5),
+        'p99': percentile(latencies, 0.99),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='排行榜接口序列化吞吐量和延迟')
+    parser.add_argument('file', nargs='?', default=os.path.join(ROOT, 'Book1.xlsx'))
+    parser.add_argument('--copies', type=int, default=50, help='把原表复制多少份')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--fields', default='summary', help='fields 参数：summary / all / 逗号分隔的字段')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args)
+        return
+
+    command = [sys.executable, os.path.abspath(__file__), args.file, '--copies', str(args.copies),
+               '--requests', str(args.requests), '--fields', args.fields, '--child']
+    print(f'请求: /api/ranking?filter=all&fields={args.fields}，次数: {args.requests}')
+    print(f"{'方式':<20}{'编码器':>8}{'响应(KB)':>10}{'MB/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}")
+    for label, env in CONFIGS:
+        output = subprocess.run(command, env=dict(os.environ, **env), capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        throughput = result['bytes'] * args.requests / result['total_time'] / MB
+        print(f"{label:<20}{result['encoder']:>8}{result['bytes'] / 1024:>10.1f}{throughput:>10.1f}"
+              f"{result['p50'] * 1000:>10.2f}{result['p99'] * 1000:>10.2f}")
+    print(f"企业数: {result['companies']}")
+
+
+if __name__ == '__main__':
+    main()
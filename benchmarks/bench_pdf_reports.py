@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF报告吞吐量（每秒报告数）：每份报告重新绘图 vs 从图表缓存取图 vs 纯文字
+
+用法：python benchmarks/bench_pdf_reports.py [Excel文件] [--rounds N] [--english]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 不加载也不写入快照和共享数据集
+os.environ['SNAPSHOT_DIR'] = ''
+os.environ['SHARED_DATASET_DIR'] = ''
+
+import app_updated_final2  # noqa: E402,F401  使用与应用相同的字体配置
+from chart_cache import ChartCache  # noqa: E402
+from charts import CHART_RENDERERS  # noqa: E402
+from pdf_reports import cached_charts, render_company_pdf, render_missing_charts, store_charts  # noqa: E402
+from updated_data_processor_new import UpdatedDataProcessor  # noqa: E402
+
+
+def throughput(make_report, companies, rounds):
+    """返回每秒生成的报告数"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for company in companies:
+            make_report(company)
+    return rounds * len(companies) / (time.perf_counter() - start)
+
+
+def main():
+    default_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Book1.xlsx')
+    parser = argparse.ArgumentParser(description='PDF报告吞吐量对比')
+    parser.add_argument('file', nargs='?', default=default_file)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--english', action='store_true', help='使用英文标签')
+    args = parser.parse_args()
+
+    companies = UpdatedDataProcessor().parse_excel_data(args.file)
+    use_chinese = not args.english
+    cache = ChartCache()
+
+    def rerender(company):
+        return render_company_pdf(company, render_missing_charts(company, {}, use_chinese))
+
+    def from_cache(company):
+        charts = cached_charts(cache, company, use_chinese)
+        rendered = render_missing_charts(company, charts, use_chinese)
+        store_charts(cache, company, rendered, use_chinese)
+        return render_company_pdf(company, dict(charts, **rendered))
+
+    def text_only(company):
+        return render_company_pdf(company)
+
+    # 预热：字体加载、图表模板构建；图表缓存预先填满，模拟上传后已预渲染的情况
+    for company in companies:
+        from_cache(company)
+    for render in CHART_RENDERERS.values():
+        try:
+            render(companies[0], use_chinese)
+        except ValueError:
+            pass
+
+    print(f'企业数: {len(companies)}，轮数: {args.rounds}')
+    print(f"{'方式':<14}{'报告/秒':>10}")
+    results = {}
+    for label, make_report in (('每份报告重新绘图', rerender), ('图表缓存取图', from_cache), ('纯文字', text_only)):
+        results[label] = throughput(make_report, companies, args.rounds)
+        print(f'{label:<14}{results[label]:>10.1f}')
+    print(f"{'缓存加速比':<14}{results['图表缓存取图'] / results['每份报告重新绘图']:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
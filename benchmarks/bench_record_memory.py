@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+企业记录内存占用：字典列表 vs 紧凑记录（CompactRecords），以每MB可容纳的记录数比较，
+并给出紧凑记录按位置组装一条字典的耗时
+
+用法：python benchmarks/bench_record_memory.py [Excel文件] [--copies N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+
+from compact_records import CompactRecords  # noqa: E402
+from updated_data_processor_new import UpdatedDataProcessor  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def traced() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main():
+    default_file = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Book1.xlsx')
+    parser = argparse.ArgumentParser(description='企业记录内存占用对比')
+    parser.add_argument('file', nargs='?', default=default_file)
+    parser.add_argument('--copies', type=int, default=200, help='把原表复制多少份')
+    args = parser.parse_args()
+
+    df = pd.read_excel(args.file)
+    df = pd.concat([df] * args.copies, ignore_index=True)
+    df['企业名称'] = [f'{name}-{i}' for i, name in enumerate(df['企业名称'])]
+    processor = UpdatedDataProcessor()
+
+    tracemalloc.start()
+    base = traced()
+    companies = processor.process_dataframe(df, mode='columnar')
+    for rank, company in enumerate(companies, 1):
+        company['rank'] = rank
+    dict_bytes = traced() - base
+
+    compact = CompactRecords(companies)
+    del companies
+    compact_bytes = traced() - base
+    tracemalloc.stop()
+
+    count = len(compact)
+    print(f'记录数: {count}')
+    print(f"{'存储方式':<16}{'内存(MB)':>10}{'记录/MB':>10}")
+    print(f"{'字典列表':<16}{dict_bytes / MB:>10.2f}{count / (dict_bytes / MB):>10.0f}")
+    print(f"{'CompactRecords':<16}{compact_bytes / MB:>10.2f}{count / (compact_bytes / MB):>10.0f}")
+    print(f'压缩比: {dict_bytes / compact_bytes:.1f}x')
+
+    start = time.perf_counter()
+    for i in range(count):
+        compact.to_json(i)
+    elapsed = time.perf_counter() - start
+    print(f'to_json 组装: {elapsed / count * 1e6:.1f} µs/条')
+
+
+if __name__ == '__main__':
+    main()
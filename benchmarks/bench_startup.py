@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时：在全新的解释器中冷导入数据处理器和应用模块
+
+用法：python benchmarks/bench_startup.py [--rounds N] [--root 代码目录]
+--root 可指向另一份代码（如旧版本的 git worktree）做对比。
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = ['updated_data_processor_new', 'app_updated_final2']
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'matplotlib.pyplot', 'seaborn', 'reportlab']
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def cold_import(root, module):
+    """在子进程中导入模块，返回 (耗时秒数, 已导入的重量级库)"""
+    output = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=root, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['elapsed'], result['loaded']
+
+
+def main():
+    default_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description='模块冷启动耗时')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--root', default=default_root)
+    args = parser.parse_args()
+
+    print(f'代码目录: {args.root}，轮数: {args.rounds}')
+    for module in MODULES:
+        timings = []
+        loaded = []
+        for _ in range(args.rounds):
+            elapsed, loaded = cold_import(args.root, module)
+            timings.append(elapsed * 1000)
+        print(f'{module:<30} 平均 {statistics.mean(timings):7.1f} ms  '
+              f'最小 {min(timings):7.1f} ms  已导入: {", ".join(loaded) or "-"}')
+
+
+if __name__ == '__main__':
+    main()
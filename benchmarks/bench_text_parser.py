@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化文字解析耗时：原先逐行 re.match/re.sub 的实现 vs text_parser 预编译单次扫描
+
+语料：TCL 演示数据的五段文字，以及按同样格式随机生成的大规模语料。
+用法：python benchmarks/bench_text_parser.py [--cells N] [--rounds N]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_parser import parse_main_products, parse_numbered_list, parse_text_column, parse_vip_products
+
+TCL_TEXTS = {
+    'numbered': '1.TCL电视出货量全球第二\n2.TCL空调出货量全球第四\n3.TCL Mini LED电商中国市场全渠道零售量及零售额冠军\n4.雷鸟智能眼镜国内消费级市场AR产品排名第一\n5.近六年研发投入超过600亿元',
+    'main_products': '1.个人及家庭产品：电视、空调、冰箱、洗衣机、智能门锁、灵悉套系家电、智能穿戴\n2.企业及商用产品：电视、冰箱、空调、洗衣机、商用显示、中央空调',
+    'vip_products': '一、\n1.【QM8K MiniLED 系列电视（5月）】：搭载WHVA面板、配备可播放杜比全景声的上置扬声器\n2.【X11K 超大尺寸电视】：采用14k区Halo Control和B&O音频技术\n二、\n1.【Q9L Pro/Q10L Pro 系列】：京东家电品牌榜、天猫大家电成交榜榜首\n2.【T7L 系列】：首销期在电商平台销量稳居 TOP3\n三、\n1.【TCL 智屏】：2024年一季度，TCL 电视国际市场出货量同比增长21.2%\n2.【新风空调】：表现强劲，市场份额逐步扩大',
+}
+
+
+# ---- 原先的实现（每次调用都按字符串查找正则缓存，逐行多次匹配） ----
+
+def legacy_numbered(text):
+    if not text or text == 'nan':
+        return []
+    items = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if re.match(r'^\d+\.', line):
+            content = re.sub(r'^\d+\.', '', line).strip()
+            if content:
+                items.append(content)
+    return items
+
+
+def legacy_main_products(text):
+    if not text or text == 'nan':
+        return {}
+    categories = {}
+    pattern = re.compile(r'\d+\.\s*([^：]+)：([^0-9]+)')
+    for category, products_text in pattern.findall(text):
+        category = category.strip()
+        products = re.split(r'[，、]', products_text)
+        products = [p.strip() for p in products if p.strip()]
+        if category and products:
+            categories[category] = products
+    return categories
+
+
+def legacy_vip_products(text):
+    if not text or text == 'nan':
+        return {}
+    result = {}
+    sections = re.split(r'[一二三]、', text)
+    section_names = ['新品', '爆品', '热卖品']
+    for i, section in enumerate(sections[1:]):
+        if i < len(section_names) and section.strip():
+            products = []
+            for line in re.split(r'\n\d+\.', section):
+                line = line.strip()
+                if line:
+                    series_match = re.search(r'【([^】]+)】', line)
+                    series_name = series_match.group(1) if series_match else ''
+                    description = re.sub(r'【[^】]+】', '', line).strip()
+                    description = re.sub(r'^\d+\.', '', description).strip()
+                    if description:
+                        products.append({'series': series_name, 'description': description})
+            if products:
+                result[section_names[i]] = products
+    return result
+
+
+PARSERS = {
+    'numbered': (legacy_numbered, parse_numbered_list),
+    'main_products': (legacy_main_products, parse_main_products),
+    'vip_products': (legacy_vip_products, parse_vip_products),
+}
+
+
+def synthetic_corpus(kind, cells, rng):
+    words = ['智能', '电视', '空调', '冰箱', '光伏', '储能', '芯片', '机器人', '新能源', '显示', '家电', '物联网']
+
+    def phrase(n):
+        return ''.join(rng.choice(words) for _ in range(n))
+
+    corpus = []
+    for _ in range(cells):
+        if rng.random() < 0.1:
+            corpus.append('nan')
+        elif kind == 'numbered':
+            corpus.append('\n'.join(f'{i}.{phrase(rng.randint(3, 10))}' for i in range(1, rng.randint(2, 12))))
+        elif kind == 'main_products':
+            corpus.append('\n'.join(f'{i}.{phrase(2)}产品：' + '、'.join(phrase(2) for _ in range(rng.randint(2, 8)))
+                                    for i in range(1, rng.randint(2, 6))))
+        else:
+            sections = []
+            for marker in '一二三':
+                items = '\n'.join(f'{i}.【{phrase(2)}系列】：{phrase(rng.randint(4, 12))}'
+                                  for i in range(1, rng.randint(2, 5)))
+                sections.append(f'{marker}、\n{items}')
+            corpus.append('\n'.join(sections))
+    return corpus
+
+
+def timed(parser, texts, rounds):
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        parse_text_column(parser, texts)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='结构化文字解析耗时对比')
+    parser.add_argument('--cells', type=int, default=50000, help='合成语料的单元格数')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(f"{'语料':<28}{'原实现(ms)':>12}{'新实现(ms)':>12}{'加速比':>8}")
+    for kind, (legacy, current) in PARSERS.items():
+        corpora = [
+            (f'TCL演示/{kind} x1000', [TCL_TEXTS[kind]] * 1000),
+            (f'合成/{kind} x{args.cells}', synthetic_corpus(kind, args.cells, rng)),
+        ]
+        for label, texts in corpora:
+            assert parse_text_column(legacy, texts) == parse_text_column(current, texts)
+            before = timed(legacy, texts, args.rounds)
+            after = timed(current, texts, args.rounds)
+            print(f'{label:<28}{before * 1000:>12.1f}{after * 1000:>12.1f}{before / after:>7.2f}x')
+
+
+if __name__ == '__main__':
+    main()
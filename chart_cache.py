@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图表缓存 - 按内存预算淘汰的 LRU 缓存
+
+缓存键为 (图表类型, 企业名称, 评分元组, 是否中文)，值为渲染好的PNG。
+每个条目同时保存 ETag，base64 文本在第一次需要时才生成。
+"""
+
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+
+class ChartEntry:
+    __slots__ = ('png', 'etag', '_base64')
+
+    def __init__(self, png: bytes):
+        self.png = png
+        self.etag = hashlib.sha1(png).hexdigest()
+        self._base64 = None
+
+    @property
+    def base64(self) -> str:
+        """兼容现有前端的 base64 文本"""
+        if self._base64 is None:
+            self._base64 = base64.b64encode(self.png).decode()
+        return self._base64
+
+    @property
+    def size(self) -> int:
+        return len(self.png)
+
+
+class ChartCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        """是否已缓存（不影响LRU顺序和命中统计）"""
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[ChartEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, png: bytes) -> ChartEntry:
+        entry = ChartEntry(png)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            # 单张图超过整个预算时不缓存
+            if entry.size <= self.max_bytes:
+                self._entries[key] = entry
+                self._bytes += entry.size
+                self._evict()
+        return entry
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> ChartEntry:
+        """命中则直接返回，否则渲染后写入缓存（渲染在锁外进行）"""
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, render())
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
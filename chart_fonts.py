@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图表中文字体 - 通过 font_manager.findfont 查找可用的中文字体，结果缓存到磁盘
+
+启动时只读取缓存文件，不导入 matplotlib；缓存失效（候选字体变化、字体文件被删除、
+系统字体目录有变动）时才调用 findfont 重新查找。
+缓存文件位置可通过环境变量 FONT_CACHE_FILE 指定，设为空字符串则不使用磁盘缓存。
+"""
+
+import json
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+CHINESE_FONTS = ['Hiragino Sans GB', 'STHeiti', 'Hei', 'Microsoft YaHei', 'Arial Unicode MS']
+
+# 安装字体后这些目录的修改时间会变化，用于判断缓存是否过期
+_FONT_DIRS = [
+    '/usr/share/fonts',
+    '/usr/local/share/fonts',
+    '~/.fonts',
+    '~/.local/share/fonts',
+    '/Library/Fonts',
+    '/System/Library/Fonts',
+    '~/Library/Fonts',
+    os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts'),
+]
+
+_DEFAULT_CACHE_FILE = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'vip_kanban', 'chinese_font.json')
+FONT_CACHE_FILE = os.environ.get('FONT_CACHE_FILE', _DEFAULT_CACHE_FILE)
+
+_lock = threading.Lock()
+_resolved: Dict[str, Optional[str]] = {}
+
+
+def _font_dirs_fingerprint() -> List:
+    fingerprint = []
+    for directory in _FONT_DIRS:
+        directory = os.path.expanduser(directory)
+        try:
+            fingerprint.append([directory, os.stat(directory).st_mtime])
+        except OSError:
+            continue
+    return fingerprint
+
+
+def _read_cache(candidates: List[str], fingerprint: List) -> Optional[Dict]:
+    if not FONT_CACHE_FILE:
+        return None
+    try:
+        with open(FONT_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('candidates') != candidates or cached.get('font_dirs') != fingerprint:
+        return None
+    if cached.get('path') and not os.path.exists(cached['path']):
+        return None
+    return cached
+
+
+def _write_cache(entry: Dict) -> None:
+    if not FONT_CACHE_FILE:
+        return
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE_FILE), exist_ok=True)
+        tmp_file = f'{FONT_CACHE_FILE}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_file, FONT_CACHE_FILE)
+    except OSError as e:
+        print(f"⚠️ 字体缓存写入失败: {str(e)}", file=sys.stderr)
+
+
+def _find_font(candidates: List[str]) -> Dict:
+    """按顺序用 findfont 查找候选字体，不回退到默认字体"""
+    from matplotlib import font_manager
+
+    for name in candidates:
+        try:
+            path = font_manager.findfont(font_manager.FontProperties(family=name), fallback_to_default=False)
+        except ValueError:
+            continue
+        return {'font': name, 'path': path}
+    return {'font': None, 'path': None}
+
+
+def resolve_chinese_font(candidates: Optional[List[str]] = None) -> Optional[str]:
+    """返回第一个可用的中文字体名称，没有则返回 None"""
+    candidates = list(candidates or CHINESE_FONTS)
+    key = '\n'.join(candidates)
+    with _lock:
+        if key in _resolved:
+            return _resolved[key]
+
+        fingerprint = _font_dirs_fingerprint()
+        entry = _read_cache(candidates, fingerprint)
+        if entry is None:
+            entry = _find_font(candidates)
+            entry.update(candidates=candidates, font_dirs=fingerprint)
+            _write_cache(entry)
+
+        _resolved[key] = entry['font']
+        return entry['font']
+
+
+def configure_fonts(rc_params, candidates: Optional[List[str]] = None) -> Optional[str]:
+    """把找到的中文字体写入 matplotlib rcParams，返回字体名称"""
+    font_name = resolve_chinese_font(candidates)
+    if font_name:
+        rc_params['font.sans-serif'] = [font_name]
+    rc_params['axes.unicode_minus'] = False
+    return font_name
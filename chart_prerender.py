@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图表预渲染 - 上传完成后用进程池按排名顺序批量渲染企业的三种图表
+
+matplotlib 渲染是CPU密集型且受GIL限制，因此放到独立进程中并行执行，
+渲染结果写入图表缓存，/api/generate-*-chart 直接从缓存读取。
+预渲染的图表总量不超过缓存的剩余容量（再多只会把已缓存的图表和排名靠前的图表挤出缓存），
+容量用完后不再提交新的批次；也可以只预渲染排名前 limit 家企业。跳过的企业在请求时再渲染。
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import matplotlib
+
+from background_jobs import Job
+from chart_cache import ChartCache
+from charts import CHART_RENDERERS, chart_cache_key
+
+# 需要同步到子进程的字体配置
+_FONT_RC_KEYS = ('font.family', 'font.sans-serif', 'axes.unicode_minus')
+
+
+def _init_worker(rc_params: Dict) -> None:
+    """子进程初始化：使用与主进程相同的字体配置，保证图表一致"""
+    matplotlib.rcParams.update(rc_params)
+
+
+def _render_batch(companies: List[Dict], use_chinese: bool) -> Tuple[List[Tuple[Tuple, bytes]], List[str]]:
+    """在子进程中渲染一批企业的全部图表，单张图失败不影响其他图表"""
+    results = []
+    errors = []
+    for company in companies:
+        for chart_type, render in CHART_RENDERERS.items():
+            try:
+                results.append((chart_cache_key(chart_type, company, use_chinese), render(company, use_chinese)))
+            except Exception as e:
+                errors.append(f"{company['name']}({chart_type}): {str(e)}")
+    return results, errors
+
+
+def prerender_charts(job: Job, companies: List[Dict], use_chinese: bool, cache: ChartCache,
+                     max_workers: Optional[int] = None, batch_size: int = 8, limit: Optional[int] = None) -> None:
+    """按 companies 的顺序（排名）预渲染图表并写入缓存，进度记录在 job 中
+
+    只处理前 limit 家企业；写入的图表总量达到缓存剩余容量后停止提交新批次，其余企业计入跳过数量。
+    """
+    candidates = companies if limit is None else companies[:limit]
+    # 只传递绘图需要的字段，减少进程间传输；已在缓存中的企业跳过
+    pending = [
+        {'name': c['name'], 'scores': c['scores']}
+        for c in candidates
+        if not all(chart_cache_key(chart_type, c, use_chinese) in cache for chart_type in CHART_RENDERERS)
+    ]
+    job.start(total=len(companies))
+    job.advance(len(candidates) - len(pending))
+
+    rc_params = {key: matplotlib.rcParams[key] for key in _FONT_RC_KEYS}
+    batches = deque(pending[i:i + batch_size] for i in range(0, len(pending), batch_size))
+    rendered = 0
+    budget = max(cache.max_bytes - cache.stats()['bytes'], 0)
+    skipped = len(companies) - len(candidates)
+    # 同时在进程池中的批次数：足够让每个进程都有活干，又不会在容量用完后多渲染太多
+    window = 2 * (max_workers or os.cpu_count() or 1)
+
+    if batches:
+        # 使用 spawn 启动子进程，避免在多线程的Web进程中 fork
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(rc_params,)) as executor:
+            in_flight = deque()
+            full = False
+            while batches or in_flight:
+                while batches and len(in_flight) < window:
+                    batch = batches.popleft()
+                    in_flight.append((executor.submit(_render_batch, batch, use_chinese), batch))
+                # 按提交顺序收取结果，容量用完时保留的是排名靠前的企业
+                future, batch = in_flight.popleft()
+                if job.cancelled:
+                    future.cancel()
+                    for other, _ in in_flight:
+                        other.cancel()
+                    break
+                try:
+                    results, errors = future.result()
+                except Exception as e:
+                    names = '、'.join(c['name'] for c in batch)
+                    job.add_error(f'{names}: {str(e)}')
+                    job.advance(len(batch))
+                    continue
+                for error in errors:
+                    job.add_error(error)
+                # 缓存键的第二项是企业名称，按企业整体写入
+                charts_by_name = {}
+                for key, png in results:
+                    charts_by_name.setdefault(key[1], []).append((key, png))
+                stored = 0
+                for company in batch:
+                    company_charts = charts_by_name.get(company['name'], [])
+                    size = sum(len(png) for _, png in company_charts)
+                    if size > budget:
+                        full = True
+                        break
+                    for key, png in company_charts:
+                        cache.put(key, png)
+                    rendered += len(company_charts)
+                    budget -= size
+                    stored += 1
+                job.advance(stored)
+                if full:
+                    # 容量已用完：不再提交新批次，取消尚未开始的批次
+                    for other, _ in in_flight:
+                        other.cancel()
+                    skipped += (len(batch) - stored + sum(len(rest) for _, rest in in_flight)
+                                + sum(len(rest) for rest in batches))
+                    break
+
+    job.advance(skipped)
+    message = f'已预渲染 {rendered} 张图表'
+    if skipped:
+        message += f'，{skipped} 家企业超出预渲染范围，将在请求时渲染'
+    job.finish(result={'rendered_charts': rendered, 'skipped_companies': skipped}, message=message)
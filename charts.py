@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+企业评分图表绘制 - 雷达图、评分柱状图、总分环形图
+
+每个绘制函数接收企业数据和是否使用中文，返回PNG字节。
+
+ChartRenderer 为每种图表预先构建图形模板（面向对象的 Figure API，不依赖 pyplot 全局状态），
+绘制时只更新数据相关的图元，CHART_RENDERERS 使用这一实现。模板在进程内共享：
+每次绘制借出一个空闲模板（并发绘制时按需新建），用完归还，
+开发服务器每个请求一个新线程时也能复用已构建的模板。
+每次新建 pyplot 图形的原实现保留在 benchmarks/bench_chart_render.py 中作为对比基准。
+"""
+
+import io
+import math
+import threading
+from typing import Dict, Tuple
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+
+from chart_fonts import configure_fonts
+
+configure_fonts(matplotlib.rcParams)
+
+
+# 参与图表的评分字段（用于缓存键）
+CHART_SCORE_FIELDS = ('market_value', 'rd_innovation', 'smart_manufacturing',
+                      'green_manufacturing', 'credit_level', 'total')
+
+CATEGORIES_ZH = ['市场价值', '研发创新', '智能制造', '绿色制造', '信用水平']
+CATEGORIES_EN = ['Market Value', 'R&D Innovation', 'Smart Mfg', 'Green Mfg', 'Credit Level']
+
+
+def chart_cache_key(chart_type: str, company: Dict, use_chinese: bool) -> Tuple:
+    """图表缓存键：(图表类型, 企业名称, 评分元组, 是否中文)"""
+    scores = company['scores']
+    return (chart_type, company['name'],
+            tuple(scores[field] for field in CHART_SCORE_FIELDS), bool(use_chinese))
+
+
+def _new_figure(figsize) -> Figure:
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _template_png(fig: Figure) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+class _RadarTemplate:
+    """雷达图模板：只更新折线、填充区域和标题"""
+
+    def __init__(self, use_chinese: bool):
+        self.use_chinese = use_chinese
+        categories = CATEGORIES_ZH if use_chinese else CATEGORIES_EN
+        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
+        self.angles = angles + angles[:1]
+        zeros = [0] * len(self.angles)
+
+        self.fig = _new_figure((4, 4))
+        ax = self.fig.add_subplot(projection='polar')
+        self.line, = ax.plot(self.angles, zeros, 'o-', linewidth=2, color='#3b82f6')
+        self.fill, = ax.fill(self.angles, zeros, alpha=0.25, color='#3b82f6')
+        ax.set_xticks(self.angles[:-1])
+        ax.set_xticklabels(categories)
+        ax.set_ylim(0, 100)
+        ax.set_yticks([20, 40, 60, 80, 100])
+        ax.set_yticklabels(['20%', '40%', '60%', '80%', '100%'])
+        ax.grid(True)
+        self.title = ax.set_title('', size=12, weight='bold', pad=20)
+
+    def render(self, company: Dict) -> bytes:
+        scores = company['scores']
+        values = [
+            scores['market_value'] / 6 * 100,
+            scores['rd_innovation'] / 12 * 100,
+            scores['smart_manufacturing'] / 6 * 100,
+            scores['green_manufacturing'] / 8 * 100,
+            scores['credit_level'] / 4 * 100
+        ]
+        values += values[:1]
+
+        self.line.set_ydata(values)
+        self.fill.set_xy(np.column_stack([self.angles, values]))
+        self.title.set_text(f"{company['name']} - 五维度评分雷达图" if self.use_chinese
+                            else f"{company['name']} - Five-Dimension Radar Chart")
+        return _template_png(self.fig)
+
+
+class _ScoreTemplate:
+    """评分柱状图模板：只更新得分柱高度、数值标签和标题"""
+
+    def __init__(self, use_chinese: bool):
+        self.use_chinese = use_chinese
+        categories = CATEGORIES_ZH if use_chinese else CATEGORIES_EN
+        x = np.arange(len(categories))
+        width = 0.45
+
+        self.fig = _new_figure((5, 3))
+        pars = self.fig.subplotpars
+        self._subplot_params = dict(left=pars.left, right=pars.right, bottom=pars.bottom, top=pars.top)
+        ax = self.ax = self.fig.add_subplot()
+        self.bars = ax.bar(x - width/2, [0] * len(categories), width,
+                           label='当前得分' if use_chinese else 'Current Score', color='#3b82f6')
+        ax.bar(x + width/2, [6, 12, 6, 8, 4], width, label='满分' if use_chinese else 'Max Score', color='#e5e7eb')
+
+        ax.set_xlabel('评分类别' if use_chinese else 'Score Categories')
+        ax.set_ylabel('分数' if use_chinese else 'Score')
+        self.title = ax.set_title('')
+        ax.set_xticks(x)
+        ax.set_xticklabels(categories, rotation=45, ha='right')
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+
+        self.labels = [ax.text(bar.get_x() + bar.get_width()/2., 0.1, '', ha='center', va='bottom')
+                       for bar in self.bars]
+
+    def render(self, company: Dict) -> bytes:
+        scores = company['scores']
+        current_scores = [
+            scores['market_value'],
+            scores['rd_innovation'],
+            scores['smart_manufacturing'],
+            scores['green_manufacturing'],
+            scores['credit_level']
+        ]
+        for bar, label, height in zip(self.bars, self.labels, current_scores):
+            bar.set_height(height)
+            label.set_y(height + 0.1)
+            label.set_text(f'{height}')
+        self.ax.relim()
+        self.ax.autoscale_view()
+
+        self.title.set_text(f"{company['name']} - 总分完成度" if self.use_chinese
+                            else f"{company['name']} - Score Breakdown Chart")
+        # 标题长度随企业变化，布局需从默认边距出发按当前文字重新计算
+        self.fig.subplots_adjust(**self._subplot_params)
+        self.fig.tight_layout()
+        return _template_png(self.fig)
+
+
+class _DonutTemplate:
+    """环形图模板：按 Axes.pie 的几何规则更新扇区角度、标签位置、中心文字和标题"""
+
+    MAX_TOTAL = 36  # 6+12+6+8+6
+    START_ANGLE = 90
+    LABEL_DISTANCE = 1.1
+    PCT_DISTANCE = 0.85
+
+    def __init__(self, use_chinese: bool):
+        self.use_chinese = use_chinese
+        labels = ['已完成', '未完成'] if use_chinese else ['Completed', 'Remaining']
+        colors = ['#3b82f6', '#e5e7eb']
+
+        self.fig = _new_figure((4, 4))
+        ax = self.fig.add_subplot()
+        self.wedges, self.texts, self.autotexts = ax.pie(
+            [50, 50], labels=labels, colors=colors, autopct='%1.1f%%',
+            startangle=self.START_ANGLE, pctdistance=self.PCT_DISTANCE)
+
+        # 创建环形图
+        ax.add_artist(Circle((0, 0), 0.70, fc='white'))
+        self.center_text = ax.text(0, 0, '', ha='center', va='center',
+                                   fontsize=20, weight='bold', color='#1f2937')
+        self.title = ax.set_title('', size=12, weight='bold', pad=20)
+
+    def render(self, company: Dict) -> bytes:
+        total_score = company['scores']['total']
+        percentage = total_score / self.MAX_TOTAL * 100
+
+        sizes = np.asarray([percentage, 100 - percentage], np.float32)
+        if np.any(sizes < 0):
+            raise ValueError("Wedge sizes 'x' must be non negative values")
+        fracs = sizes / sizes.sum()
+
+        theta1 = self.START_ANGLE / 360
+        for wedge, text, autotext, frac in zip(self.wedges, self.texts, self.autotexts, fracs):
+            theta2 = theta1 + frac
+            thetam = 2 * np.pi * 0.5 * (theta1 + theta2)
+            wedge.set_theta1(360. * theta1)
+            wedge.set_theta2(360. * theta2)
+
+            xt = self.LABEL_DISTANCE * math.cos(thetam)
+            text.set_position((xt, self.LABEL_DISTANCE * math.sin(thetam)))
+            text.set_horizontalalignment('left' if xt > 0 else 'right')
+            autotext.set_position((self.PCT_DISTANCE * math.cos(thetam), self.PCT_DISTANCE * math.sin(thetam)))
+            autotext.set_text('%1.1f%%' % (100. * frac))
+            theta1 = theta2
+
+        self.center_text.set_text(f'{total_score}/{self.MAX_TOTAL}')
+        self.title.set_text(f"{company['name']} - 总分完成度" if self.use_chinese
+                            else f"{company['name']} - Total Score Completion")
+        return _template_png(self.fig)
+
+
+class ChartRenderer:
+    """复用图形模板绘制图表：每个 (图表类型, 是否中文) 保留一组空闲模板，可在多个线程间共享
+
+    同一个模板同一时间只由一个线程使用；没有空闲模板时新建一个，
+    模板数量因此不超过同时绘制同种图表的线程数。
+    """
+
+    TEMPLATES = {
+        'radar': _RadarTemplate,
+        'score': _ScoreTemplate,
+        'donut': _DonutTemplate,
+    }
+
+    def __init__(self):
+        self._free = {}
+        self._lock = threading.Lock()
+
+    def render(self, chart_type: str, company: Dict, use_chinese: bool) -> bytes:
+        key = (chart_type, bool(use_chinese))
+        with self._lock:
+            free = self._free.setdefault(key, [])
+            template = free.pop() if free else None
+        if template is None:
+            template = self.TEMPLATES[chart_type](bool(use_chinese))
+        try:
+            # 每次绘制都会重写全部与数据相关的图元，失败后模板仍可继续使用
+            return template.render(company)
+        finally:
+            with self._lock:
+                self._free[key].append(template)
+
+    def template_count(self) -> int:
+        """已构建的空闲模板数量"""
+        with self._lock:
+            return sum(len(free) for free in self._free.values())
+
+
+_renderer = ChartRenderer()
+
+
+def get_renderer() -> ChartRenderer:
+    """进程内共享的图表渲染器"""
+    return _renderer
+
+
+def _template_renderer(chart_type: str):
+    def render(company: Dict, use_chinese: bool) -> bytes:
+        return get_renderer().render(chart_type, company, use_chinese)
+    render.__name__ = f'render_{chart_type}_chart_from_template'
+    return render
+
+
+# 图表类型 -> 绘制函数（基于模板复用）
+CHART_RENDERERS = {chart_type: _template_renderer(chart_type) for chart_type in ChartRenderer.TEMPLATES}
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑企业记录 - 以结构数组（struct-of-arrays）保存整个数据集的企业记录
+
+每条企业记录是约60个键的字典，另有嵌套的 scores 字典，大数据集下内存占用很高。
+这里按列保存：
+- 整数、布尔字段（评分项、参展届数、排名等）放进一个整数矩阵，按取值范围选用最小的整数类型
+- 浮点字段（总分、百分比等）放进一个 float64 矩阵
+- 字符串字段保存为编号，相同的字符串只存一份（城市、VIP等级等重复值很多）
+- 列表、字典等其余字段每条记录合并成一段紧凑的 JSON 字节串
+- 字段取值都是数值的嵌套字典（scores）展开成子列
+按位置访问时才用 to_json() 组装成与原来完全相同的字典，并保留一个小的 LRU 缓存，
+接口与 shared_dataset.MappedRecords 一致，CompanyStore 可以直接替换使用。
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any, Dict, Iterator, List, Optional
+
+from lazy_imports import LazyModule
+
+np = LazyModule('numpy')
+
+# 字段类型
+_INT, _BOOL, _FLOAT, _NUMBER, _STR, _JSON, _STRUCT = range(7)
+
+_INT_DTYPES = ('int8', 'int16', 'int32', 'int64')
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+_FLOAT_EXACT = 2 ** 53
+
+
+def _scalar_kind(values: List[Any]) -> int:
+    """一列取值的存储类型（类型不统一或含 None 时按 JSON 保存）"""
+    types = {type(value) for value in values}
+    if types == {bool}:
+        return _BOOL
+    if types == {int}:
+        return _INT if all(_INT64_MIN <= value <= _INT64_MAX for value in values) else _JSON
+    if types == {float}:
+        return _FLOAT
+    if types == {int, float}:
+        # 如 scores.percentage：大于0时为浮点数，否则为整数0（整数按 float64 保存，须能精确表示）
+        return _NUMBER if all(abs(value) <= _FLOAT_EXACT for value in values if type(value) is int) else _JSON
+    if types == {str}:
+        return _STR
+    return _JSON
+
+
+def _int_matrix(columns: List[List[int]], count: int):
+    """按取值范围选用能容纳全部整数列的最小整数类型"""
+    if not columns:
+        return np.zeros((count, 0), dtype=np.int8)
+    matrix = np.array(columns, dtype=np.int64).T.reshape(count, len(columns))
+    low, high = (int(matrix.min()), int(matrix.max())) if matrix.size else (0, 0)
+    for dtype in _INT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.ascontiguousarray(matrix.astype(dtype))
+    return matrix
+
+
+class CompactRecords(Sequence):
+    """按位置访问的企业记录，数据按列保存，访问时才组装成字典"""
+
+    def __init__(self, companies: Sequence[Dict], cache_size: int = 1024):
+        """companies 中的记录必须有相同的键（顺序也相同），否则抛出 ValueError"""
+        count = len(companies)
+        keys = list(companies[0]) if count else []
+        for company in companies:
+            if list(company) != keys:
+                raise ValueError('企业记录的字段不一致，无法按列保存')
+
+        ints, floats, codes, blobs = [], [], [], []
+        string_ids = {}
+
+        def add_column(values: List[Any], kind: int) -> Any:
+            """保存一列，返回组装时使用的槽位"""
+            if kind in (_INT, _BOOL):
+                ints.append([int(value) for value in values])
+                return len(ints) - 1
+            if kind == _FLOAT:
+                floats.append(values)
+                return len(floats) - 1
+            if kind == _NUMBER:
+                # 浮点值 + 是否为整数的标记
+                floats.append([float(value) for value in values])
+                ints.append([type(value) is int for value in values])
+                return len(floats) - 1, len(ints) - 1
+            if kind == _STR:
+                codes.append([string_ids.setdefault(value, len(string_ids)) for value in values])
+                return len(codes) - 1
+            blobs.append(values)
+            return len(blobs) - 1
+
+        plan = []
+        for key in keys:
+            values = [company[key] for company in companies]
+            kind = _scalar_kind(values)
+            if kind == _JSON and self._is_struct(values):
+                subkeys = list(values[0])
+                fields = []
+                for subkey in subkeys:
+                    subvalues = [value[subkey] for value in values]
+                    subkind = _scalar_kind(subvalues)
+                    fields.append((subkey, subkind, add_column(subvalues, subkind)))
+                plan.append((key, _STRUCT, tuple(fields)))
+            else:
+                plan.append((key, kind, add_column(values, kind)))
+
+        self._plan = tuple(plan)
+        self._count = count
+        self._ints = _int_matrix(ints, count)
+        self._floats = np.array(floats, dtype=np.float64).T.reshape(count, len(floats))
+        self._codes = _int_matrix(codes, count) if codes else np.zeros((count, 0), dtype=np.int32)
+        self._strings = list(string_ids)
+        # 其余字段每条记录一段 JSON（只含这些字段的取值列表）
+        self._blobs = [json.dumps(list(row), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                       for row in zip(*blobs)] if blobs else None
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _is_struct(values: List[Any]) -> bool:
+        """是否为可以展开成子列的字典：键相同、取值都是数值"""
+        if not values or type(values[0]) is not dict:
+            return False
+        subkeys = list(values[0])
+        for value in values:
+            if type(value) is not dict or list(value) != subkeys:
+                return False
+        return all(_scalar_kind([value[subkey] for value in values]) in (_INT, _BOOL, _FLOAT, _NUMBER)
+                   for subkey in subkeys)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        with self._lock:
+            record = self._cache.get(index)
+            if record is not None:
+                self._cache.move_to_end(index)
+                return record
+
+        record = self.to_json(index)
+        with self._lock:
+            self._cache[index] = record
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+    def __iter__(self) -> Iterator[Dict]:
+        # 整体遍历（快照、增量上传）不经过缓存，避免把常用记录挤出去
+        return (self.to_json(i) for i in range(len(self)))
+
+    def to_json(self, index: int) -> Dict:
+        """组装第 index 条记录，结果与压缩前的字典完全相同（每次返回新的字典）"""
+        ints = self._ints[index].tolist()
+        floats = self._floats[index].tolist()
+        codes = self._codes[index].tolist()
+        blob = json.loads(self._blobs[index]) if self._blobs is not None else None
+        record = {}
+        for key, kind, slot in self._plan:
+            if kind == _STRUCT:
+                record[key] = {subkey: self._value(subkind, subslot, ints, floats, codes, blob)
+                               for subkey, subkind, subslot in slot}
+            else:
+                record[key] = self._value(kind, slot, ints, floats, codes, blob)
+        return record
+
+    def _value(self, kind: int, slot: Any, ints: List[int], floats: List[float], codes: List[int],
+               blob: Optional[List[Any]]) -> Any:
+        if kind == _INT:
+            return ints[slot]
+        if kind == _BOOL:
+            return bool(ints[slot])
+        if kind == _FLOAT:
+            return floats[slot]
+        if kind == _NUMBER:
+            value_slot, flag_slot = slot
+            return int(floats[value_slot]) if ints[flag_slot] else floats[value_slot]
+        if kind == _STR:
+            return self._strings[codes[slot]]
+        return blob[slot]
+
+    def nbytes(self) -> int:
+        """数组和字符串表占用的字节数（近似值，不含缓存）"""
+        size = self._ints.nbytes + self._floats.nbytes + self._codes.nbytes
+        size += sum(len(value.encode('utf-8')) for value in self._strings)
+        if self._blobs is not None:
+            size += sum(len(blob) for blob in self._blobs)
+        return size
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_cache'] = OrderedDict()
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def compact_records(companies: List[Dict]) -> Sequence:
+    """尽量转换为 CompactRecords；记录字段不一致或含有无法按 JSON 保存的值时原样返回"""
+    if not companies:
+        return companies
+    try:
+        return CompactRecords(companies)
+    except (ValueError, TypeError):
+        return companies
+
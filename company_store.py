@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+企业数据存储 - 带索引的内存企业数据集
+
+加载时一次性建立：
+- 企业名称哈希索引（O(1) 查找）
+- vip_level / city / is_brand / trading_group / exhibition_areas_vip / exhibition_count
+  二级索引（各组内按总分降序）
+- 按总分降序的排名顺序和对应总分（排行榜引擎据此构建名次数组和分数线视图）
+- 全文检索倒排索引（见 search_index.py）
+- 数据集版本号 version（每次载入新数据时生成，随快照和共享数据集保存，用作 ETag 的一部分）
+排行榜的名次数组和筛选视图、汇总统计、企业记录的 JSON 编码缓存在第一次使用时构建
+（见 ranking_engine.py、statistics_engine.py、json_payloads.py）。
+
+每个 CompanyStore 是一代不可变的数据集：建好后索引和企业记录都不再修改，
+数据变化时在旁边构建新的一代，再由调用方以一次引用赋值整体替换，
+并发读取的请求始终看到完整的某一代数据，读取不需要加锁。
+
+索引中保存的是企业在原始表格中的位置，企业数据本身可以是按列保存、访问时才组装的
+紧凑记录（见 compact_records.py）、内存中的字典列表，
+也可以是按需解码的共享内存映射数据集（见 shared_dataset.py）。
+"""
+
+import os
+import threading
+import uuid
+from typing import Dict, List, Any, Optional, Sequence
+
+from compact_records import compact_records
+from ranking_engine import RankingEngine
+from group_aggregates import GroupAggregator
+from json_payloads import PayloadCache
+from lazy_imports import LazyModule
+from search_index import SearchIndex
+from statistics_engine import StatisticsEngine, category_matrix
+
+np = LazyModule('numpy')
+
+# 企业记录按列紧凑保存（见 compact_records.py），设为 0 时保留字典列表
+COMPACT_RECORDS = os.environ.get('COMPACT_RECORDS', '1') == '1'
+# 每代数据集缓存企业记录 JSON 编码结果的内存预算（MB，设为 0 则不缓存）
+PAYLOAD_CACHE_MB = float(os.environ.get('PAYLOAD_CACHE_MB', 64))
+
+
+class CompanyStore:
+    # 建立二级索引的字段
+    INDEXED_FIELDS = ('vip_level', 'city', 'is_brand', 'trading_group', 'exhibition_areas_vip', 'exhibition_count')
+
+    def __init__(self, companies: Optional[List[Dict]] = None, row_hashes: Optional[List[str]] = None):
+        """由企业列表构建并建立全部索引（row_hashes 为各企业源数据行的哈希，供增量上传使用）
+
+        企业记录会写入 rank 字段，之后归这一代数据集所有，调用方不应再修改。
+        """
+        companies = list(companies or [])
+
+        # 按总分降序（稳定排序，同分保持原始顺序）
+        order = sorted(range(len(companies)), key=lambda i: companies[i]['scores']['total'], reverse=True)
+        for rank, position in enumerate(order, 1):
+            companies[position]['rank'] = rank
+
+        self._build(companies, order, SearchIndex(companies), row_hashes)
+        self.version = uuid.uuid4().hex[:16]
+
+    def snapshot(self) -> Dict:
+        """可序列化的完整状态：企业数据、排名顺序和全文检索索引"""
+        return {
+            'companies': list(self._records),
+            'ranked': list(self._order),
+            'search_index': self._search_index,
+            'row_hashes': list(self._row_hashes) if self._row_hashes is not None else None,
+            'version': self.version,
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Dict) -> 'CompanyStore':
+        """从 snapshot() 的结果恢复，不重新排序、不重建全文检索索引"""
+        store = cls.__new__(cls)
+        store._build(state['companies'], state['ranked'], state['search_index'], state.get('row_hashes'))
+        # 旧快照没有版本号时生成新的
+        store.version = state.get('version') or uuid.uuid4().hex[:16]
+        return store
+
+    @classmethod
+    def from_dataset(cls, dataset) -> 'CompanyStore':
+        """直接使用共享数据集中已建好的索引，企业数据在访问时才解码"""
+        store = cls.__new__(cls)
+        store._records = dataset.records
+        store._order = dataset.order
+        store._by_name = dataset.by_name
+        store._indexes = dataset.field_indexes
+        store._neg_totals = dataset.neg_totals
+        store._search_index = dataset.search_index
+        store._row_hashes = dataset.row_hashes
+        store._totals = dataset.totals
+        store._category_scores = dataset.category_scores
+        store.version = dataset.version
+        store._init_derived()
+        return store
+
+    def _build(self, companies: List[Dict], order: Sequence[int], search_index: SearchIndex,
+               row_hashes: Optional[Sequence[str]] = None) -> None:
+        indexes = {field: {} for field in self.INDEXED_FIELDS}
+        for position in order:
+            company = companies[position]
+            for field in self.INDEXED_FIELDS:
+                indexes[field].setdefault(company.get(field), []).append(position)
+
+        # 同名企业以表格中第一条为准，与原先的线性查找一致
+        by_name = {}
+        for position, company in enumerate(companies):
+            by_name.setdefault(company['name'], position)
+
+        self._records = companies
+        self._order = list(order)
+        self._by_name = by_name
+        self._indexes = indexes
+        # 总分取负后升序排列，便于用 bisect 做分数区间查询
+        self._neg_totals = [-companies[i]['scores']['total'] for i in order]
+        self._row_hashes = row_hashes if row_hashes is not None and len(row_hashes) == len(companies) else None
+        self._totals = None
+        self._category_scores = None
+        if COMPACT_RECORDS:
+            records = compact_records(companies)
+            if records is not companies:
+                # 评分矩阵所需的列在压缩前取出，之后不必逐条解码
+                self._totals = [company['scores']['total'] for company in companies]
+                self._category_scores = category_matrix(companies)
+                self._records = records
+        search_index.bind(self._records)
+        self._search_index = search_index
+        self._init_derived()
+
+    def _init_derived(self) -> None:
+        """排行榜、统计、分组结果和 JSON 编码缓存在第一次使用时构建（加锁，并发的第一次请求只构建一次）"""
+        self._derived_lock = threading.RLock()
+        self._score_matrix = None
+        self._ranking = None
+        self._statistics = None
+        self._aggregates = None
+        self._payloads = None
+
+    def ranking(self) -> RankingEngine:
+        """本代数据集的排行榜引擎，第一次使用时构建"""
+        if self._ranking is None:
+            with self._derived_lock:
+                if self._ranking is None:
+                    self._ranking = RankingEngine(self._records, self._order, self._neg_totals,
+                                                  self._indexes, self._by_name)
+        return self._ranking
+
+    def score_matrix(self):
+        """按企业位置排列的列式评分矩阵：第0列为总分，其余列为各类别得分"""
+        if self._score_matrix is None:
+            with self._derived_lock:
+                if self._score_matrix is None:
+                    self._score_matrix = self._build_score_matrix()
+        return self._score_matrix
+
+    def _build_score_matrix(self):
+        totals = self._totals
+        if totals is None:
+            totals = [company['scores']['total'] for company in self._records]
+        categories = self._category_scores
+        if categories is None:
+            categories = category_matrix(self._records)
+        return np.column_stack([np.asarray(totals, dtype=np.float64),
+                                np.asarray(categories, dtype=np.float64)])
+
+    def statistics(self) -> StatisticsEngine:
+        """本代数据集的统计引擎，第一次使用时计算"""
+        if self._statistics is None:
+            with self._derived_lock:
+                if self._statistics is None:
+                    matrix = self.score_matrix()
+                    self._statistics = StatisticsEngine(matrix[:, 0], matrix[:, 1:])
+        return self._statistics
+
+    def aggregates(self) -> GroupAggregator:
+        """本代数据集的分组统计，各维度的结果在第一次使用时计算"""
+        if self._aggregates is None:
+            with self._derived_lock:
+                if self._aggregates is None:
+                    self._aggregates = GroupAggregator(self.score_matrix(), self._indexes, self._records)
+        return self._aggregates
+
+    def payloads(self) -> PayloadCache:
+        """本代数据集企业记录的 JSON 编码缓存，第一次使用时创建"""
+        if self._payloads is None:
+            with self._derived_lock:
+                if self._payloads is None:
+                    self._payloads = PayloadCache(self._records, max_bytes=int(PAYLOAD_CACHE_MB * 1024 * 1024))
+        return self._payloads
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    @property
+    def companies(self) -> List[Dict]:
+        """按原始表格顺序的企业列表"""
+        return list(self._records)
+
+    def by_row_hash(self) -> Dict[str, Dict]:
+        """{源数据行哈希: 企业数据}，数据不是由带哈希的上传载入时为空"""
+        if self._row_hashes is None:
+            return {}
+        return dict(zip(self._row_hashes, self._records))
+
+    def get(self, name: str) -> Optional[Dict]:
+        """按企业名称查找"""
+        position = self._by_name.get(name)
+        return self._records[position] if position is not None else None
+
+    def position_of(self, name: str) -> Optional[int]:
+        """企业在原始表格中的位置"""
+        return self._by_name.get(name)
+
+    def count_by(self, field: str, value: Any) -> int:
+        """按二级索引计数"""
+        return len(self._indexes[field].get(value, []))
+
+    def search_positions(self, query: str, limit: int = 10) -> List[int]:
+        """全文检索，按总分降序返回前 limit 个企业的位置"""
+        return self._search_index.search_positions(query, limit)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+企业列表视图 - 字段投影和分页
+
+列表类接口（上传、排行榜、搜索）默认只返回卡片和排行榜需要的摘要字段，
+完整的企业记录通过 /api/company/<name> 按需获取。
+fields 参数：
+- 不传或 summary：摘要字段
+- all：完整记录
+- 逗号分隔的字段名：只返回这些字段
+分页使用 offset/limit，limit 不传时为每页上限 max_limit，返回的 next_cursor 即下一页的 offset
+（最后一页为 None）。
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# 企业卡片和排行榜列表用到的字段
+SUMMARY_FIELDS = (
+    'name', 'rank', 'city', 'vip_level', 'is_brand', 'exhibition_count',
+    'exhibition_areas', 'trading_group', 'scores',
+)
+
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """解析 fields 参数，返回要保留的字段；None 表示完整记录"""
+    value = (value or '').strip()
+    if not value or value == 'summary':
+        return SUMMARY_FIELDS
+    if value == 'all':
+        return None
+    return tuple(field for field in map(str.strip, value.split(',')) if field)
+
+
+def project(company: Dict, fields: Optional[Sequence[str]]) -> Dict:
+    """只保留指定字段（记录中不存在的字段忽略）"""
+    if fields is None:
+        return company
+    return {field: company[field] for field in fields if field in company}
+
+
+def project_all(companies: List[Dict], fields: Optional[Sequence[str]]) -> List[Dict]:
+    return [project(company, fields) for company in companies]
+
+
+def parse_non_negative_int(name: str, value: Optional[str], default: int) -> int:
+    """解析非负整数参数，不传时为 default，格式不正确时抛出 ValueError"""
+    if value is None or value == '':
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f'{name} 必须是非负整数: {value}') from None
+    if number < 0:
+        raise ValueError(f'{name} 必须是非负整数: {value}')
+    return number
+
+
+def parse_page(offset: Optional[str], limit: Optional[str], max_limit: int) -> Tuple[int, int]:
+    """解析 offset（或 cursor）和 limit 参数；limit 不传时为 max_limit，超过 max_limit 时截断，
+    不是非负整数时抛出 ValueError"""
+    return parse_non_negative_int('offset', offset, 0), min(parse_non_negative_int('limit', limit, max_limit), max_limit)
+
+
+def page_bounds(total: int, offset: int, limit: Optional[int]) -> Tuple[int, int, Optional[int]]:
+    """本页在完整结果中的 [start, stop) 以及下一页的游标"""
+    start = min(offset, total)
+    stop = total if limit is None else min(start + limit, total)
+    # limit=0 时本页为空，不返回游标，避免按游标翻页的客户端原地循环
+    return start, stop, (stop if start < stop < total else None)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分组统计 - 按城市、交易团、VIP展区、VIP等级、参展届数分组汇总评分
+
+每个维度由二级索引得到一个组编号数组（企业位置 -> 组编号），
+汇总时对列式评分矩阵（总分 + 各类别得分）做 np.bincount，
+两级交叉表把两个组编号合成一个编号后同样一次 bincount。
+结果按数据集和维度缓存，数据变化后随 CompanyStore 一起重建。
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lazy_imports import LazyModule
+from statistics_engine import SCORE_CATEGORIES
+
+np = LazyModule('numpy')
+
+# 支持分组的字段
+DIMENSIONS = ('city', 'trading_group', 'exhibition_areas_vip', 'vip_level', 'exhibition_count')
+
+
+class GroupAggregator:
+    def __init__(self, score_matrix, indexes: Dict[str, Dict[Any, Sequence[int]]], records: Sequence[Dict]):
+        """score_matrix 按企业位置排列，第0列为总分，其余列依次为 SCORE_CATEGORIES"""
+        self._matrix = score_matrix
+        self._indexes = indexes
+        self._records = records
+        self._codes = {}
+        self._results = {}
+
+    def _group_codes(self, field: str) -> Tuple[list, Any]:
+        """(组取值列表, 企业位置 -> 组编号数组)"""
+        if field not in self._codes:
+            groups = self._indexes.get(field)
+            if groups is None:
+                # 数据集没有该字段的二级索引时按记录现场分组
+                groups = {}
+                for position, company in enumerate(self._records):
+                    groups.setdefault(company.get(field), []).append(position)
+            values = list(groups)
+            codes = np.empty(len(self._matrix), dtype=np.int64)
+            for code, value in enumerate(values):
+                codes[np.asarray(groups[value], dtype=np.int64)] = code
+            self._codes[field] = (values, codes)
+        return self._codes[field]
+
+    def _summaries(self, codes, size: int) -> Tuple[list, list, list]:
+        """每组的数量、总分之和、各类别得分之和"""
+        counts = np.bincount(codes, minlength=size)
+        sums = np.stack([np.bincount(codes, weights=self._matrix[:, column], minlength=size)
+                         for column in range(self._matrix.shape[1])], axis=1)
+        return counts.tolist(), sums[:, 0].tolist(), sums[:, 1:].tolist()
+
+    @staticmethod
+    def _group(count: int, score_sum: float, category_sums: List[float]) -> Dict:
+        return {
+            'count': count,
+            'score_sum': round(score_sum, 2),
+            'score_mean': round(score_sum / count, 2),
+            'category_means': {category: round(total / count, 2)
+                               for category, total in zip(SCORE_CATEGORIES, category_sums)},
+        }
+
+    def group_by(self, field: str, by: Optional[str] = None) -> List[Dict]:
+        """按一个维度分组，或按 field × by 两级交叉分组（只返回非空组），按企业数量降序"""
+        for dimension in (field, by):
+            if dimension is not None and dimension not in DIMENSIONS:
+                raise ValueError(f"不支持的分组字段: {dimension}（可选 {', '.join(DIMENSIONS)}）")
+
+        key = (field, by)
+        if key not in self._results:
+            values, codes = self._group_codes(field)
+            if by is None:
+                cells = [(value,) for value in values]
+            else:
+                inner_values, inner_codes = self._group_codes(by)
+                codes = codes * len(inner_values) + inner_codes
+                cells = [(value, inner) for value in values for inner in inner_values]
+
+            counts, score_sums, category_sums = self._summaries(codes, len(cells))
+            groups = []
+            for cell, count, score_sum, sums in zip(cells, counts, score_sums, category_sums):
+                if count:
+                    group = dict(zip((field, by), cell)) if by is not None else {field: cell[0]}
+                    group.update(self._group(count, score_sum, sums))
+                    groups.append(group)
+            groups.sort(key=lambda group: group['count'], reverse=True)
+            self._results[key] = groups
+        return self._results[key]
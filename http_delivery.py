@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+响应压缩和 HTTP 缓存
+
+- StaticPage：启动时渲染一次的页面（看板HTML），按内容哈希生成 ETag，
+  gzip / brotli 版本预先以最高压缩率生成，之后每次请求直接返回
+- ResponseCompressor：在 after_request 中处理 HTML 和 JSON 响应
+  - GET 的 JSON 响应按内容哈希设置 ETag，If-None-Match 命中时返回304
+  - 超过 min_size 的响应按客户端的 Accept-Encoding 压缩（安装了 brotli 时优先 br，否则 gzip）
+  - GET 响应的压缩结果按数据集版本缓存（键为内容哈希和编码），同一代数据重复请求不再压缩；
+    只保留最近两代数据集的缓存
+压缩后的响应改用弱 ETag（内容相同、编码不同），Vary: Accept-Encoding。
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 需要压缩的响应类型
+COMPRESSIBLE_MIMETYPES = ('text/html', 'application/json')
+
+# 按优先顺序排列的可用编码
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    """压缩响应体；best 为 True 时使用最高压缩率（用于预先压缩的静态内容）"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if best else 5)
+    # mtime 固定为0，同样的内容压缩结果相同
+    return gzip.compress(data, compresslevel=9 if best else 6, mtime=0)
+
+
+def choose_encoding(request) -> Optional[str]:
+    """客户端接受的编码中优先级最高的一个，都不接受时返回 None"""
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def content_etag(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _weaken_etag(response) -> None:
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+class StaticPage:
+    """内容固定的页面：ETag 和各编码的压缩版本在创建时生成"""
+
+    def __init__(self, body: bytes, mimetype: str = 'text/html'):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = content_etag(body)
+        self.variants = {encoding: compress(body, encoding, best=True) for encoding in ENCODINGS}
+
+    def response(self, request, response_class):
+        encoding = choose_encoding(request)
+        body = self.variants[encoding] if encoding else self.body
+        response = response_class(body, mimetype=self.mimetype)
+        response.set_etag(self.etag, weak=encoding is not None)
+        response.cache_control.public = True
+        response.cache_control.no_cache = True
+        response.vary.add('Accept-Encoding')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        return response.make_conditional(request)
+
+
+class ResponseCompressor:
+    def __init__(self, min_size: int = 1024, max_bytes: int = 32 * 1024 * 1024, generations: int = 2):
+        self.min_size = min_size
+        self.max_bytes = max_bytes
+        self.generations = generations
+        # 数据集版本 -> {(内容哈希, 编码): 压缩结果}
+        self._variants = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def process(self, request, response, version: str):
+        """after_request 钩子：设置 ETag、处理条件请求并压缩（version 为本次请求使用的数据集版本）"""
+        if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        body = response.get_data()
+        cacheable = request.method in ('GET', 'HEAD')
+        digest = None
+        if cacheable and response.mimetype == 'application/json' and 'ETag' not in response.headers:
+            digest = content_etag(body)
+            response.set_etag(digest)
+            if not response.cache_control:
+                response.cache_control.no_cache = True
+            response.make_conditional(request)
+            if response.status_code == 304:
+                return response
+
+        encoding = choose_encoding(request) if len(body) >= self.min_size else None
+        if encoding is None:
+            return response
+
+        if cacheable:
+            compressed = self._get_or_compress(version, digest or content_etag(body), encoding, body)
+        else:
+            compressed = compress(body, encoding)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        _weaken_etag(response)
+        return response
+
+    def _get_or_compress(self, version: str, digest: str, encoding: str, body: bytes) -> bytes:
+        key = (digest, encoding)
+        with self._lock:
+            variants = self._variants.get(version)
+            compressed = variants.get(key) if variants is not None else None
+            if compressed is not None:
+                self.hits += 1
+                return compressed
+            self.misses += 1
+
+        # 压缩在锁外进行
+        compressed = compress(body, encoding)
+        with self._lock:
+            variants = self._variants.get(version)
+            if variants is None:
+                variants = self._variants[version] = {}
+                self._evict()
+            if key not in variants and self._bytes + len(compressed) <= self.max_bytes:
+                variants[key] = compressed
+                self._bytes += len(compressed)
+        return compressed
+
+    def _evict(self) -> None:
+        """只保留最近 generations 代数据集的压缩结果"""
+        while len(self._variants) > self.generations:
+            _, variants = self._variants.popitem(last=False)
+            self._bytes -= sum(len(data) for data in variants.values())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'generations': len(self._variants),
+                'entries': sum(len(variants) for variants in self._variants.values()),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
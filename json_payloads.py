@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 序列化 - 快速编码器和按数据集缓存的企业记录编码结果
+
+- 安装了 orjson 时用它编码，否则使用标准库 json（环境变量 JSON_ENCODER=json 可强制使用标准库）；
+  输出与 Flask 默认的 jsonify 一致：键排序、紧凑格式，只是中文不再转义成 \\uXXXX
+- FastJSONProvider 替换 Flask 的 JSON 提供者，所有 jsonify 直接生成 UTF-8 字节
+- RawJSON 包装已编码好的 JSON 片段，序列化外层响应时原样拼入，不再重新编码
+- PayloadCache 缓存一代数据集中每家企业（按字段投影和排名）编码后的字节，
+  列表接口只需把缓存的片段用逗号连接起来
+"""
+
+import json
+import os
+import threading
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+from flask.json.provider import DefaultJSONProvider
+
+from company_views import project
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 实际使用的编码器：orjson 或 json
+ENCODER = 'orjson' if orjson is not None and os.environ.get('JSON_ENCODER', 'auto') != 'json' else 'json'
+
+if ENCODER == 'orjson':
+    _ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                       | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+# 外层响应中 RawJSON 的占位符前缀（每个进程随机生成，不会与数据中的字符串重复）
+_PLACEHOLDER = uuid.uuid4().hex
+
+
+class RawJSON:
+    """已编码好的 JSON 片段（UTF-8 字节）"""
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+def dumps(obj: Any, sort_keys: bool = True, indent: bool = False,
+          default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """编码为 UTF-8 字节；obj 中的 RawJSON 原样拼入，其余无法编码的对象交给 default 处理"""
+    fragments = []
+
+    def encode_default(value: Any) -> Any:
+        if isinstance(value, RawJSON):
+            fragments.append(value.data)
+            return f'{_PLACEHOLDER}{len(fragments) - 1}'
+        if isinstance(value, float):
+            # float 的子类（如 numpy.float64），标准库会按 float 编码
+            return float(value)
+        if default is None:
+            raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+        return default(value)
+
+    data = None
+    if ENCODER == 'orjson':
+        option = _ORJSON_OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            data = orjson.dumps(obj, default=encode_default, option=option)
+        except orjson.JSONEncodeError:
+            # 超出64位的整数等 orjson 不支持的取值，改用标准库
+            fragments.clear()
+    if data is None:
+        data = json.dumps(obj, default=encode_default, ensure_ascii=False, sort_keys=sort_keys,
+                          indent=2 if indent else None,
+                          separators=None if indent else (',', ':')).encode('utf-8')
+
+    for i, fragment in enumerate(fragments):
+        data = data.replace(f'"{_PLACEHOLDER}{i}"'.encode(), fragment, 1)
+    return data
+
+
+def join_array(fragments: Iterable[bytes]) -> RawJSON:
+    """把已编码的元素连接成 JSON 数组"""
+    return RawJSON(b'[' + b','.join(fragments) + b']')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """使用 dumps() 编码的 Flask JSON 提供者，支持 RawJSON，响应体直接生成字节"""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=self.sort_keys, default=self.default).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if ENCODER == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps(obj, sort_keys=self.sort_keys, indent=indent, default=self.default) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class PayloadCache:
+    """一代数据集中企业记录的编码结果，键为 (字段投影, 企业位置, 排名)
+
+    rank 为 None 表示使用记录中的 rank（即顺序排名）。数据集不可变，缓存不需要失效，
+    换成新一代数据集时随旧的一代一起释放；写满 max_bytes 后不再写入新的条目。
+    """
+
+    # 每个条目除编码字节外的大致开销（字典槽位、键元组、bytes 对象头）
+    ENTRY_OVERHEAD = 150
+
+    def __init__(self, records: Sequence[Dict], max_bytes: int = 64 * 1024 * 1024):
+        self._records = records
+        self.max_bytes = max_bytes
+        self._entries = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fragment(self, position: int, fields: Optional[Sequence[str]] = None, rank: Optional[int] = None) -> bytes:
+        """位置为 position 的企业按 fields 投影后的 JSON 字节"""
+        key = (fields, position, rank)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        # 编码在锁外进行；并发请求同一条目时可能重复编码，数据不可变，结果相同
+        company = self._records[position]
+        if rank is not None:
+            company = dict(company, rank=rank)
+        data = dumps(project(company, fields))
+        size = len(data) + self.ENTRY_OVERHEAD
+        with self._lock:
+            if key not in self._entries and self._bytes + size <= self.max_bytes:
+                self._entries[key] = data
+                self._bytes += size
+        return data
+
+    def encode(self, positions: Iterable[int], fields: Optional[Sequence[str]] = None,
+               ranks: Optional[Iterable[int]] = None) -> RawJSON:
+        """按顺序编码多家企业，返回 JSON 数组片段"""
+        fields = tuple(fields) if fields is not None else None
+        if ranks is None:
+            return join_array(self.fragment(position, fields) for position in positions)
+        return join_array(self.fragment(position, fields, rank) for position, rank in zip(positions, ranks))
+
+    def record(self, position: int, fields: Optional[Sequence[str]] = None) -> RawJSON:
+        """单家企业的 JSON 对象片段"""
+        return RawJSON(self.fragment(position, tuple(fields) if fields is not None else None))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
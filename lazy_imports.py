@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+延迟导入 - 重量级库（pandas、matplotlib、reportlab 等）在第一次使用时才导入
+
+    pd = LazyModule('pandas')
+    df = pd.read_excel(...)   # 此时才真正导入 pandas
+
+导入完成后模块属性会复制到代理对象上，之后的属性访问与直接使用模块几乎没有差别。
+"""
+
+import importlib
+import importlib.util
+import threading
+from types import ModuleType
+from typing import Callable, Optional
+
+
+def module_available(name: str) -> bool:
+    """模块是否已安装（只查找，不导入）"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    def __init__(self, name: str, on_load: Optional[Callable[[ModuleType], None]] = None):
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_on_load'] = on_load
+        self.__dict__['_lazy_lock'] = threading.Lock()
+        self.__dict__['_lazy_module'] = None
+
+    def _lazy_load(self) -> ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+        with self.__dict__['_lazy_lock']:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                module = importlib.import_module(self.__dict__['_lazy_name'])
+                on_load = self.__dict__['_lazy_on_load']
+                if on_load is not None:
+                    on_load(module)
+                # 复制模块属性，之后的访问不再经过 __getattr__
+                self.__dict__.update(module.__dict__)
+                self.__dict__['_lazy_module'] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, attr: str):
+        # 导入后新增的属性（如之后才导入的子模块）仍从模块本身读取
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._lazy_load(), attr, value)
+        self.__dict__[attr] = value
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyModule '{self.__dict__['_lazy_name']}' ({state})>"
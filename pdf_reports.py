@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+企业PDF报告 - 单个企业报告的渲染，以及批量报告的进程池渲染和流式ZIP打包
+
+报告用 platypus 排版（表格、段落自动换行分页），图表取自图表缓存中已渲染的PNG，
+只有缓存中没有的图表才渲染一次并写回缓存，不会为每份报告重新绘图。
+
+批量报告：
+- 企业逐个提交到进程池（reportlab 渲染是CPU密集型），同时在途的任务数有上限，
+  企业数据按需读取，内存占用与批量大小无关
+- 每份PDF渲染完成后立即写入ZIP并把新产生的字节交给调用方，
+  ZIP 以流式方式写出（不回写本地文件头，文件大小记录在数据描述符中）
+"""
+
+import io
+import multiprocessing
+import warnings
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from background_jobs import Job
+from chart_cache import ChartCache
+
+
+# 报告中嵌入的图表：(图表类型, 显示宽度/英寸)；PNG 为 150dpi，按原始尺寸放置即 150dpi
+REPORT_CHARTS = (('radar', 3.0), ('donut', 3.0), ('score', 6.0))
+_CJK_FONT = 'STSong-Light'
+
+
+def _styles():
+    """报告样式；使用 reportlab 内置的 CID 字体显示中文（无需字体文件）"""
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+
+    if _CJK_FONT not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(UnicodeCIDFont(_CJK_FONT))
+    base = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle('ReportTitle', parent=base['Title'], fontName=_CJK_FONT, fontSize=22, leading=28),
+        'subtitle': ParagraphStyle('ReportSubtitle', parent=base['Normal'], fontName=_CJK_FONT, fontSize=14,
+                                   leading=20, alignment=TA_CENTER),
+        'cover': ParagraphStyle('ReportCover', parent=base['Normal'], fontName=_CJK_FONT, fontSize=11,
+                                leading=16, alignment=TA_CENTER),
+        'heading': ParagraphStyle('ReportHeading', parent=base['Heading2'], fontName=_CJK_FONT, fontSize=14,
+                                  leading=18, spaceBefore=12, spaceAfter=6),
+        'body': ParagraphStyle('ReportBody', parent=base['Normal'], fontName=_CJK_FONT, fontSize=10, leading=14),
+    }
+
+
+def _table(rows, style, col_widths):
+    from reportlab.lib import colors
+    from reportlab.platypus import Paragraph, Table, TableStyle
+
+    table = Table([[Paragraph(escape(str(cell)), style) for cell in row] for row in rows], colWidths=col_widths)
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+        ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f4f6')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+    return table
+
+
+def _chart_image(png: bytes, width_inch: float):
+    """按显示宽度等比缩放的图表；同一张图在文档中只嵌入一次"""
+    from reportlab.lib.units import inch
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import Image
+
+    pixel_width, pixel_height = ImageReader(io.BytesIO(png)).getSize()
+    width = min(width_inch * inch, pixel_width / 150 * inch)
+    return Image(io.BytesIO(png), width=width, height=width * pixel_height / pixel_width)
+
+
+def render_company_pdf(company: Dict, charts: Optional[Dict[str, bytes]] = None) -> bytes:
+    """渲染单个企业的PDF报告；charts 为 {图表类型: PNG}，由调用方从图表缓存中取得"""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import KeepTogether, Paragraph, SimpleDocTemplate, Spacer, Table
+
+    styles = _styles()
+    scores = company['scores']
+    story = [
+        # 封面信息
+        Paragraph(escape(company['name']), styles['title']),
+        Paragraph("VIP Enterprise Information Report", styles['subtitle']),
+        Spacer(1, 12),
+        Paragraph(escape(f"VIP Level: {company['vip_level']}"), styles['cover']),
+        Paragraph(f"Total Score: {scores['total']}/25", styles['cover']),
+        Paragraph(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['cover']),
+    ]
+
+    # 基本信息
+    story.append(Paragraph("Basic Information", styles['heading']))
+    story.append(_table([
+        ("Company Name", company['name']),
+        ("City", company.get('city')),
+        ("Exhibition Count", company.get('exhibition_count')),
+        ("Brand Status", 'Yes' if company.get('is_brand') else 'No'),
+        ("VIP Level", company['vip_level']),
+    ], styles['body'], [1.8 * inch, 4.6 * inch]))
+
+    # 评分详情
+    story.append(Paragraph("Score Details", styles['heading']))
+    story.append(_table([
+        ("Market Value", f"{scores['market_value']}/5"),
+        ("R&D Innovation", f"{scores['rd_innovation']}/12"),
+        ("Smart Manufacturing", f"{scores['smart_manufacturing']}/5"),
+        ("Green Manufacturing", f"{scores['green_manufacturing']}/8"),
+        ("Credit Level", f"{scores['credit_level']}/1"),
+        ("Total Score", f"{scores['total']}/36 ({scores['percentage']}%)"),
+    ], styles['body'], [1.8 * inch, 4.6 * inch]))
+
+    # 图表：雷达图和环形图并排，柱状图单独一行
+    images = {chart_type: _chart_image(charts[chart_type], width)
+              for chart_type, width in REPORT_CHARTS if charts and charts.get(chart_type)}
+    if images:
+        flowables = [Paragraph("Charts", styles['heading'])]
+        pair = [images[chart_type] for chart_type in ('radar', 'donut') if chart_type in images]
+        if pair:
+            flowables.append(Table([pair], hAlign='CENTER'))
+        if 'score' in images:
+            flowables.append(images['score'])
+        story.append(KeepTogether(flowables))
+
+    # 企业亮点
+    if company.get('highlights'):
+        story.append(Paragraph("Company Highlights", styles['heading']))
+        for i, highlight in enumerate(company['highlights'][:5], 1):
+            story.append(Paragraph(escape(f"{i}. {highlight}"), styles['body']))
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, title=company['name'],
+                            leftMargin=50, rightMargin=50, topMargin=50, bottomMargin=50)
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def render_missing_charts(company: Dict, charts: Dict[str, bytes], use_chinese: bool) -> Dict[str, bytes]:
+    """渲染 charts 中缺少的报告图表，返回新渲染的部分（单张图失败时跳过）"""
+    from charts import CHART_RENDERERS
+
+    rendered = {}
+    for chart_type, _ in REPORT_CHARTS:
+        if chart_type not in charts:
+            try:
+                rendered[chart_type] = CHART_RENDERERS[chart_type](company, use_chinese)
+            except Exception:
+                continue
+    return rendered
+
+
+def report_filename(company_name: str) -> str:
+    """报告文件名"""
+    safe_name = company_name.replace('/', '_').replace('\\', '_') or 'company'
+    return f"{safe_name}_VIP_Report_{datetime.now().strftime('%Y%m%d')}.pdf"
+
+
+def _init_worker() -> None:
+    """子进程初始化：与主进程一样忽略绘图的字体告警"""
+    warnings.filterwarnings('ignore')
+
+
+def _render_task(company: Dict, charts: Optional[Dict[str, bytes]],
+                 use_chinese: bool) -> Tuple[Dict, bytes, Dict[str, bytes]]:
+    """子进程中渲染一份报告；charts 为 None 时不嵌入图表，缓存中缺少的图表在子进程中补渲染并一并返回"""
+    rendered = {}
+    if charts is not None:
+        rendered = render_missing_charts(company, charts, use_chinese)
+        charts = dict(charts, **rendered)
+    return company, render_company_pdf(company, charts), rendered
+
+
+def cached_charts(chart_cache: ChartCache, company: Dict, use_chinese: bool) -> Dict[str, bytes]:
+    """图表缓存中已有的报告图表"""
+    from charts import chart_cache_key
+
+    charts = {}
+    for chart_type, _ in REPORT_CHARTS:
+        entry = chart_cache.get(chart_cache_key(chart_type, company, use_chinese))
+        if entry is not None:
+            charts[chart_type] = entry.png
+    return charts
+
+
+def store_charts(chart_cache: Optional[ChartCache], company: Dict, charts: Dict[str, bytes], use_chinese: bool) -> None:
+    """把新渲染的图表写回图表缓存，供后续报告和图表接口复用"""
+    if chart_cache is None or not charts:
+        return
+    from charts import chart_cache_key
+
+    for chart_type, png in charts.items():
+        chart_cache.put(chart_cache_key(chart_type, company, use_chinese), png)
+
+
+class _ZipSink:
+    """ZipFile 的输出目标：只支持 write，写入的字节由 drain 取走（没有 tell/seek，ZipFile 会按流式方式写出）"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_reports_zip(job: Job, companies: Iterable[Dict], total: int,
+                       chart_cache: Optional[ChartCache] = None, use_chinese: bool = False,
+                       max_workers: Optional[int] = None, max_pending: Optional[int] = None) -> Iterator[bytes]:
+    """在进程池中并行渲染报告，每完成一份就写入ZIP并产出新增的ZIP字节，进度记录在 job 中
+
+    companies 可以是惰性的迭代器；同时在途（已提交未写出）的报告不超过 max_pending 份。
+    传入 chart_cache 时嵌入图表：已缓存的图表直接交给子进程，缺少的由子进程渲染后写回缓存。
+    """
+    max_workers = max_workers or multiprocessing.cpu_count()
+    max_pending = max_pending or max_workers * 2
+    job.start(total=total)
+
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED)
+    used_names = set()
+    written = 0
+    companies = iter(companies)
+
+    # 使用 spawn 启动子进程，避免在多线程的Web进程中 fork
+    executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker)
+    try:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending and not job.cancelled:
+                company = next(companies, None)
+                if company is None:
+                    exhausted = True
+                else:
+                    charts = cached_charts(chart_cache, company, use_chinese) if chart_cache is not None else None
+                    pending.add(executor.submit(_render_task, company, charts, use_chinese))
+            if job.cancelled:
+                break
+            if not pending:
+                continue
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    company, pdf, rendered = future.result()
+                except Exception as e:
+                    job.add_error(str(e))
+                else:
+                    store_charts(chart_cache, company, rendered, use_chinese)
+                    filename = report_filename(company['name'])
+                    # 同名企业追加序号，避免ZIP内文件名重复
+                    stem, suffix = filename[:-4], 2
+                    while filename in used_names:
+                        filename = f'{stem}_{suffix}.pdf'
+                        suffix += 1
+                    used_names.add(filename)
+                    archive.writestr(filename, pdf)
+                    written += 1
+                job.advance()
+            yield sink.drain()
+
+        archive.close()
+        yield sink.drain()
+        job.finish(result={'reports': written}, message=f'已生成 {written} 份报告')
+    except GeneratorExit:
+        # 客户端断开连接：取消剩余任务
+        job.cancel()
+        job.finish(result={'reports': written}, message='下载已中断')
+        raise
+    except Exception as e:
+        job.fail(str(e))
+        raise
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
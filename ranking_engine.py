@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+排行榜引擎 - 每个数据集只计算一次排名，按页读取任意筛选视图
+
+构建时（每次 CompanyStore 载入或切换数据集后第一次使用时）：
+- 三种排名数组，按总分降序的名次下标访问：
+  ordinal     顺序排名 1,2,3,4（同分按表格顺序，与企业记录中的 rank 一致）
+  competition 竞赛排名 1,2,2,4（同分并列，后续名次跳过）
+  dense       密集排名 1,2,2,3（同分并列，后续名次连续）
+- 每个筛选视图一个名次下标数组（二级索引筛选）或一个前缀长度（top10 / high_score / all）
+读取一页只切片视图数组，耗时与页大小成正比，不排序、不修改共享的企业记录。
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lazy_imports import LazyModule
+
+np = LazyModule('numpy')
+
+RANK_METHODS = ('ordinal', 'competition', 'dense')
+
+# 按二级索引筛选的视图：filter -> (字段, 取值)
+INDEX_FILTERS = {
+    'gold': ('vip_level', '金标'),
+    'silver': ('vip_level', '银标'),
+    'brand': ('is_brand', True),
+}
+# 总分排名前缀视图：top10 为前10名，high_score 为总分不低于80分
+TOP_N = 10
+HIGH_SCORE = 80
+
+
+class RankingEngine:
+    def __init__(self, records: Sequence[Dict], order: Sequence[int], neg_totals: Sequence[float],
+                 indexes: Dict[str, Dict[Any, Sequence[int]]], by_name: Dict[str, int]):
+        self._records = records
+        self._order = np.asarray(order, dtype=np.int64)
+        self._by_name = by_name
+        count = len(self._order)
+
+        # 企业位置 -> 名次下标
+        self._slot_of = np.empty(count, dtype=np.int64)
+        self._slot_of[self._order] = np.arange(count)
+
+        # neg_totals 升序，searchsorted(left) 即总分严格更高的企业数
+        neg_totals = np.asarray(neg_totals, dtype=np.float64)
+        changes = np.ones(count, dtype=np.int64)
+        changes[1:] = neg_totals[1:] != neg_totals[:-1]
+        self._ranks = {
+            'ordinal': np.arange(1, count + 1),
+            'competition': np.searchsorted(neg_totals, neg_totals, side='left') + 1,
+            'dense': np.cumsum(changes),
+        }
+
+        # 筛选视图：二级索引中的企业位置转换为名次下标（已按总分降序）
+        self._views = {
+            name: self._slot_of[np.asarray(indexes[field].get(value, []), dtype=np.int64)]
+            for name, (field, value) in INDEX_FILTERS.items()
+        }
+        self._prefixes = {
+            'all': count,
+            'top10': min(count, TOP_N),
+            'high_score': int(np.searchsorted(neg_totals, -HIGH_SCORE, side='right')),
+        }
+
+    def count(self, filter_type: str) -> int:
+        """筛选视图中的企业数量（未知的筛选按全部企业处理）"""
+        if filter_type in self._views:
+            return len(self._views[filter_type])
+        return self._prefixes.get(filter_type, self._prefixes['all'])
+
+    def _slots(self, filter_type: str, start: int, stop: Optional[int]):
+        if filter_type in self._views:
+            return self._views[filter_type][start:stop]
+        end = self.count(filter_type)
+        stop = end if stop is None else min(stop, end)
+        return np.arange(min(start, stop), stop)
+
+    def page(self, filter_type: str, start: int = 0, stop: Optional[int] = None,
+             method: str = 'ordinal') -> List[Dict]:
+        """筛选视图中 [start, stop) 区间的企业，rank 为指定方式的排名（返回副本，不修改原记录）"""
+        ranks = self._rank_array(method)
+        slots = self._slots(filter_type, start, stop)
+        records = self._records
+        return [
+            dict(records[position], rank=rank)
+            for position, rank in zip(self._order[slots].tolist(), ranks[slots].tolist())
+        ]
+
+    def page_positions(self, filter_type: str, start: int = 0, stop: Optional[int] = None,
+                       method: str = 'ordinal') -> Tuple[List[int], Optional[List[int]]]:
+        """与 page() 相同区间的企业位置和排名；顺序排名与记录中的 rank 相同，排名返回 None"""
+        ranks = self._rank_array(method)
+        slots = self._slots(filter_type, start, stop)
+        positions = self._order[slots].tolist()
+        return positions, (None if method == 'ordinal' else ranks[slots].tolist())
+
+    def rank_of(self, name: str, method: str = 'ordinal') -> Optional[int]:
+        """企业的排名，O(1)"""
+        position = self._by_name.get(name)
+        if position is None:
+            return None
+        return int(self._rank_array(method)[self._slot_of[position]])
+
+    def _rank_array(self, method: str):
+        if method not in self._ranks:
+            raise ValueError(f"不支持的排名方式: {method}（可选 {', '.join(RANK_METHODS)}）")
+        return self._ranks[method]
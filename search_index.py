@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+企业全文检索 - 基于字符 n-gram 的倒排索引
+
+中文没有天然的分词边界，这里直接把文本切成字符级的一元/二元/三元组作为索引词：
+- 查询长度不超过最大 n 时，查询本身就是一个索引词，一次查表即可
+- 更长的查询取其全部三元组求倒排表交集，再对候选企业做一次子串校验
+命中结果用堆按 scores.total 取前 k 个，不对全部命中结果排序。
+
+索引用 NumPy 构建：字符先映射为紧凑编号，n-gram 编码为整数后与企业编号拼成
+一个 uint64 排序去重，得到按 n-gram 分组、组内企业编号升序的倒排表。
+企业按 SEGMENT_SIZE 分段建索引，控制构建时的临时内存。
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Iterable, Optional, Sequence, Tuple
+
+from lazy_imports import LazyModule
+
+np = LazyModule('numpy')
+
+# 同一企业内不同字段之间的分隔符，n-gram 不跨越分隔符
+_SEPARATOR = '\x00'
+
+
+class _Segment:
+    """一段企业的倒排表：codes[i] 对应 docs[offsets[i]:offsets[i + 1]]"""
+
+    def __init__(self, base: int, codes: np.ndarray, offsets: np.ndarray, docs: np.ndarray):
+        self.base = base
+        self.codes = codes
+        self.offsets = offsets
+        self.docs = docs
+
+    def postings(self, code: int) -> Optional[np.ndarray]:
+        i = int(np.searchsorted(self.codes, np.uint64(code)))
+        if i < len(self.codes) and self.codes[i] == code:
+            return self.docs[self.offsets[i]:self.offsets[i + 1]].astype(np.int64) + self.base
+        return None
+
+
+class SearchIndex:
+    # 每段最多包含的企业数
+    SEGMENT_SIZE = 4096
+
+    def __init__(self, companies: List[Dict], ngram_sizes: Tuple[int, ...] = (1, 2, 3)):
+        self.ngram_sizes = tuple(sorted(set(ngram_sizes)))
+        self._companies = list(companies)
+        self._totals = [c['scores']['total'] for c in self._companies]
+
+        documents = [self._document(company) for company in self._companies]
+
+        # 字符表：字符 -> 从 1 开始的编号，0 留给分隔符
+        alphabet = sorted(set(''.join(documents)) - {_SEPARATOR})
+        self._char_ids = {ch: i for i, ch in enumerate(alphabet, 1)}
+        self._char_bits = max(len(alphabet).bit_length(), 1)
+        self._char_table = self._build_char_table()
+
+        gram_bits = self._char_bits * self.ngram_sizes[-1]
+        if gram_bits >= 64:
+            raise ValueError(f"n-gram 长度 {self.ngram_sizes[-1]} 超出索引编码范围")
+        self._doc_bits = min(64 - gram_bits, self.SEGMENT_SIZE.bit_length())
+        segment_size = min(self.SEGMENT_SIZE, 1 << self._doc_bits)
+
+        self._segments = [
+            self._build_segment(documents[start:start + segment_size], start)
+            for start in range(0, len(documents), segment_size)
+        ]
+
+    def _build_char_table(self) -> np.ndarray:
+        """码位 -> 字符编号 的查找表，分隔符及未出现的码位为 0"""
+        alphabet = sorted(self._char_ids, key=self._char_ids.get)
+        table = np.zeros(ord(max(alphabet)) + 1 if alphabet else 1, dtype=np.uint64)
+        table[[ord(ch) for ch in alphabet]] = np.arange(1, len(alphabet) + 1, dtype=np.uint64)
+        return table
+
+    def parts(self) -> Dict:
+        """索引的原始组成部分（字符表、编码参数和各段倒排数组），用于写入共享数据集"""
+        return {
+            'ngram_sizes': list(self.ngram_sizes),
+            'alphabet': ''.join(sorted(self._char_ids, key=self._char_ids.get)),
+            'char_bits': self._char_bits,
+            'doc_bits': self._doc_bits,
+            'segments': [(segment.base, segment.codes, segment.offsets, segment.docs)
+                         for segment in self._segments],
+        }
+
+    @classmethod
+    def from_parts(cls, companies: Sequence[Dict], totals: Sequence[float], parts: Dict) -> 'SearchIndex':
+        """由 parts() 的结果重建索引，倒排数组直接使用传入的数组（可以是内存映射）"""
+        index = cls.__new__(cls)
+        index.ngram_sizes = tuple(parts['ngram_sizes'])
+        index._companies = companies
+        index._totals = totals
+        index._char_ids = {ch: i for i, ch in enumerate(parts['alphabet'], 1)}
+        index._char_bits = parts['char_bits']
+        index._doc_bits = parts['doc_bits']
+        index._char_table = index._build_char_table()
+        index._segments = [_Segment(*segment) for segment in parts['segments']]
+        return index
+
+    def bind(self, companies: Sequence[Dict]) -> None:
+        """改为从另一份相同顺序的企业记录序列取结果（如紧凑记录、快照中恢复的记录）"""
+        self._companies = companies
+
+    def __getstate__(self) -> Dict:
+        # 查找表按最大码位分配，体积大且可由字符表重建，不参与序列化；
+        # 企业记录由数据集单独保存，恢复后通过 bind() 重新关联
+        state = self.__dict__.copy()
+        del state['_char_table']
+        state['_companies'] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._char_table = self._build_char_table()
+
+    @staticmethod
+    def _searchable_texts(company: Dict) -> Iterable[str]:
+        """参与检索的文本：名称、城市、简介、亮点、主营产品、VIP展区产品"""
+        yield company.get('name', '')
+        yield company.get('city', '')
+        yield company.get('introduction', '')
+        yield from company.get('highlights') or []
+        for category, products in (company.get('main_products') or {}).items():
+            yield category
+            yield from products
+        for products in (company.get('vip_products') or {}).values():
+            for product in products:
+                yield product.get('series', '')
+                yield product.get('description', '')
+
+    def _document(self, company: Dict) -> str:
+        """企业全部检索文本（小写，字段间以分隔符隔开）"""
+        return _SEPARATOR.join(text.lower() for text in self._searchable_texts(company) if text)
+
+    def _build_segment(self, documents: List[str], base: int) -> _Segment:
+        """为一段企业构建倒排表"""
+        joined = _SEPARATOR.join(documents) + _SEPARATOR
+        codepoints = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+        char_ids = self._char_table[codepoints]
+        local_ids = np.repeat(np.arange(len(documents), dtype=np.uint64),
+                              [len(document) + 1 for document in documents])
+
+        size = len(char_ids)
+        keys = []
+        for n in self.ngram_sizes:
+            if size < n:
+                continue
+            codes = char_ids[:size - n + 1].copy()
+            valid = codes != 0
+            for k in range(1, n):
+                following = char_ids[k:size - n + 1 + k]
+                codes = (codes << np.uint64(self._char_bits)) | following
+                valid &= following != 0
+            keys.append((codes[valid] << np.uint64(self._doc_bits)) | local_ids[:size - n + 1][valid])
+
+        # 排序去重后即按 n-gram 分组、组内企业编号升序
+        keys = np.unique(np.concatenate(keys)) if keys else np.zeros(0, dtype=np.uint64)
+        codes = keys >> np.uint64(self._doc_bits)
+        docs = (keys & np.uint64((1 << self._doc_bits) - 1)).astype(np.uint16 if self._doc_bits <= 16 else np.uint32)
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.zeros(0, dtype=np.int64)
+        offsets = np.append(starts, len(codes)).astype(np.uint32 if len(codes) < 2 ** 32 else np.int64)
+        return _Segment(base, codes[starts], offsets, docs)
+
+    def _gram_code(self, gram: str) -> Optional[int]:
+        code = 0
+        for ch in gram:
+            char_id = self._char_ids.get(ch)
+            if char_id is None:
+                return None
+            code = (code << self._char_bits) | char_id
+        return code
+
+    def _postings(self, gram: str) -> np.ndarray:
+        """某个 n-gram 的倒排表（全局企业编号，升序）"""
+        code = self._gram_code(gram)
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        parts = [postings for postings in (segment.postings(code) for segment in self._segments)
+                 if postings is not None]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """返回包含 query 的企业，按总分降序取前 limit 个（同分按原始顺序）"""
+        return [self._companies[doc_id] for doc_id in self.search_positions(query, limit)]
+
+    def search_positions(self, query: str, limit: int = 10) -> List[int]:
+        """与 search() 相同，返回企业在原始表格中的位置"""
+        query = query.lower()
+        if not query or limit <= 0 or _SEPARATOR in query:
+            return []
+
+        sizes = [size for size in self.ngram_sizes if size <= len(query)]
+        if len(query) in self.ngram_sizes:
+            candidates = self._postings(query).tolist()
+        else:
+            if sizes:
+                n = sizes[-1]
+                grams = {query[i:i + n] for i in range(len(query) - n + 1)}
+                candidates = self._intersect([self._postings(gram) for gram in grams]).tolist()
+            else:
+                # 查询比最短的索引词还短，只能逐个校验
+                candidates = range(len(self._companies))
+            # 各 n-gram 都出现不代表整体连续出现，需要子串校验
+            candidates = [doc_id for doc_id in candidates
+                          if query in self._document(self._companies[doc_id])]
+
+        return heapq.nlargest(limit, candidates, key=lambda doc_id: (self._totals[doc_id], -doc_id))
+
+    @staticmethod
+    def _intersect(postings_lists: List[np.ndarray]) -> np.ndarray:
+        """倒排表求交，从最短的表开始，结果为空时提前结束"""
+        postings_lists = sorted(postings_lists, key=len)
+        result = postings_lists[0]
+        for postings in postings_lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, postings, assume_unique=True)
+        return result
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程共享数据集 - 上传结果写成一个列式文件，各个 worker 以内存映射方式只读共享
+
+gunicorn 多 worker 部署时，处理上传的 worker 把企业数据发布为新的一代（generation）：
+1. 写入 dataset-<generation>.bin（先写临时文件再改名）
+2. 更新 GENERATION 文件中的代数
+其他 worker 在每个请求前读取内存映射的 GENERATION（一次内存读取，无系统调用），
+代数变化时映射新文件，无需重启即可看到新数据。
+
+文件布局：魔数(8) + 头部长度(8) + JSON头部 + 按 64 字节对齐的数组区
+- 数值列（排名顺序、总分、二级索引、全文检索倒排表）直接以 NumPy 数组映射，不复制
+- 企业记录以 JSON 字节串按位置存放，访问时才解码，并保留一个小的 LRU 缓存
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+from lazy_imports import LazyModule
+from search_index import SearchIndex
+from snapshot_store import SNAPSHOT_VERSION
+from statistics_engine import SCORE_CATEGORIES, category_matrix
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+np = LazyModule('numpy')
+
+_MAGIC = b'VIPDSET1'
+_ALIGN = 64
+_GENERATION = struct.Struct('<Q')
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _blob(items: List[bytes]):
+    """变长字节串 -> (偏移数组, 拼接后的字节数组)"""
+    offsets = np.zeros(len(items) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(item) for item in items])
+    return offsets, np.frombuffer(b''.join(items), dtype=np.uint8)
+
+
+def write_dataset(path: str, state: Dict, generation: int, source_key: Optional[str] = None,
+                  indexed_fields: tuple = ()) -> None:
+    """把 CompanyStore.snapshot() 的结果写成列式数据集文件"""
+    companies = state['companies']
+    order = list(state['ranked'])
+    search = state['search_index'].parts()
+
+    arrays = {}
+    arrays['record_offsets'], arrays['records'] = _blob(
+        [json.dumps(company, ensure_ascii=False).encode('utf-8') for company in companies])
+    arrays['name_offsets'], arrays['names'] = _blob([company['name'].encode('utf-8') for company in companies])
+    arrays['order'] = np.asarray(order, dtype=np.int32)
+    arrays['totals'] = np.asarray([company['scores']['total'] for company in companies], dtype=np.float64)
+    arrays['neg_totals'] = -arrays['totals'][arrays['order']]
+    arrays['category_scores'] = category_matrix(companies).ravel()
+
+    # 二级索引：每个取值对应 index_positions 中的一段（组内按总分降序）
+    field_indexes = {}
+    positions = []
+    for field in indexed_fields:
+        groups = {}
+        for position in order:
+            groups.setdefault(companies[position].get(field), []).append(position)
+        field_indexes[field] = []
+        for value, members in groups.items():
+            field_indexes[field].append([value, len(positions), len(positions) + len(members)])
+            positions.extend(members)
+    arrays['index_positions'] = np.asarray(positions, dtype=np.int32)
+
+    # 源数据行哈希（32位十六进制），供增量上传比较
+    row_hashes = state.get('row_hashes') or []
+    arrays['row_hashes'] = np.asarray([row_hash.encode('ascii') for row_hash in row_hashes], dtype='S32')
+
+    segments = []
+    for i, (base, codes, offsets, docs) in enumerate(search['segments']):
+        names = [f'search_{i}_codes', f'search_{i}_offsets', f'search_{i}_docs']
+        for name, array in zip(names, (codes, offsets, docs)):
+            arrays[name] = np.ascontiguousarray(array)
+        segments.append([base] + names)
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = _aligned(offset)
+        layout[name] = [array.dtype.str, offset, len(array)]
+        offset += array.nbytes
+
+    header = json.dumps({
+        'generation': generation,
+        'source_key': source_key,
+        'version': state.get('version'),
+        'schema_version': SNAPSHOT_VERSION,
+        'count': len(companies),
+        'arrays': layout,
+        'field_indexes': field_indexes,
+        'search': {key: value for key, value in search.items() if key != 'segments'},
+        'search_segments': segments,
+    }, ensure_ascii=False).encode('utf-8')
+
+    data_start = _aligned(len(_MAGIC) + 8 + len(header))
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_MAGIC + struct.pack('<Q', len(header)) + header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][1])
+            f.write(array.tobytes())
+        # 末尾的空数组也要落在文件范围内
+        f.truncate(data_start + _aligned(offset))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class MappedRecords(Sequence):
+    """按位置访问的企业记录，第一次访问时从映射中解码 JSON"""
+
+    def __init__(self, buffer: mmap.mmap, base: int, offsets, cache_size: int = 4096):
+        self._buffer = buffer
+        self._base = base
+        self._offsets = offsets
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = int(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+
+        with self._lock:
+            record = self._cache.get(index)
+            if record is not None:
+                self._cache.move_to_end(index)
+                return record
+
+        start = self._base + int(self._offsets[index])
+        record = json.loads(self._buffer[start:self._base + int(self._offsets[index + 1])])
+        with self._lock:
+            self._cache[index] = record
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return record
+
+
+class MappedDataset:
+    """只读映射一个数据集文件，提供 CompanyStore.from_dataset 需要的全部索引"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._buffer[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f'不是有效的数据集文件: {path}')
+        header_size, = struct.unpack_from('<Q', self._buffer, len(_MAGIC))
+        header_start = len(_MAGIC) + 8
+        header = json.loads(self._buffer[header_start:header_start + header_size])
+        # 与快照使用同一个结构版本，解析结果变化后旧数据集不再使用
+        if header.get('schema_version') != SNAPSHOT_VERSION:
+            raise ValueError(f'数据集结构版本不符: {path}')
+        data_start = _aligned(header_start + header_size)
+
+        self.generation = header['generation']
+        self.source_key = header['source_key']
+        # 旧文件没有数据集版本号时以代数代替（代数在共享目录内单调递增）
+        self.version = header.get('version') or f"g{header['generation']}"
+        arrays = {
+            name: np.frombuffer(self._buffer, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+            for name, (dtype, offset, count) in header['arrays'].items()
+        }
+
+        records_base = data_start + header['arrays']['records'][1]
+        self.records = MappedRecords(self._buffer, records_base, arrays['record_offsets'])
+        self.order = arrays['order']
+        self.neg_totals = arrays['neg_totals']
+        self.totals = arrays['totals']
+        category_scores = arrays.get('category_scores')
+        self.category_scores = (category_scores.reshape(-1, len(SCORE_CATEGORIES))
+                                if category_scores is not None else None)
+        row_hashes = arrays.get('row_hashes')
+        self.row_hashes = None
+        if row_hashes is not None and len(row_hashes) == header['count']:
+            self.row_hashes = [row_hash.decode('ascii') for row_hash in row_hashes.tolist()]
+
+        names = arrays['names'].tobytes()
+        name_offsets = arrays['name_offsets'].tolist()
+        self.by_name = {}
+        for position in range(header['count']):
+            self.by_name.setdefault(names[name_offsets[position]:name_offsets[position + 1]].decode('utf-8'), position)
+
+        index_positions = arrays['index_positions']
+        self.field_indexes = {
+            field: {value: index_positions[start:end] for value, start, end in groups}
+            for field, groups in header['field_indexes'].items()
+        }
+
+        search = dict(header['search'])
+        search['segments'] = [(base, arrays[codes], arrays[offsets], arrays[docs])
+                              for base, codes, offsets, docs in header['search_segments']]
+        self.search_index = SearchIndex.from_parts(self.records, arrays['totals'].tolist(), search)
+
+
+class SharedDataset:
+    GENERATION_FILE = 'GENERATION'
+    LOCK_FILE = 'LOCK'
+
+    def __init__(self, directory: str, keep: int = 2):
+        self.directory = directory
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+        path = os.path.join(directory, self.GENERATION_FILE)
+        with self._exclusive():
+            with open(path, 'ab') as f:
+                if f.tell() < _GENERATION.size:
+                    f.write(b'\0' * (_GENERATION.size - f.tell()))
+        self._generation_file = open(path, 'r+b')
+        self._counter = mmap.mmap(self._generation_file.fileno(), _GENERATION.size)
+
+    @property
+    def generation(self) -> int:
+        """当前已发布的代数（0 表示尚未发布过）"""
+        return _GENERATION.unpack_from(self._counter)[0]
+
+    def _path(self, generation: int) -> str:
+        return os.path.join(self.directory, f'dataset-{generation}.bin')
+
+    def _exclusive(self):
+        return _FileLock(os.path.join(self.directory, self.LOCK_FILE))
+
+    def publish(self, store, source_key: Optional[str] = None) -> int:
+        """把内存中的 CompanyStore 写成新一代数据集并更新代数，返回新的代数"""
+        state = store.snapshot()
+        with self._exclusive():
+            generation = self.generation + 1
+            write_dataset(self._path(generation), state, generation, source_key, store.INDEXED_FIELDS)
+            _GENERATION.pack_into(self._counter, 0, generation)
+            self._counter.flush()
+            self._prune(generation)
+        return generation
+
+    def open(self, generation: Optional[int] = None) -> Optional[MappedDataset]:
+        """映射指定代（默认当前代）的数据集，文件不存在或结构版本不符时返回 None"""
+        generation = self.generation if generation is None else generation
+        if generation <= 0:
+            return None
+        try:
+            return MappedDataset(self._path(generation))
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _prune(self, current: int) -> None:
+        """删除旧的数据集文件；仍在使用旧映射的 worker 不受影响"""
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith('dataset-') and entry.name.endswith('.bin'):
+                try:
+                    generation = int(entry.name[len('dataset-'):-len('.bin')])
+                except ValueError:
+                    continue
+                if generation <= current - self.keep:
+                    os.remove(entry.path)
+
+
+class _FileLock:
+    """跨进程互斥（fcntl.flock），同一进程内另用线程锁"""
+    _thread_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if FCNTL_AVAILABLE:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据集快照 - 把处理好的企业数据和索引持久化到磁盘，重启后无需重新上传
+
+快照以源文件内容的 SHA-256 为键：同一份文件再次上传时直接加载快照，不再解析。
+目录下的 CURRENT 文件记录最近一次上传对应的快照，启动时自动加载。
+
+文件格式：8 字节魔数 + pickle（protocol 5，NumPy 数组以原始字节存储）。
+快照只由本服务写入本地目录，不接受外部提供的快照文件。
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from typing import BinaryIO, Dict, Optional
+
+# 企业数据结构、索引结构或解析结果变化时递增，旧快照和旧的共享数据集自动失效
+# 2: 荣誉去重，fortune_500_china / high_tech_enterprise / 单项冠军字段从别名列取值
+# 3: 评分字段恢复只读取配置的列名，荣誉跟随评分字段
+# 4: 配置的列名不存在时评分字段从备用列名取值（SCORE_COLUMN_ALIASES）
+SNAPSHOT_VERSION = 4
+_MAGIC = b'VIPSNAP' + bytes([SNAPSHOT_VERSION])
+
+
+def content_hash(data: bytes) -> str:
+    """源文件内容哈希"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def stream_hash(stream: BinaryIO, block_size: int = 1024 * 1024) -> str:
+    """对可 seek 的文件对象计算内容哈希，完成后回到开头"""
+    digest = hashlib.sha256()
+    stream.seek(0)
+    for block in iter(lambda: stream.read(block_size), b''):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+class SnapshotStore:
+    CURRENT_FILE = 'CURRENT'
+
+    def __init__(self, directory: str, max_snapshots: int = 5):
+        self.directory = directory
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.snapshot')
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def save(self, key: str, state: Dict) -> None:
+        """写入快照并设为当前快照（先写临时文件再替换，读取方不会看到半个文件）"""
+        payload = _MAGIC + pickle.dumps(state, protocol=5)
+        with self._lock:
+            self._atomic_write(self._path(key), payload)
+            self._atomic_write(os.path.join(self.directory, self.CURRENT_FILE), key.encode())
+            self._prune(keep=key)
+
+    def load(self, key: str) -> Optional[Dict]:
+        """读取快照，不存在或版本不符时返回 None"""
+        try:
+            with open(self._path(key), 'rb') as f:
+                payload = f.read()
+        except OSError:
+            return None
+        if not payload.startswith(_MAGIC):
+            return None
+        try:
+            return pickle.loads(memoryview(payload)[len(_MAGIC):])
+        except Exception as e:
+            print(f"⚠️ 快照读取失败 {key}: {str(e)}", file=sys.stderr)
+            return None
+
+    def current_key(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.directory, self.CURRENT_FILE), 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def set_current(self, key: str) -> None:
+        with self._lock:
+            self._atomic_write(os.path.join(self.directory, self.CURRENT_FILE), key.encode())
+
+    def load_current(self) -> Optional[Dict]:
+        key = self.current_key()
+        return self.load(key) if key else None
+
+    def _atomic_write(self, path: str, data: bytes) -> None:
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _prune(self, keep: str) -> None:
+        """只保留最近的 max_snapshots 个快照"""
+        snapshots = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.snapshot')),
+            key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in snapshots[self.max_snapshots:]:
+            if entry.name != f'{keep}.snapshot':
+                os.remove(entry.path)
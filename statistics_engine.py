@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统计引擎 - 每个数据集一次性计算全部汇总统计
+
+输入为升序排列的总分数组和各类别得分矩阵（CompanyStore 在第一次使用时提供，
+数据变化后重新构建），之后的统计接口只读取缓存结果：
+- 数量、平均分、最高分、最低分、标准差
+- 百分位数
+- 各评分类别的平均分
+- 任意分段边界的分布直方图（在有序数组上二分查找，按边界缓存）
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lazy_imports import LazyModule
+
+np = LazyModule('numpy')
+
+# scores 中的评分类别（顺序即得分矩阵的列顺序）
+SCORE_CATEGORIES = ('market_value', 'rd_innovation', 'smart_manufacturing', 'green_manufacturing', 'credit_level')
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# 排行榜统计的分数段：低于60、60-80、80及以上
+RANKING_BUCKET_EDGES = (60, 80)
+
+_HISTOGRAM_CACHE_SIZE = 32
+
+
+def category_matrix(companies: Sequence[Dict]):
+    """企业列表 -> 各类别得分矩阵（行为企业，列为 SCORE_CATEGORIES）"""
+    matrix = np.zeros((len(companies), len(SCORE_CATEGORIES)), dtype=np.float64)
+    for i, company in enumerate(companies):
+        scores = company['scores']
+        matrix[i] = [scores.get(category, 0) for category in SCORE_CATEGORIES]
+    return matrix
+
+
+class StatisticsEngine:
+    def __init__(self, totals, categories):
+        """totals 为总分数组（任意顺序），categories 为各类别得分矩阵"""
+        self._totals = np.sort(np.asarray(totals, dtype=np.float64))
+        categories = np.asarray(categories, dtype=np.float64).reshape(-1, len(SCORE_CATEGORIES))
+        totals = self._totals
+        count = len(totals)
+
+        if count:
+            summary = {
+                'count': count,
+                'mean': float(totals.mean()),
+                'min': float(totals[0]),
+                'max': float(totals[-1]),
+                'std': float(totals.std()),
+                'percentiles': {f'p{p}': value for p, value in
+                                zip(PERCENTILES, np.percentile(totals, PERCENTILES).tolist())},
+                'category_means': dict(zip(SCORE_CATEGORIES, categories.mean(axis=0).tolist())),
+            }
+        else:
+            summary = {
+                'count': 0, 'mean': 0, 'min': 0, 'max': 0, 'std': 0,
+                'percentiles': {f'p{p}': 0 for p in PERCENTILES},
+                'category_means': dict.fromkeys(SCORE_CATEGORIES, 0),
+            }
+        self._summary = summary
+        self._histograms = {}
+
+    @classmethod
+    def from_companies(cls, companies: Sequence[Dict]) -> 'StatisticsEngine':
+        return cls([company['scores']['total'] for company in companies], category_matrix(companies))
+
+    def summary(self) -> Dict:
+        """全部汇总统计（缓存结果，调用方不要修改）"""
+        return self._summary
+
+    def histogram(self, edges: Sequence[float], right: bool = False) -> List[int]:
+        """按分段边界统计企业数量，返回 len(edges) + 1 个分段的计数
+
+        right=False 时分段为 (-inf, e0), [e0, e1), ..., [en, +inf)
+        right=True  时分段为 (-inf, e0], (e0, e1], ..., (en, +inf)
+        """
+        key = (tuple(edges), right)
+        counts = self._histograms.get(key)
+        if counts is None:
+            side = 'right' if right else 'left'
+            below = np.searchsorted(self._totals, np.asarray(key[0], dtype=np.float64), side=side).tolist()
+            bounds = [0] + below + [len(self._totals)]
+            counts = [bounds[i + 1] - bounds[i] for i in range(len(bounds) - 1)]
+            if len(self._histograms) >= _HISTOGRAM_CACHE_SIZE:
+                self._histograms.clear()
+            self._histograms[key] = counts
+        return counts
+
+
+def parse_edges(value: Optional[str], default: Optional[Tuple[float, ...]]) -> Optional[Tuple[float, ...]]:
+    """解析逗号分隔的分段边界（必须是严格递增的有限数值），格式不正确时抛出 ValueError"""
+    if not value:
+        return default
+    try:
+        edges = tuple(float(edge) for edge in value.split(',') if edge.strip())
+    except ValueError:
+        raise ValueError(f'分段边界必须是数值: {value}') from None
+    if not all(math.isfinite(edge) for edge in edges):
+        raise ValueError(f'分段边界必须是有限数值: {value}')
+    if any(b <= a for a, b in zip(edges, edges[1:])):
+        raise ValueError(f'分段边界必须严格递增: {value}')
+    return edges
+
+
+def bucket_labels(edges: Sequence[float]) -> List[str]:
+    """分段的显示名称，例如 <60、60-80、>=80"""
+    def fmt(edge):
+        return f'{edge:g}'
+    if not edges:
+        return ['全部']
+    labels = [f'<{fmt(edges[0])}']
+    labels += [f'{fmt(low)}-{fmt(high)}' for low, high in zip(edges, edges[1:])]
+    labels.append(f'>={fmt(edges[-1])}')
+    return labels
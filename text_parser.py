@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+结构化文字解析 - 企业亮点、领先地位、产业板块、主营产品、VIP展区产品
+
+所有正则在模块加载时编译一次，每个单元格只做一次扫描：
+- 编号列表（亮点/领先地位/产业板块）：一次 findall 取出全部 "数字." 开头的行
+- 主营产品：一次 findall 取出全部 "编号.类别：产品列表"
+- VIP展区产品：大类标记（一、二、三、）和产品编号（换行+数字.）合并为一个分隔正则，
+  一次 split 得到全部片段，再顺序归入各大类
+parse_text_column 对整列批量解析，解析结果与原先逐行的 _parse_* 方法完全一致。
+"""
+
+import re
+from typing import Callable, Dict, List
+
+# 行首（允许前导空白）的 "数字." 编号，捕获其后的内容
+_NUMBERED_LINE = re.compile(r'^[^\S\n]*\d+\.(.*)$', re.MULTILINE)
+# 字符串开头的 "数字." 编号
+_NUMBER_PREFIX = re.compile(r'\d+\.')
+# 编号.类别：产品列表
+_MAIN_PRODUCT = re.compile(r'\d+\.\s*([^：]+)：([^0-9]+)')
+# VIP展区产品：捕获组为大类标记，未捕获的分支为产品编号
+_VIP_TOKEN = re.compile(r'([一二三]、)|\n\d+\.')
+# 【产品系列】
+_SERIES = re.compile(r'【([^】]+)】')
+
+VIP_SECTION_NAMES = ['新品', '爆品', '热卖品']
+
+
+def _empty(text: str) -> bool:
+    return not text or text == 'nan'
+
+
+def parse_numbered_list(text: str) -> List[str]:
+    """解析按 "1.xxx" 逐行编号的文字，返回去掉编号后的各项内容"""
+    if _empty(text):
+        return []
+    items = []
+    for content in _NUMBERED_LINE.findall(text):
+        content = content.strip()
+        if content:
+            items.append(content)
+    return items
+
+
+def parse_main_products(text: str) -> Dict[str, List[str]]:
+    """解析主营产品：{类别: [产品, ...]}"""
+    if _empty(text):
+        return {}
+    categories = {}
+    for category, products_text in _MAIN_PRODUCT.findall(text):
+        category = category.strip()
+        # 按逗号或顿号分割产品（统一为逗号后用 str.split，不走正则）
+        products = [p for p in map(str.strip, products_text.replace('、', '，').split('，')) if p]
+        if category and products:
+            categories[category] = products
+    return categories
+
+
+def _vip_product(line: str):
+    """一条产品：【】内为系列名称，去掉【】和编号后为描述"""
+    parts = _SERIES.split(line)
+    series_name = parts[1] if len(parts) > 1 else ''
+    description = ''.join(parts[0::2]).strip()
+    prefix = _NUMBER_PREFIX.match(description)
+    if prefix:
+        description = description[prefix.end():].strip()
+    if description:
+        return {'series': series_name, 'description': description}
+    return None
+
+
+def parse_vip_products(text: str) -> Dict[str, List[Dict]]:
+    """解析VIP展区产品情况：按 "一、二、三、" 分为新品/爆品/热卖品，各大类下按编号分产品"""
+    if _empty(text):
+        return {}
+
+    result = {}
+    pieces = _VIP_TOKEN.split(text)
+    section = -1  # 第一个大类标记之前的内容忽略
+    products = []
+
+    # pieces: [片段, 标记, 片段, 标记, ...]，标记为大类文字或 None（产品编号）
+    for i in range(0, len(pieces), 2):
+        if i > 0 and pieces[i - 1] is not None:
+            if products and 0 <= section < len(VIP_SECTION_NAMES):
+                result[VIP_SECTION_NAMES[section]] = products
+            section += 1
+            products = []
+        if section < 0:
+            continue
+        line = pieces[i].strip()
+        if line:
+            product = _vip_product(line)
+            if product:
+                products.append(product)
+
+    if products and 0 <= section < len(VIP_SECTION_NAMES):
+        result[VIP_SECTION_NAMES[section]] = products
+    return result
+
+
+# 企业字段 -> (Excel列名, 解析函数)
+TEXT_FIELD_PARSERS = [
+    ('highlights', '企业亮点', parse_numbered_list),
+    ('leading_position', '领先地位', parse_numbered_list),
+    ('industry_sectors', '产业板块', parse_numbered_list),
+    ('main_products', '主营产品', parse_main_products),
+    ('vip_products', '所在VIP展区产品情况', parse_vip_products),
+]
+
+
+def parse_text_column(parser: Callable, texts: List[str]) -> List:
+    """对整列文字批量解析"""
+    return [parser(text) for text in texts]
@@ -4,15 +4,166 @@
 更新的数据处理器 - 支持新的13分评分系统和文字结构化
 """
 
-import pandas as pd
-import re
+from __future__ import annotations
+
+import hashlib
 import json
-from typing import Dict, List, Any
-import matplotlib.pyplot as plt
+from typing import Dict, List, Callable, Iterator, Optional, Sequence, Tuple
+
+from lazy_imports import LazyModule
+from statistics_engine import StatisticsEngine
+from text_parser import (TEXT_FIELD_PARSERS, parse_main_products, parse_numbered_list,
+                         parse_text_column, parse_vip_products)
+
+# pandas/numpy 在第一次处理数据时才导入，加快启动
+pd = LazyModule('pandas')
+np = LazyModule('numpy')
+
+
+# 评分字段与Excel列名的对应关系（顺序即企业字典中的字段顺序）
+SCORE_FIELD_COLUMNS = [
+    ('fortune_500_world', '世界《财富》500强(2分)'),
+    ('fortune_500_china', '中国《财富》500强(1分)'),
+    ('china_manufacturing_500', '中国制造业500强(1分)'),
+    ('unicorn_enterprise', '独角兽企业(1分)'),
+    ('gazelle_enterprise', '瞪羚企业(1分)'),
+    ('listed_company', '上市企业(1分)'),
+    ('market_value_score', '市场价值总分'),
+    ('manufacturing_champion_national', '国际级制造业单项冠军(2分)'),
+    ('manufacturing_champion_provincial', '省级制造业单项冠军(1分)'),
+    ('sophisticated_enterprises_vipnational', '国家级专精特新重点“小巨人(3分)”'),
+    ('sophisticated_enterprises_national', '国家级专精特新“小巨人”(2分)'),
+    ('specialized_new_provincial', '省级专精特新(1分)'),
+    ('high_tech_enterprise', '国家级高新技术企业(1分)'),
+    ('tech_center_national', '国家级企业技术中心(2分)'),
+    ('tech_center_provincial', '省级企业技术中心(1分)'),
+    ('tech_innovation_demo', '国家技术创新示范企业(1分)'),
+    ('standard_international', '参与制定国际标准(3分)'),
+    ('standard_national', '参与制定国家标准(2分)'),
+    ('standard_industry', '参与制定行业标准(1分)'),
+    ('rd_innovation_score', '研发创新总分'),
+    ('excellent_smart_factory', '卓越级智能工厂(1分)'),
+    ('leading_smart_factory', '领航级智能工厂(2分)'),
+    ('lighthouse_factory', '灯塔工厂(3分)'),
+    ('smart_manufacturing_score', '智能制造总分'),
+    ('green_factory_national', '国家级绿色工厂(2分)'),
+    ('green_factory_provincial', '省级绿色工厂(1分)'),
+    ('green_design_national', '国家级绿色设计产品(2分)'),
+    ('green_design_provincial', '省级绿色设计产品(1分)'),
+    ('green_park_national', '国家级绿色工业园(2分)'),
+    ('green_park_provincial', '省级绿色工业园(1分)'),
+    ('green_supply_national', '国家级绿色供应链管理(2分)'),
+    ('green_supply_provincial', '省级绿色供应链管理(1分)'),
+    ('green_manufacturing_score', '绿色制造总分'),
+    ('aeo_certification', 'AEO高级认证企业(2分)'),
+    ('credit_level_score', '信用水平总分'),
+]
+
+# 五大类别：scores中的键 -> 企业字典中的类别总分字段
+CATEGORY_SCORE_FIELDS = [
+    ('market_value', 'market_value_score'),
+    ('rd_innovation', 'rd_innovation_score'),
+    ('smart_manufacturing', 'smart_manufacturing_score'),
+    ('green_manufacturing', 'green_manufacturing_score'),
+    ('credit_level', 'credit_level_score'),
+]
+
+# 定义各评分字段的权重（你可以根据实际调整系数）
+SCORE_WEIGHTS = {
+    'market_value_score': 2.0,
+    'rd_innovation_score': 1.0,
+    'smart_manufacturing_score': 2.0,
+    'green_manufacturing_score': 1.5,
+    'credit_level_score': 1.5,
+    'total_score': 10/6 # 可以对总分也乘系数，或保留原始总分
+}
+
+# get_statistics 的评分分布分段（右闭）
+SCORE_DISTRIBUTION_EDGES = (3, 6, 9)
+SCORE_DISTRIBUTION_LABELS = ('0-3分', '4-6分', '7-9分', '10-13分')
+
+# 带进度回调处理整张表时，每处理这么多行报告一次进度
+PROGRESS_CHUNK_ROWS = 500
+
+# 评分字段的备用列名：不同版本的Excel表头写法不一致，主列名不存在时依次尝试
+SCORE_COLUMN_ALIASES = {
+    'fortune_500_china': ('国家《财富》500强(1分)',),
+    'manufacturing_champion_national': ('国家级制造业单项冠军(2分)',),
+    'manufacturing_champion_provincial': ('省级制造业单项冠军（1分）', '省级制造单项冠军(1分)'),
+    'sophisticated_enterprises_vipnational': ('国家级专精特新重点“小巨人”(3分)',),
+    'high_tech_enterprise': ('国家高新技术企业(1分)',),
+    'lighthouse_factory': ('灯塔工厂(2分)',),
+    'green_park_national': ('国家级绿色工业园区(2分)',),
+    'aeo_certification': ('AEO高级认证企业(1分)',),
+}
+
+# 评分类别 -> 荣誉类别名称
+CATEGORY_NAMES = {
+    'market_value': '市场价值',
+    'rd_innovation': '研发创新',
+    'smart_manufacturing': '智能制造',
+    'green_manufacturing': '绿色制造',
+    'credit_level': '信用水平',
+}
+
+# 荣誉徽章：评分字段 -> (荣誉名称, 徽章等级)；字段得分大于0即获得该荣誉
+HONOR_BADGES = {
+    # 市场价值类荣誉
+    'fortune_500_world': ('世界《财富》500强(2分)', 'gold'),
+    'fortune_500_china': ('国家《财富》500强(1分)', 'yellow'),
+    'china_manufacturing_500': ('中国制造业500强(1分)', 'silver'),
+    'unicorn_enterprise': ('独角兽企业(1分)', 'blue'),
+    'gazelle_enterprise': ('瞪羚企业(1分)', 'blue'),
+    'listed_company': ('上市企业(1分)', 'blue'),
+    # 研发创新类荣誉
+    'manufacturing_champion_national': ('国家级制造业单项冠军', 'gold'),
+    'manufacturing_champion_provincial': ('省级制造单项冠军', 'silver'),
+    'sophisticated_enterprises_vipnational': ('国家级专精特新重点“小巨人”(3分)', 'silver'),
+    'sophisticated_enterprises_national': ('国家级专精特新“小巨人”(2分)', 'silver'),
+    'specialized_new_provincial': ('省级专精特新(1分)', 'silver'),
+    'high_tech_enterprise': ('国家高新技术企业(1分)', 'silver'),
+    'tech_center_national': ('国家级企业技术中心(2分)', 'silver'),
+    'tech_center_provincial': ('省级企业技术中心(1分)', 'silver'),
+    'tech_innovation_demo': ('国家技术创新示范企业(1分)', 'silver'),
+    'standard_international': ('参与制定国际标准(3分)', 'silver'),
+    'standard_national': ('参与制定国家标准(2分)', 'silver'),
+    'standard_industry': ('参与制定行业标准(1分)', 'silver'),
+    # 智能制造类荣誉
+    'excellent_smart_factory': ('卓越级智能工厂(1分)', 'blue'),
+    'leading_smart_factory': ('领航级智能工厂(2分)', 'gold'),
+    'lighthouse_factory': ('灯塔工厂(2分)', 'gold'),
+    # 绿色制造类荣誉
+    'green_factory_national': ('国家级绿色工厂(2分)', 'green'),
+    'green_factory_provincial': ('省级绿色工厂(1分)', 'green'),
+    'green_design_national': ('国家级绿色设计产品(2分)', 'green'),
+    'green_design_provincial': ('省级绿色设计产品(1分)', 'green'),
+    'green_park_national': ('国家级绿色工业园(2分)', 'green'),
+    'green_park_provincial': ('省级绿色工业园(1分)', 'green'),
+    'green_supply_national': ('国家级绿色供应链管理(2分)', 'green'),
+    'green_supply_provincial': ('省级绿色供应链管理(1分)', 'green'),
+    # 信用水平类荣誉
+    'aeo_certification': ('AEO高级认证企业(1分)', 'blue'),
+}
+
+
+def build_honor_table(scoring_config: Dict) -> List[tuple]:
+    """由评分配置生成荣誉表 [(评分字段, 荣誉类别, 荣誉名称, 徽章等级)]，按配置中的顺序排列"""
+    return [
+        (field, CATEGORY_NAMES[category]) + HONOR_BADGES[field]
+        for category, config in scoring_config.items()
+        for field in config['items']
+        if field in HONOR_BADGES
+    ]
+
 
-# 配置中文字体
-plt.rcParams['font.sans-serif'] = ['PingFang SC', 'SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+def resolve_score_column(field: str, column: str, available) -> str:
+    """评分字段实际使用的列名：主列名不存在时取第一个存在的备用列名"""
+    if column in available:
+        return column
+    for alias in SCORE_COLUMN_ALIASES.get(field, ()):
+        if alias in available:
+            return alias
+    return column
 
 
 class UpdatedDataProcessor:
@@ -74,34 +225,211 @@ class UpdatedDataProcessor:
                 }
             }
         }
+        self.honor_table = build_honor_table(self.scoring_config)
 
 
-    def parse_excel_data(self, file_path: str) -> List[Dict]:
-        """解析Excel文件数据"""
+    def parse_excel_data(self, file_path: str, mode: str = 'row') -> List[Dict]:
+        """解析Excel文件数据（mode 可选 'row' / 'columnar' / 'streaming'）"""
         try:
+            if mode == 'streaming':
+                companies = []
+                for chunk in self.iter_excel_chunks(file_path):
+                    companies.extend(chunk)
+                return companies
+
             df = pd.read_excel(file_path)
-            companies = []
-            
-            for _, row in df.iterrows():
-                company = self._process_company_row(row)
-                companies.append(company)
-            
-            return companies
+            return self.process_dataframe(df, mode=mode)
         except Exception as e:
             raise Exception(f"Excel文件解析失败: {str(e)}")
-    
-    def _process_company_row(self, row: pd.Series) -> Dict:
-        """处理单个企业数据行"""
-        
-        # 定义各评分字段的权重（你可以根据实际调整系数）
-        weights = {
-        'market_value_score': 2.0,
-        'rd_innovation_score': 1.0,
-        'smart_manufacturing_score': 2.0,
-        'green_manufacturing_score': 1.5,
-        'credit_level_score': 1.5,
-        'total_score': 10/6 # 可以对总分也乘系数，或保留原始总分
+
+    def iter_excel_chunks(self, source, chunk_size: int = 500,
+                          row_hashes: Optional[List[str]] = None) -> Iterator[List[Dict]]:
+        """流式读取Excel文件，按块产出企业数据
+
+        基于 openpyxl 的只读模式逐行读取第一个工作表，每读满 chunk_size 行就交给
+        _process_company_row 处理并产出，内存占用不随表格行数增长。
+        source 可以是文件路径或可 seek 的二进制文件对象。
+        row_hashes 不为空时，把每一行的哈希（与 row_hashes() 对同一文件的结果相同）追加到该列表。
+        """
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = self._excel_header(header)
+            row_hash = self._row_hasher(columns) if row_hashes is not None else None
+
+            chunk = []
+            pending_blank = 0
+            for values in rows:
+                # 与 pd.read_excel 一致：中间的空行保留，末尾的空行丢弃
+                if all(value is None for value in values):
+                    pending_blank += 1
+                    continue
+                for _ in range(pending_blank):
+                    chunk.append(self._process_company_row(dict.fromkeys(columns, np.nan)))
+                    if row_hash is not None:
+                        row_hashes.append(row_hash([None] * len(columns)))
+                pending_blank = 0
+
+                values = tuple(values) + (None,) * (len(columns) - len(values))
+                cells = [self._excel_cell(value) for value in values]
+                chunk.append(self._process_company_row(dict(zip(columns, cells))))
+                if row_hash is not None:
+                    row_hashes.append(row_hash(cells))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+
+            if chunk:
+                yield chunk
+        finally:
+            workbook.close()
+
+    def _excel_header(self, header) -> List:
+        """按 pd.read_excel 的规则生成列名：空列名为 'Unnamed: i'，重复列名追加 '.1'、'.2'"""
+        columns = []
+        seen = {}
+        for i, name in enumerate(header):
+            if name is None:
+                name = f'Unnamed: {i}'
+            if name in seen:
+                seen[name] += 1
+                name = f'{name}.{seen[name]}'
+            else:
+                seen[name] = 0
+            columns.append(name)
+        return columns
+
+    def _excel_cell(self, value):
+        """按 pd.read_excel 的规则转换单元格：空单元格为 NaN，整数值的浮点数转为 int"""
+        if value is None:
+            return np.nan
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    def process_dataframe(self, df: pd.DataFrame, mode: str = 'row',
+                          progress: Optional[Callable[[int], None]] = None) -> List[Dict]:
+        """处理整张表的企业数据
+
+        mode='row'      逐行调用 _process_company_row
+        mode='columnar' 按列批量转换评分字段，结果与逐行处理完全一致
+        progress 不为空时按 PROGRESS_CHUNK_ROWS 行分块处理，每块完成后调用 progress(行数)
+        """
+        if progress is not None:
+            companies = []
+            for start in range(0, len(df), PROGRESS_CHUNK_ROWS):
+                chunk = self.process_dataframe(df.iloc[start:start + PROGRESS_CHUNK_ROWS], mode=mode)
+                companies.extend(chunk)
+                progress(len(chunk))
+            return companies
+
+        if mode == 'columnar':
+            return self._process_dataframe_columnar(df)
+        if mode != 'row':
+            raise ValueError(f"不支持的处理模式: {mode}")
+
+        companies = []
+        for _, row in df.iterrows():
+            company = self._process_company_row(row)
+            companies.append(company)
+        return companies
+
+    def row_hashes(self, df: pd.DataFrame) -> List[str]:
+        """每一行源数据的哈希（基于列名和规范化后的单元格值），用于增量上传时判断行是否变化"""
+        row_hash = self._row_hasher(df.columns)
+        return [row_hash(values) for values in df.itertuples(index=False, name=None)]
+
+    def _row_hasher(self, columns) -> Callable[[Sequence], str]:
+        """返回计算一行单元格哈希的函数（列名相同的表共用同一个表头摘要）"""
+        header = hashlib.blake2b(digest_size=16)
+        header.update(json.dumps([str(column) for column in columns], ensure_ascii=False).encode('utf-8'))
+
+        def row_hash(values: Sequence) -> str:
+            digest = header.copy()
+            digest.update(json.dumps([self._normalize_cell(value) for value in values],
+                                     ensure_ascii=False, default=str).encode('utf-8'))
+            return digest.hexdigest()
+        return row_hash
+
+    def _normalize_cell(self, value):
+        """规范化单元格：空值为 None，NumPy 标量转为 Python 值，整数值的浮点数转为 int，字符串去掉首尾空白"""
+        if isinstance(value, np.generic):
+            value = value.item()
+        if value is None or (isinstance(value, float) and value != value):
+            return None
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str):
+            return value.strip()
+        return value
+
+    def merge_dataframe(self, df: pd.DataFrame, previous: Dict[str, Dict], mode: str = 'row',
+                        progress: Optional[Callable[[int], None]] = None,
+                        previous_companies: Optional[Sequence[Dict]] = None
+                        ) -> Tuple[List[Dict], List[str], Dict[str, int]]:
+        """增量处理：只处理哈希为新的行，其余行直接复用上一次的企业数据
+
+        previous 为上一次上传的 {行哈希: 企业数据}。
+        返回 (企业列表, 行哈希列表, 变化统计)，变化统计按企业名称计算
+        added / updated / removed / unchanged 的数量。
+        progress 与 process_dataframe 相同，复用的行一次性计入进度。
+        上一次的数据没有行哈希（previous 为空）时处理全部行，按企业名称与 previous_companies 比较。
+        """
+        hashes = self.row_hashes(df)
+        if not previous and previous_companies:
+            companies = self.process_dataframe(df, mode=mode, progress=progress)
+            return companies, hashes, self._diff_by_name(previous_companies, companies)
+
+        changed = [i for i, row_hash in enumerate(hashes) if row_hash not in previous]
+        if progress is not None:
+            progress(len(df) - len(changed))
+
+        companies = [None] * len(df)
+        processed = self.process_dataframe(df.iloc[changed], mode=mode, progress=progress) if changed else []
+        for i, company in zip(changed, processed):
+            companies[i] = company
+        for i, row_hash in enumerate(hashes):
+            if companies[i] is None:
+                # 复制一层，排名等顶层字段在载入时会重新写入
+                companies[i] = dict(previous[row_hash])
+
+        previous_names = {company['name'] for company in previous.values()}
+        current_names = {company['name'] for company in companies}
+        changed_names = {company['name'] for company in processed}
+        stats = {
+            'added': len(changed_names - previous_names),
+            'updated': len(changed_names & previous_names),
+            'removed': len(previous_names - current_names),
+            'unchanged': len(current_names - changed_names),
+        }
+        return companies, hashes, stats
+
+    def _diff_by_name(self, previous: Sequence[Dict], companies: List[Dict]) -> Dict[str, int]:
+        """按企业名称比较两次的企业数据（忽略载入时写入的 rank），统计口径与 merge_dataframe 相同"""
+        def content(company: Dict) -> Dict:
+            return {key: value for key, value in company.items() if key != 'rank'}
+
+        before = {}
+        for company in previous:
+            before.setdefault(company['name'], content(company))
+        after = {}
+        for company in companies:
+            after.setdefault(company['name'], content(company))
+        updated = sum(1 for name, company in after.items() if name in before and before[name] != company)
+        return {
+            'added': len(after.keys() - before.keys()),
+            'updated': updated,
+            'removed': len(before.keys() - after.keys()),
+            'unchanged': len(after.keys() & before.keys()) - updated,
         }
+
+    def _process_company_row(self, row: pd.Series) -> Dict:
+        """处理单个企业数据行（row 也可以是以列名为键的 dict，只用到 row.get）"""
         company = {
             # 基本信息
             'name': str(row.get('企业名称', '')).strip(),
@@ -115,347 +443,132 @@ class UpdatedDataProcessor:
             'eligibility_criteria': str(row.get('符合准入资格情况', '')).strip(),
             'purchase_package_status': str(row.get('购买套餐情况', '')).strip(),
             'trading_group': str(row.get('交易团', '')).strip(),
-            
-            # 结构化文字内容
-            'highlights': self._parse_highlights(str(row.get('企业亮点', ''))),
-            'leading_position': self._parse_leading_position(str(row.get('领先地位', ''))),
-            'industry_sectors': self._parse_industry_sectors(str(row.get('产业板块', ''))),
-            'main_products': self._parse_main_products(str(row.get('主营产品', ''))),
-            'vip_products': self._parse_vip_products(str(row.get('所在VIP展区产品情况', ''))),
-            
-            # 评分相关数据
-            'fortune_500_world': self._safe_int(row.get('世界《财富》500强(2分)', 0)),
-            'fortune_500_china': self._safe_int(row.get('中国《财富》500强(1分)', 0)),
-            'china_manufacturing_500': self._safe_int(row.get('中国制造业500强(1分)', 0)),
-            'unicorn_enterprise': self._safe_int(row.get('独角兽企业(1分)', 0)),
-            'gazelle_enterprise': self._safe_int(row.get('瞪羚企业(1分)', 0)),
-            'listed_company': self._safe_int(row.get('上市企业(1分)', 0)),
-            'market_value_score': self._safe_int(row.get('市场价值总分', 0)), #########
-            'manufacturing_champion_national': self._safe_int(row.get('国际级制造业单项冠军(2分)', 0)),
-            'manufacturing_champion_provincial': self._safe_int(row.get('省级制造业单项冠军(1分)', 0)),
-            'sophisticated_enterprises_vipnational':self._safe_int(row.get('国家级专精特新重点“小巨人(3分)”', 0)),
-            'sophisticated_enterprises_national':self._safe_int(row.get('国家级专精特新“小巨人”(2分)', 0),),
-            'specialized_new_provincial': self._safe_int(row.get('省级专精特新(1分)', 0)),
-            'high_tech_enterprise': self._safe_int(row.get('国家级高新技术企业(1分)', 0)),
-            'tech_center_national': self._safe_int(row.get('国家级企业技术中心(2分)', 0)),
-            'tech_center_provincial': self._safe_int(row.get('省级企业技术中心(1分)', 0)),
-            'tech_innovation_demo': self._safe_int(row.get('国家技术创新示范企业(1分)', 0)),
-            'standard_international': self._safe_int(row.get('参与制定国际标准(3分)', 0)),
-            'standard_national': self._safe_int(row.get('参与制定国家标准(2分)', 0)),
-            'standard_industry': self._safe_int(row.get('参与制定行业标准(1分)', 0)),
-            'rd_innovation_score': self._safe_int(row.get('研发创新总分' ,0)),
-            'excellent_smart_factory': self._safe_int(row.get('卓越级智能工厂(1分)', 0)),
-            'leading_smart_factory': self._safe_int(row.get('领航级智能工厂(2分)', 0)),
-            'lighthouse_factory': self._safe_int(row.get('灯塔工厂(3分)', 0)),
-            'smart_manufacturing_score': self._safe_int(row.get('智能制造总分' ,0)),
-            'green_factory_national': self._safe_int(row.get('国家级绿色工厂(2分)', 0)),
-            'green_factory_provincial': self._safe_int(row.get('省级绿色工厂(1分)', 0)),
-            'green_design_national': self._safe_int(row.get('国家级绿色设计产品(2分)', 0)),
-            'green_design_provincial': self._safe_int(row.get('省级绿色设计产品(1分)', 0)),
-            'green_park_national': self._safe_int(row.get('国家级绿色工业园(2分)', 0)),
-            'green_park_provincial': self._safe_int(row.get('省级绿色工业园(1分)', 0)),
-            'green_supply_national': self._safe_int(row.get('国家级绿色供应链管理(2分)', 0)),
-            'green_supply_provincial': self._safe_int(row.get('省级绿色供应链管理(1分)', 0)),
-            'green_manufacturing_score': self._safe_int(row.get('绿色制造总分', 0)),
-            'aeo_certification': self._safe_int(row.get('AEO高级认证企业(2分)', 0)),
-            'credit_level_score': self._safe_int(row.get('信用水平总分', 0)),
-            #'total_scores': self._safe_int(row.get('总分', 0)),
         }
-        # 获取原始评分数据
-        company['market_value_score'] = self._safe_int(row.get('市场价值总分', 0))
-        company['rd_innovation_score'] = self._safe_int(row.get('研发创新总分', 0))
-        company['smart_manufacturing_score'] = self._safe_int(row.get('智能制造总分', 0))
-        company['green_manufacturing_score'] = self._safe_int(row.get('绿色制造总分', 0))
-        company['credit_level_score'] = self._safe_int(row.get('信用水平总分', 0))
-        total_score = self._safe_int(row.get('总分', 0))
-
-        # 应用加权系数
+
+        # 结构化文字内容
+        for field, column, parser in TEXT_FIELD_PARSERS:
+            company[field] = parser(str(row.get(column, '')))
+
+        # 评分相关数据
+        for field, column in SCORE_FIELD_COLUMNS:
+            company[field] = self._safe_int(row.get(resolve_score_column(field, column, row), 0))
+
+        # 应用加权系数，重新计算总分（替代原始 '总分' 列）
         weighted_scores = {
-        'market_value': company['market_value_score'] * weights['market_value_score'],
-        'rd_innovation': company['rd_innovation_score'] * weights['rd_innovation_score'],
-        'smart_manufacturing': company['smart_manufacturing_score'] * weights['smart_manufacturing_score'],
-        'green_manufacturing': company['green_manufacturing_score'] * weights['green_manufacturing_score'],
-        'credit_level': company['credit_level_score'] * weights['credit_level_score'],
+            category: company[field] * SCORE_WEIGHTS[field]
+            for category, field in CATEGORY_SCORE_FIELDS
         }
-        # 重新计算总分（可以替代原始 total_score）
-        total_score = sum(weighted_scores.values()) * weights['total_score']
-        # 🔧 修复关键问题：创建scores对象
-        #total_score = self._safe_int(row.get('总分', 0))
-        
+        total_score = sum(weighted_scores.values()) * SCORE_WEIGHTS['total_score']
+
         # 构建scores对象，这是JavaScript代码期望的数据结构
-        company['scores'] = {
-            'market_value': company['market_value_score'],
-            
-            'rd_innovation': company['rd_innovation_score'],
-            
-            'smart_manufacturing': company['smart_manufacturing_score'],
-            'green_manufacturing': company['green_manufacturing_score'],
-            
-            'credit_level': company['credit_level_score'],
-            
-            'total': round(total_score , 2),  # 🎯 这是修复JavaScript错误的关键
-            'percentage': round(total_score, 1) if total_score > 0 else 0
-        }
+        company['scores'] = self._build_scores(company, total_score)
         
-        # 添加荣誉信息
-        company['honors'] = self._extract_honors(row)
+        # 添加荣誉信息（直接使用上面已转换的评分字段）
+        company['honors'] = self._extract_honors(company)
         
         return company
+
+    def _build_scores(self, company: Dict, total_score: float) -> Dict:
+        """由类别总分和加权总分构建scores对象"""
+        scores = {category: company[field] for category, field in CATEGORY_SCORE_FIELDS}
+        scores['total'] = round(total_score, 2)
+        scores['percentage'] = round(total_score, 1) if total_score > 0 else 0
+        return scores
+
+    def _process_dataframe_columnar(self, df: pd.DataFrame) -> List[Dict]:
+        """按列批量处理企业数据：评分列整列转换，总分以数组运算求得，最后才组装企业字典"""
+        int_columns = {}
+
+        def ints(column: str) -> np.ndarray:
+            if column not in int_columns:
+                int_columns[column] = self._safe_int_column(df, column)
+            return int_columns[column]
+
+        def texts(column: str) -> List[str]:
+            if column not in df.columns:
+                return [''] * len(df)
+            return [str(value) for value in df[column].tolist()]
+
+        def stripped(column: str) -> List[str]:
+            return [value.strip() for value in texts(column)]
+
+        # 评分字段：整列转换
+        score_arrays = {field: ints(resolve_score_column(field, column, df.columns))
+                        for field, column in SCORE_FIELD_COLUMNS}
+
+        # 加权总分：按与逐行路径相同的累加顺序计算，保证浮点结果一致
+        total_scores = np.zeros(len(df), dtype=np.float64)
+        for _, field in CATEGORY_SCORE_FIELDS:
+            total_scores = total_scores + score_arrays[field] * SCORE_WEIGHTS[field]
+        total_scores = total_scores * SCORE_WEIGHTS['total_score']
+
+        # 荣誉：由已转换的评分列得到布尔矩阵，每个荣誉一列
+        honor_masks = [score_arrays[field] > 0 for field, _, _, _ in self.honor_table]
+        honor_matrix = np.column_stack(honor_masks) if honor_masks else np.zeros((len(df), 0), dtype=bool)
+
+        columns = {
+            'name': stripped('企业名称'),
+            'introduction': stripped('企业简介'),
+            'city': stripped('所属市县'),
+            'exhibition_count': ints('已参展届数').tolist(),
+            'vip_level': stripped('VIP等级'),
+            'is_brand': [value == '是' for value in stripped('是否品牌')],
+            'exhibition_areas': ints('参展展区数').tolist(),
+            'exhibition_areas_vip': stripped('VIP所属展区'),
+            'eligibility_criteria': stripped('符合准入资格情况'),
+            'purchase_package_status': stripped('购买套餐情况'),
+            'trading_group': stripped('交易团'),
+        }
+        # 结构化文字内容：整列批量解析
+        for field, column, parser in TEXT_FIELD_PARSERS:
+            columns[field] = parse_text_column(parser, texts(column))
+        for field, array in score_arrays.items():
+            columns[field] = array.tolist()
+        totals = total_scores.tolist()
+
+        # 最后组装企业字典
+        fields = list(columns)
+        companies = []
+        for i in range(len(df)):
+            company = {field: columns[field][i] for field in fields}
+            company['scores'] = self._build_scores(company, totals[i])
+            company['honors'] = [
+                {'category': category, 'name': name, 'level': level}
+                for (_, category, name, level), matched in zip(self.honor_table, honor_matrix[i])
+                if matched
+            ]
+            companies.append(company)
+
+        return companies
     
     def _parse_highlights(self, text: str) -> List[str]:
         """解析企业亮点"""
-        if not text or text == 'nan':
-            return []
-        
-        highlights = []
-        # 按数字序号分割
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if re.match(r'^\d+\.', line):
-                # 去掉序号，保留内容
-                content = re.sub(r'^\d+\.', '', line).strip()
-                if content:
-                    highlights.append(content)
-        
-        return highlights
+        return parse_numbered_list(text)
     
     def _parse_leading_position(self, text: str) -> List[str]:
         """解析领先地位"""
-        if not text or text == 'nan':
-            return []
-        
-        positions = []
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if re.match(r'^\d+\.', line):
-                content = re.sub(r'^\d+\.', '', line).strip()
-                if content:
-                    positions.append(content)
-        
-        return positions
+        return parse_numbered_list(text)
     
     def _parse_industry_sectors(self, text: str) -> List[str]:
         """解析产业板块"""
-        if not text or text == 'nan':
-            return []
-        
-        sectors = []
-        lines = text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if re.match(r'^\d+\.', line):
-                content = re.sub(r'^\d+\.', '', line).strip()
-                if content:
-                    sectors.append(content)
-        
-        return sectors
-    
-#    def _parse_main_products(self, text: str) -> Dict[str, List[str]]:
-#        """解析主营产品"""
-#        if not text or text == 'nan':
-#            return {}
-        
-#        categories = {}
-        # 按冒号分割类别
-#        parts = text.split('：')
-        
-#        i = 0
-#        while i < len(parts) - 1:
-#            category = parts[i].strip()
-            # 清理类别名称（去掉前面的数字序号等）
-#            category = re.sub(r'^\d+\.', '', category).strip()
-            
-#            if i + 1 < len(parts):
-#                products_text = parts[i + 1]
-                # 如果下一部分包含下一个类别，需要分割
-#                next_category_match = re.search(r'\n\d+\.', products_text)
-#                if next_category_match:
-#                    products_text = products_text[:next_category_match.start()]
-                
-                # 按逗号或顿号分割产品
-#                products = re.split(r'[，、]', products_text)
-#                products = [p.strip() for p in products if p.strip()]
-                
-#                if category and products:
-#                   categories[category] = products
-            
-#            i += 1
-        
-#        return categories
+        return parse_numbered_list(text)
     
-
-    ###### new version 
     def _parse_main_products(self, text: str) -> Dict[str, List[str]]:
-        
-    #"""解析主营产品"""
-        if not text or text == 'nan':
-            return {}
-    
-        categories = {}
-        #parts = text.split('：')   bug!!!!!!!!!!!!!!!
-        # 正则提取：编号.类别：产品列表
-        pattern = re.compile(r'\d+\.\s*([^：]+)：([^0-9]+)')
-        matches = pattern.findall(text)
-        for category, products_text in matches:
-            category = category.strip()
-            products = re.split(r'[，、]', products_text)
-            products = [p.strip() for p in products if p.strip()]
-            if category and products:
-                categories[category] = products
-    
-        return categories
-        
+        """解析主营产品"""
+        return parse_main_products(text)
 
     def _parse_vip_products(self, text: str) -> Dict[str, List[Dict]]:
         """解析VIP展区产品情况"""
-        if not text or text == 'nan':
-            return {}
-        
-        result = {}
-        
-        # 按"一、二、三"分割大类
-        sections = re.split(r'[一二三]、', text)
-        section_names = ['新品', '爆品', '热卖品']
-        
-        for i, section in enumerate(sections[1:]):  # 跳过第一个空元素
-            if i < len(section_names) and section.strip():
-                products = []
-                
-                # 按数字序号分割产品
-                product_lines = re.split(r'\n\d+\.', section)
-                for line in product_lines:
-                    line = line.strip()
-                    if line:
-                        # 提取产品系列名称（【】内的内容）
-                        series_match = re.search(r'【([^】]+)】', line)
-                        series_name = series_match.group(1) if series_match else ''
-                        
-                        # 提取产品描述
-                        description = re.sub(r'【[^】]+】', '', line).strip()
-                        description = re.sub(r'^\d+\.', '', description).strip()
-                        
-                        if description:
-                            products.append({
-                                'series': series_name,
-                                'description': description
-                            })
-                
-                if products:
-                    result[section_names[i]] = products
-        
-        return result
+        return parse_vip_products(text)
     
     
-    def _extract_honors(self, row: pd.Series) -> List[Dict[str, str]]:
-        """提取企业荣誉信息"""
-        honors = []
-        
-        # 市场价值类荣誉
-        if self._safe_int(row.get('世界《财富》500强(2分)', 0)) > 0:
-            level = "世界级" if self._safe_int(row.get('世界《财富》500强(2分)', 0)) == 2 else "省级"
-            honors.append({'category': '市场价值', 'name': '世界《财富》500强(2分)', 'level': 'gold'})
-        
-        if self._safe_int(row.get('国家《财富》500强(1分)', 0)) > 0:
-            level = "国家级" if self._safe_int(row.get('国家《财富》500强(1分)', 0)) == 1 else "国家级"
-            honors.append({'category': '市场价值', 'name': '国家《财富》500强(1分)', 'level': 'yellow'})
-        
-        if self._safe_int(row.get('中国制造业500强(1分)', 0)) > 0:
-            honors.append({'category': '市场价值', 'name': '中国制造业500强(1分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('独角兽企业(1分)', 0)) > 0:
-            honors.append({'category': '市场价值', 'name': '独角兽企业(1分)', 'level': 'blue'})
-            
-        if self._safe_int(row.get('瞪羚企业(1分)', 0)) > 0:
-            honors.append({'category': '市场价值', 'name': '瞪羚企业(1分)', 'level': 'blue'})
-        
-        if self._safe_int(row.get('上市企业(1分)', 0)) > 0:
-            honors.append({'category': '市场价值', 'name': '上市企业(1分)', 'level': 'blue'})
-        
-        
-        # 研发创新类荣誉
-        if self._safe_int(row.get('国家级制造业单项冠军(2分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '国家级制造业单项冠军', 'level': 'gold'})
-        
-        if self._safe_int(row.get('省级制造单项冠军(1分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '省级制造单项冠军', 'level': 'silver'})
-        
-        if self._safe_int(row.get('国家级专精特新重点“小巨人”(3分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '国家级专精特新重点“小巨人”(3分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('国家级专精特新“小巨人”(2分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '国家级专精特新“小巨人”(2分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('省级专精特新(1分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '省级专精特新(1分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('国家高新技术企业(1分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '国家高新技术企业(1分)', 'level': 'silver'})
-        
-        if self._safe_int(row.get('国家级企业技术中心(2分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '国家级企业技术中心(2分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('省级企业技术中心(1分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '省级企业技术中心(1分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('国家技术创新示范企业(1分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '国家技术创新示范企业(1分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('参与制定国际标准(3分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '参与制定国际标准(3分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('参与制定国家标准(2分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '参与制定国家标准(2分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('国家技术创新示范企业(1分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '国家技术创新示范企业(1分)', 'level': 'silver'})
-            
-        if self._safe_int(row.get('参与制定行业标准(1分)', 0)) > 0:
-            honors.append({'category': '研发创新', 'name': '参与制定行业标准(1分)', 'level': 'silver'})
-            
-        
-        # 智能制造类荣誉
-        if self._safe_int(row.get('卓越级智能工厂(1分)', 0)) > 0:
-            honors.append({'category': '智能制造', 'name': '卓越级智能工厂(1分)', 'level': 'blue'})
-        
-        if self._safe_int(row.get('领航级智能工厂(2分)', 0)) > 0:
-            honors.append({'category': '智能制造', 'name': '领航级智能工厂(2分)', 'level': 'gold'})
-        
-        if self._safe_int(row.get('灯塔工厂(2分)', 0)) > 0:
-            honors.append({'category': '智能制造', 'name': '灯塔工厂(2分)', 'level': 'gold'})
-        
-        # 绿色制造类荣誉
-        if self._safe_int(row.get('国家级绿色工厂(2分)', 0)) > 0:
-            honors.append({'category': '绿色制造', 'name': '国家级绿色工厂(2分)', 'level': 'green'})
-        
-        if self._safe_int(row.get('省级绿色工厂(1分)', 0)) > 0:
-            honors.append({'category': '绿色制造', 'name': '省级绿色工厂(1分)', 'level': 'green'})
-            
-        if self._safe_int(row.get('国家级绿色设计产品(2分)', 0)) > 0:
-            honors.append({'category': '绿色制造', 'name': '国家级绿色设计产品(2分)', 'level': 'green'})
-            
-        if self._safe_int(row.get('省级绿色设计产品(1分)', 0)) > 0:
-            honors.append({'category': '绿色制造', 'name': '省级绿色设计产品(1分)', 'level': 'green'})
-            
-        if self._safe_int(row.get('国家级绿色工业园(2分)', 0)) > 0:
-            honors.append({'category': '绿色制造', 'name': '国家级绿色工业园(2分)', 'level': 'green'})
-            
-        if self._safe_int(row.get('省级绿色工业园(1分)', 0)) > 0:
-            honors.append({'category': '绿色制造', 'name': '省级绿色工业园(1分)', 'level': 'green'})
-            
-        if self._safe_int(row.get('国家级绿色供应链管理(2分)', 0)) > 0:
-            honors.append({'category': '绿色制造', 'name': '国家级绿色供应链管理(2分)', 'level': 'green'})
-            
-        if self._safe_int(row.get('省级绿色供应链管理(1分)', 0)) > 0:
-            honors.append({'category': '绿色制造', 'name': '省级绿色供应链管理(1分)', 'level': 'green'})
-        
-        
-        # 信用水平类荣誉
-        if self._safe_int(row.get('AEO高级认证企业(1分)', 0)) > 0:
-            honors.append({'category': '信用水平', 'name': 'AEO高级认证企业(1分)', 'level': 'blue'})
-        
-        return honors
+    def _extract_honors(self, company: Dict) -> List[Dict[str, str]]:
+        """由企业已转换的评分字段提取荣誉信息"""
+        return [
+            {'category': category, 'name': name, 'level': level}
+            for field, category, name, level in self.honor_table
+            if company[field] > 0
+        ]
     
     def _safe_int(self, value) -> int:
         """安全转换为整数"""
@@ -466,6 +579,25 @@ class UpdatedDataProcessor:
         except (ValueError, TypeError):
             return 0
 
+    def _safe_int_column(self, df: pd.DataFrame, column: str) -> np.ndarray:
+        """整列安全转换为整数（结果与逐个调用 _safe_int 一致）"""
+        if column not in df.columns:
+            return np.zeros(len(df), dtype=np.int64)
+
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_integer_dtype(series.dtype):
+            if not series.hasnans:
+                return series.to_numpy(dtype=np.int64)
+        elif pd.api.types.is_float_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = np.where(np.isnan(values), 0.0, values)
+            # inf 或超出 int64 范围的值交给逐个转换处理，保持相同的报错行为
+            if np.isfinite(values).all() and (np.abs(values) < 2 ** 63).all():
+                return np.trunc(values).astype(np.int64)
+
+        return np.fromiter((self._safe_int(value) for value in series.tolist()),
+                           dtype=np.int64, count=len(series))
+
 #   def _safe_int(self, value):
 #        try:
 #            if pd.isna(value): return 0
@@ -485,30 +617,18 @@ class UpdatedDataProcessor:
                 'score_distribution': {}
             }
         
-        # 🔧 修复：使用scores.total而不是total
-        total_score = sum(company['scores']['total'] for company in companies)
+        # 分数统计和分布由统计引擎一次计算（分段为 <=3、<=6、<=9、其余）
+        statistics = StatisticsEngine.from_companies(companies)
+        distribution = statistics.histogram(SCORE_DISTRIBUTION_EDGES, right=True)
         gold_vip_count = sum(1 for company in companies if company.get('vip_level') == '金标')
         brand_count = sum(1 for company in companies if company.get('is_brand'))
         
-        # 评分分布
-        score_ranges = {'0-3分': 0, '4-6分': 0, '7-9分': 0, '10-13分': 0}
-        for company in companies:
-            score = company['scores']['total']  # 🔧 修复：使用scores.total
-            if score <= 3:
-                score_ranges['0-3分'] += 1
-            elif score <= 6:
-                score_ranges['4-6分'] += 1
-            elif score <= 9:
-                score_ranges['7-9分'] += 1
-            else:
-                score_ranges['10-13分'] += 1
-        
         return {
             'total_companies': len(companies),
-            'average_score': round(total_score / len(companies), 1),
+            'average_score': round(statistics.summary()['mean'], 1),
             'gold_vip_count': gold_vip_count,
             'brand_companies': brand_count,
-            'score_distribution': score_ranges
+            'score_distribution': dict(zip(SCORE_DISTRIBUTION_LABELS, distribution))
         }
 
 # 测试代码